@@ -1,15 +1,23 @@
 # workers/feedback/app.py - Feedback Worker Agent
 from fastapi import FastAPI
 from pydantic import BaseModel
-import requests
+import aiohttp
+import asyncio
+import os
 import random
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Any
 from datetime import datetime, timedelta
 
-app = FastAPI(title="Feedback Worker", version="1.0")
+from mock_api_client import MockAPIClient
 
 MOCK_API_BASE = "http://mockapi:8000"
 
+MOCK_API_POOL_LIMIT = int(os.getenv("MOCK_API_POOL_LIMIT", "200"))
+
+mock_api = MockAPIClient(MOCK_API_BASE, MOCK_API_POOL_LIMIT)
+
+app = FastAPI(title="Feedback Worker", version="1.0", lifespan=mock_api.lifespan)
+
 class FeedbackTask(BaseModel):
     session_id: str
     customer_id: str
@@ -202,17 +210,17 @@ def get_retention_actions(probability: float) -> List[str]:
         ]
 
 @app.post("/task")
-def process_feedback(task: FeedbackTask):
+async def process_feedback(task: FeedbackTask):
     """Process customer feedback and generate insights"""
     try:
         # Get customer profile
         customer_data = {"name": "Valued Customer", "communication_preference": "app"}
         if task.customer_id:
             try:
-                customer_response = requests.get(f"{MOCK_API_BASE}/customers/{task.customer_id}", timeout=5)
-                if customer_response.status_code == 200:
-                    customer_data = customer_response.json()
-            except:
+                status, body = await mock_api.get(f"/customers/{task.customer_id}", timeout=5)
+                if status == 200:
+                    customer_data = body
+            except (aiohttp.ClientError, asyncio.TimeoutError):
                 pass  # Continue with default data
         
         # Generate feedback survey
@@ -4,15 +4,22 @@ Mock API Server for Automotive Predictive Maintenance System
 Simulates real automotive data sources including telematics, customer data, and service centers
 """
 
-from flask import Flask, jsonify, request
+from flask import Flask, Response, jsonify, request
 from flask_cors import CORS
 import json
 import random
 import uuid
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 import logging
 import os
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from synthetic_fleet import SyntheticFleet, LayeredRecords
+from telematics_store import ColumnarTelematicsStore
+from slot_inventory import SlotInventory, SlotConflict
 
 # Configure logging
 logging.basicConfig(
@@ -21,9 +28,37 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Artificial upstream latency for throughput benchmarks: each request sleeps
+# MOCKAPI_LATENCY_MS plus a uniform random jitter of up to MOCKAPI_JITTER_MS
+MOCKAPI_LATENCY_MS = float(os.getenv('MOCKAPI_LATENCY_MS', '0'))
+MOCKAPI_JITTER_MS = float(os.getenv('MOCKAPI_JITTER_MS', '0'))
+MOCKAPI_LATENCY_EXEMPT = {'/health'}
+
+# Synthetic fleet layered behind the sample data (disabled when vehicles is 0)
+MOCKAPI_SYNTHETIC_VEHICLES = int(os.getenv('MOCKAPI_SYNTHETIC_VEHICLES', '0'))
+MOCKAPI_SYNTHETIC_CUSTOMERS = int(os.getenv('MOCKAPI_SYNTHETIC_CUSTOMERS', '0'))
+MOCKAPI_SYNTHETIC_CENTERS = int(os.getenv('MOCKAPI_SYNTHETIC_CENTERS', '200'))
+MOCKAPI_SEED = int(os.getenv('MOCKAPI_SEED', '42'))
+# Memory-mapped columnar telematics store, used when the directory exists
+MOCKAPI_TELEMATICS_STORE = os.getenv(
+    'MOCKAPI_TELEMATICS_STORE', os.path.join(os.path.dirname(__file__), 'data', 'telematics_store')
+)
+MOCKAPI_BULK_MAX_VINS = int(os.getenv('MOCKAPI_BULK_MAX_VINS', '100000'))
+MOCKAPI_BULK_STREAM_THRESHOLD = int(os.getenv('MOCKAPI_BULK_STREAM_THRESHOLD', '500'))
+MOCKAPI_BOOKINGS_PER_SLOT = int(os.getenv('MOCKAPI_BOOKINGS_PER_SLOT', '1'))
+MOCKAPI_BULK_MAX_BOOKINGS = int(os.getenv('MOCKAPI_BULK_MAX_BOOKINGS', '10000'))
+MOCKAPI_BULK_BATCH_RETENTION = int(os.getenv('MOCKAPI_BULK_BATCH_RETENTION', '1000'))
+MOCKAPI_SNAPSHOT_CACHE = int(os.getenv('MOCKAPI_SNAPSHOT_CACHE', '100000'))
+
 app = Flask(__name__)
 CORS(app)
 
+@app.before_request
+def inject_latency():
+    """Simulate a slow upstream system when latency injection is configured"""
+    if (MOCKAPI_LATENCY_MS > 0 or MOCKAPI_JITTER_MS > 0) and request.path not in MOCKAPI_LATENCY_EXEMPT:
+        time.sleep((MOCKAPI_LATENCY_MS + random.uniform(0, MOCKAPI_JITTER_MS)) / 1000.0)
+
 # Load sample data
 def load_sample_data():
     """Load sample data from JSON files"""
@@ -231,8 +266,93 @@ def generate_sample_service_centers():
         ]
     }
 
+class TelematicsSnapshot:
+    """Pre-serialized telematics record with a per-request overlay for live fields
+    
+    The base record is never mutated. Everything except the simulated live
+    fields of ``current_status`` is serialized once into JSON byte fragments,
+    and each request splices freshly generated values between them.
+    """
+    
+    __slots__ = ("prefix", "status_tail", "suffix", "engine_rpm", "engine_temp")
+    
+    LIVE_FIELDS = ("engine_rpm", "engine_temp", "last_updated")
+    
+    def __init__(self, record: Dict):
+        status = record.get('current_status', {})
+        self.engine_rpm = status.get('engine_rpm', 0)
+        self.engine_temp = status.get('engine_temp', 0)
+        
+        marker = '"__current_status__"'
+        template = json.dumps({**record, 'current_status': '__current_status__'})
+        prefix, suffix = template.split(marker, 1)
+        static_status = json.dumps({k: v for k, v in status.items() if k not in self.LIVE_FIELDS})
+        self.prefix = prefix.encode()
+        self.status_tail = (', ' + static_status[1:] if len(static_status) > 2 else '}').encode()
+        self.suffix = suffix.encode()
+    
+    def live_fields(self) -> Dict:
+        """Simulated real-time values for this request"""
+        engine_rpm, engine_temp = self.engine_rpm, self.engine_temp
+        
+        # Add some realistic variations
+        if engine_rpm > 0:
+            engine_rpm += random.randint(-50, 50)
+            engine_temp += random.randint(-2, 2)
+        
+        return {
+            'engine_rpm': engine_rpm,
+            'engine_temp': engine_temp,
+            'last_updated': datetime.now().isoformat()
+        }
+    
+    def render(self) -> bytes:
+        """Serialize the record with simulated real-time values"""
+        live = json.dumps(self.live_fields())
+        return b''.join((self.prefix, live[:-1].encode(), self.status_tail, self.suffix))
+
 # Load data
 telematics_data, customers_data, service_centers_data = load_sample_data()
+telematics_snapshots = {vin: TelematicsSnapshot(record) for vin, record in telematics_data.items()}
+
+telematics_store = None
+if os.path.isdir(MOCKAPI_TELEMATICS_STORE):
+    telematics_store = ColumnarTelematicsStore(MOCKAPI_TELEMATICS_STORE)
+    telematics_data = LayeredRecords(telematics_data, telematics_store)
+    logger.info(f"Columnar telematics store mapped: {len(telematics_store)} vehicles from {MOCKAPI_TELEMATICS_STORE}")
+
+synthetic_fleet = None
+if MOCKAPI_SYNTHETIC_VEHICLES > 0:
+    synthetic_fleet = SyntheticFleet(
+        MOCKAPI_SYNTHETIC_VEHICLES,
+        customer_count=MOCKAPI_SYNTHETIC_CUSTOMERS or None,
+        center_count=MOCKAPI_SYNTHETIC_CENTERS,
+        seed=MOCKAPI_SEED
+    )
+    telematics_data = LayeredRecords(*getattr(telematics_data, 'layers', (telematics_data,)), synthetic_fleet.vehicles())
+    customers_data = LayeredRecords(customers_data, synthetic_fleet.customers())
+    service_centers_data = {
+        **service_centers_data,
+        "centers": service_centers_data["centers"] + synthetic_fleet.centers()
+    }
+    logger.info(f"Synthetic fleet enabled: {synthetic_fleet.vehicle_count} vehicles, "
+                f"{synthetic_fleet.customer_count} customers, {synthetic_fleet.center_count} centers")
+
+# Bookings consume slots; the inventory lives in this process, so run a single
+# gunicorn worker process (scaling with threads) when booking state matters
+slot_inventory = SlotInventory(service_centers_data["centers"], MOCKAPI_BOOKINGS_PER_SLOT)
+service_centers_by_id = {center["id"]: center for center in service_centers_data["centers"]}
+
+@lru_cache(maxsize=MOCKAPI_SNAPSHOT_CACHE)
+def on_demand_snapshot(vin: str) -> TelematicsSnapshot:
+    return TelematicsSnapshot(telematics_data[vin])
+
+def get_telematics_snapshot(vin: str) -> Optional[TelematicsSnapshot]:
+    """Snapshot for a VIN; store-backed and synthetic vehicles are built on demand and cached"""
+    snapshot = telematics_snapshots.get(vin)
+    if snapshot is None and vin in telematics_data:
+        snapshot = on_demand_snapshot(vin)
+    return snapshot
 
 @app.route('/health', methods=['GET'])
 def health_check():
@@ -248,23 +368,93 @@ def health_check():
 def get_telematics(vin):
     """Get telematics data for a specific vehicle"""
     try:
-        if vin in telematics_data:
-            # Simulate real-time data updates
-            vehicle_data = telematics_data[vin].copy()
-            vehicle_data['current_status']['last_updated'] = datetime.now().isoformat()
-            
-            # Add some realistic variations
-            if vehicle_data['current_status']['engine_rpm'] > 0:
-                vehicle_data['current_status']['engine_rpm'] += random.randint(-50, 50)
-                vehicle_data['current_status']['engine_temp'] += random.randint(-2, 2)
-            
-            return jsonify(vehicle_data)
+        snapshot = get_telematics_snapshot(vin)
+        if snapshot is not None:
+            # Simulate real-time data updates without touching the shared record
+            return Response(snapshot.render(), mimetype='application/json')
         else:
             return jsonify({"error": "Vehicle not found"}), 404
     except Exception as e:
         logger.error(f"Error fetching telematics for {vin}: {str(e)}")
         return jsonify({"error": "Internal server error"}), 500
 
+TELEMATICS_SECTIONS = {"vehicle_info", "current_status", "sensor_data", "dtc_codes", "maintenance_history"}
+
+def render_bulk_vehicle(vin: str, fields: Optional[List[str]]) -> bytes:
+    """One vehicle's telematics (optionally projected to some sections) as JSON bytes"""
+    snapshot = get_telematics_snapshot(vin)
+    if snapshot is None:
+        return json.dumps({"vin": vin, "error": "Vehicle not found"}).encode()
+    if not fields:
+        return b'{"vin": ' + json.dumps(vin).encode() + b', "telematics": ' + snapshot.render() + b'}'
+    record = telematics_data[vin]
+    projected = {field: record[field] for field in fields if field in record}
+    if "current_status" in projected:
+        projected["current_status"] = {**projected["current_status"], **snapshot.live_fields()}
+    return json.dumps({"vin": vin, "telematics": projected}).encode()
+
+@app.route('/telematics/bulk', methods=['POST'])
+def get_telematics_bulk():
+    """Get telematics for many vehicles in one request
+    
+    Body: {"vins": [...], "fields": ["sensor_data", "dtc_codes"], "stream": false}.
+    Large batches (or stream=true / Accept: application/x-ndjson) are streamed
+    as one JSON object per line; otherwise a single JSON document is returned.
+    """
+    try:
+        payload = request.get_json() or {}
+        vins = payload.get('vins', [])
+        fields = payload.get('fields')
+        
+        if not isinstance(vins, list) or len(vins) > MOCKAPI_BULK_MAX_VINS:
+            return jsonify({"error": f"vins must be a list of at most {MOCKAPI_BULK_MAX_VINS} VINs"}), 400
+        if fields is not None and (not isinstance(fields, list) or not set(fields) <= TELEMATICS_SECTIONS):
+            return jsonify({"error": f"fields must be a subset of {sorted(TELEMATICS_SECTIONS)}"}), 400
+        
+        stream = (
+            payload.get('stream', False)
+            or len(vins) > MOCKAPI_BULK_STREAM_THRESHOLD
+            or request.accept_mimetypes.best == 'application/x-ndjson'
+        )
+        if stream:
+            def generate():
+                for vin in vins:
+                    yield render_bulk_vehicle(vin, fields) + b'\n'
+            return Response(generate(), mimetype='application/x-ndjson')
+        
+        body = b'{"vehicles": [' + b', '.join(render_bulk_vehicle(vin, fields) for vin in vins) + b'], ' \
+            + b'"total": ' + str(len(vins)).encode() + b'}'
+        return Response(body, mimetype='application/json')
+        
+    except Exception as e:
+        logger.error(f"Error fetching bulk telematics: {str(e)}")
+        return jsonify({"error": "Internal server error"}), 500
+
+@app.route('/fleet/summary', methods=['GET'])
+def get_fleet_summary():
+    """Describe the data set being served"""
+    return jsonify({
+        "vehicles": len(telematics_data),
+        "customers": len(customers_data),
+        "service_centers": len(service_centers_data["centers"]),
+        "columnar_store": len(telematics_store) if telematics_store is not None else None,
+        "synthetic": synthetic_fleet is not None,
+        "seed": MOCKAPI_SEED if synthetic_fleet is not None else None
+    })
+
+@app.route('/fleet/vins', methods=['GET'])
+def list_fleet_vins():
+    """Page through synthetic VINs for load generation"""
+    if synthetic_fleet is None:
+        return jsonify({"vins": list(telematics_snapshots), "total": len(telematics_snapshots)})
+    offset = request.args.get('offset', 0, type=int)
+    limit = min(request.args.get('limit', 1000, type=int), 100000)
+    return jsonify({
+        "vins": synthetic_fleet.vehicles().ids(offset, limit),
+        "offset": offset,
+        "total": synthetic_fleet.vehicle_count
+    })
+
 @app.route('/customers/<customer_id>', methods=['GET'])
 def get_customer(customer_id):
     """Get customer information"""
@@ -277,15 +467,90 @@ def get_customer(customer_id):
         logger.error(f"Error fetching customer {customer_id}: {str(e)}")
         return jsonify({"error": "Internal server error"}), 500
 
+# Availability body rendered for the inventory version it reflects, shared by
+# every request until the next booking or cancellation
+availability_cache: Dict[str, Tuple[Optional[int], bytes]] = {"entry": (None, b"")}
+availability_epoch = uuid.uuid4().hex[:8]
+
 @app.route('/service-centers/availability', methods=['GET'])
 def get_service_centers():
-    """Get available service centers"""
+    """Get available service centers
+    
+    Responses carry an ETag and Last-Modified derived from the slot inventory's
+    version, so clients can revalidate with If-None-Match / If-Modified-Since
+    and get a 304 while no booking has changed the availability.
+    """
     try:
-        return jsonify(service_centers_data)
+        # Read the version before rendering: the body is then at least that fresh
+        version, modified_at = slot_inventory.version, slot_inventory.modified_at
+        cached_version, body = availability_cache["entry"]
+        if cached_version != version:
+            # Availability lists only the slots that can still be booked
+            centers = [
+                {**center, "availability": slot_inventory.free_slots(center["id"])}
+                for center in service_centers_data["centers"]
+            ]
+            body = json.dumps({**service_centers_data, "centers": centers}).encode()
+            availability_cache["entry"] = (version, body)
+        
+        response = Response(body, mimetype='application/json')
+        response.set_etag(f"{availability_epoch}-{version}")
+        response.last_modified = modified_at
+        return response.make_conditional(request)
     except Exception as e:
         logger.error(f"Error fetching service centers: {str(e)}")
         return jsonify({"error": "Internal server error"}), 500
 
+def normalize_preferred_date(center_id: str, preferred_date) -> Tuple[Optional[str], Optional[str]]:
+    """Validate a booking's preferred date; returns (date, None) or (None, error message)
+    
+    Exact slots keep their spelling; any other date or timestamp (a trailing Z
+    included) becomes a naive ISO lower bound, so it orders correctly against
+    the center's slots.
+    """
+    if preferred_date is None:
+        return None, None
+    if not isinstance(preferred_date, str):
+        return None, f"Invalid preferred_date: {preferred_date!r}"
+    if preferred_date in slot_inventory.centers[center_id].booked:
+        return preferred_date, None
+    try:
+        parsed = datetime.fromisoformat(preferred_date.replace('Z', '+00:00'))
+    except ValueError:
+        return None, f"Invalid preferred_date: {preferred_date!r}"
+    return parsed.replace(tzinfo=None).isoformat(), None
+
+def slot_request(center_id: str, preferred_date: Optional[str]) -> Tuple[Optional[str], Optional[str]]:
+    """(slot, not_before) for a booking: the preferred slot itself if the center
+    has it, otherwise the next free slot from the preferred date on"""
+    if preferred_date in slot_inventory.centers[center_id].booked:
+        return preferred_date, None
+    return None, preferred_date
+
+def booking_confirmation(center: Dict, booking_data: Dict, booking_id: str, appointment_date: str) -> Dict:
+    return {
+        "booking_id": booking_id,
+        "status": "confirmed",
+        "center_id": center['id'],
+        "center_name": center['name'],
+        "customer_id": booking_data.get('customer_id'),
+        "vin": booking_data.get('vin'),
+        "service_type": booking_data.get('service_type'),
+        "appointment_date": appointment_date,
+        "estimated_duration": "2-3 hours",
+        "estimated_cost": random.randint(1000, 5000),
+        "confirmation_code": f"CONF_{random.randint(100000, 999999)}",
+        "created_at": datetime.now().isoformat()
+    }
+
+def booking_conflict(center_id: str, conflict: SlotConflict) -> Dict:
+    return {
+        "error": str(conflict),
+        "status": "conflict",
+        "center_id": center_id,
+        "next_available": conflict.next_available
+    }
+
 @app.route('/service-centers/<center_id>/book', methods=['POST'])
 def book_service(center_id):
     """Book a service appointment"""
@@ -293,32 +558,24 @@ def book_service(center_id):
         booking_data = request.get_json()
         
         # Find the service center
-        center = None
-        for sc in service_centers_data['centers']:
-            if sc['id'] == center_id:
-                center = sc
-                break
+        center = service_centers_by_id.get(center_id)
         
         if not center:
             return jsonify({"error": "Service center not found"}), 404
         
+        preferred_date, error = normalize_preferred_date(center_id, booking_data.get('preferred_date'))
+        if error:
+            return jsonify({"error": error, "status": "invalid", "center_id": center_id}), 400
+        
+        # Reserve the preferred slot, or the next free one when no exact slot is requested
+        slot, not_before = slot_request(center_id, preferred_date)
+        try:
+            booking_id, appointment_date = slot_inventory.reserve(center_id, slot=slot, not_before=not_before)
+        except SlotConflict as conflict:
+            return jsonify(booking_conflict(center_id, conflict)), 409
+        
         # Generate booking confirmation
-        booking_id = f"BOOK_{uuid.uuid4().hex[:8].upper()}"
-        
-        booking_result = {
-            "booking_id": booking_id,
-            "status": "confirmed",
-            "center_id": center_id,
-            "center_name": center['name'],
-            "customer_id": booking_data.get('customer_id'),
-            "vin": booking_data.get('vin'),
-            "service_type": booking_data.get('service_type'),
-            "appointment_date": booking_data.get('preferred_date'),
-            "estimated_duration": "2-3 hours",
-            "estimated_cost": random.randint(1000, 5000),
-            "confirmation_code": f"CONF_{random.randint(100000, 999999)}",
-            "created_at": datetime.now().isoformat()
-        }
+        booking_result = booking_confirmation(center, booking_data, booking_id, appointment_date)
         
         logger.info(f"Service booking created: {booking_id} for {booking_data.get('vin')}")
         return jsonify(booking_result)
@@ -327,6 +584,121 @@ def book_service(center_id):
         logger.error(f"Error booking service: {str(e)}")
         return jsonify({"error": "Booking failed"}), 500
 
+def normalize_bulk_item(booking_data) -> Tuple[Optional[Dict], Optional[Dict]]:
+    """Validate one bulk booking item; returns (item, None) or (None, per-item error)"""
+    if not isinstance(booking_data, dict):
+        return None, {"error": "Booking must be an object", "status": "invalid", "code": 400, "center_id": None}
+    center_id = booking_data.get('center_id')
+    if not isinstance(center_id, str) or center_id not in service_centers_by_id:
+        return None, {"error": "Service center not found", "status": "not_found", "code": 404,
+                      "center_id": center_id if isinstance(center_id, str) else None}
+    preferred_date, error = normalize_preferred_date(center_id, booking_data.get('preferred_date'))
+    if error:
+        return None, {"error": error, "status": "invalid", "code": 400, "center_id": center_id}
+    return {**booking_data, "preferred_date": preferred_date}, None
+
+# Outcomes of recent bulk bookings by client batch id (None while in progress),
+# so a client retrying after a timeout or 5xx gets the original result back
+# instead of booking the same vehicles twice
+bulk_booking_batches: "OrderedDict[str, Optional[Dict]]" = OrderedDict()
+bulk_booking_lock = threading.Lock()
+
+@app.route('/service-centers/bookings/bulk', methods=['POST'])
+def book_service_bulk():
+    """Book many service appointments in one request
+    
+    Body: {"bookings": [{"center_id", "vin", "customer_id", "service_type",
+    "preferred_date"}, ...], "all_or_nothing": false, "batch_id": "..."}.
+    Every item is validated before anything is reserved; invalid items get a
+    per-item error. Valid items are grouped by center and each group is
+    reserved under that center's lock, so no other booking interleaves with
+    it; with all_or_nothing, one conflict fails the center's whole group. If
+    the request fails midway, everything it reserved is released. Results come
+    back in request order, each a confirmation or a conflict shaped like the
+    single booking endpoint's. Repeating a batch_id replays the first result.
+    """
+    payload = request.get_json(silent=True) or {}
+    bookings = payload.get('bookings', [])
+    all_or_nothing = bool(payload.get('all_or_nothing', False))
+    batch_id = payload.get('batch_id')
+    
+    if not isinstance(bookings, list) or len(bookings) > MOCKAPI_BULK_MAX_BOOKINGS:
+        return jsonify({"error": f"bookings must be a list of at most {MOCKAPI_BULK_MAX_BOOKINGS} items"}), 400
+    if batch_id is not None and not isinstance(batch_id, str):
+        return jsonify({"error": "batch_id must be a string"}), 400
+    
+    if batch_id is not None:
+        with bulk_booking_lock:
+            if batch_id in bulk_booking_batches:
+                previous = bulk_booking_batches[batch_id]
+                if previous is None:
+                    return jsonify({"error": "Batch is still being processed", "status": "in_progress",
+                                    "batch_id": batch_id}), 409
+                return jsonify(previous)
+            bulk_booking_batches[batch_id] = None
+            while len(bulk_booking_batches) > MOCKAPI_BULK_BATCH_RETENTION:
+                bulk_booking_batches.popitem(last=False)
+    
+    reserved: List[str] = []
+    try:
+        results: List[Optional[Dict]] = [None] * len(bookings)
+        items: List[Optional[Dict]] = [None] * len(bookings)
+        by_center: Dict[str, List[int]] = {}
+        for position, booking_data in enumerate(bookings):
+            items[position], results[position] = normalize_bulk_item(booking_data)
+            if items[position] is not None:
+                by_center.setdefault(items[position]['center_id'], []).append(position)
+        
+        for center_id, positions in by_center.items():
+            requests = [slot_request(center_id, items[position]['preferred_date']) for position in positions]
+            outcomes = slot_inventory.reserve_many(center_id, requests, all_or_nothing)
+            reserved.extend(outcome[0] for outcome in outcomes if not isinstance(outcome, SlotConflict))
+            for position, outcome in zip(positions, outcomes):
+                if isinstance(outcome, SlotConflict):
+                    results[position] = booking_conflict(center_id, outcome)
+                else:
+                    results[position] = booking_confirmation(service_centers_by_id[center_id], items[position], *outcome)
+        
+        confirmed = len(reserved)
+        body = {
+            "batch_id": batch_id,
+            "results": results,
+            "total": len(results),
+            "confirmed": confirmed,
+            "conflicts": sum(1 for result in results if result["status"] == "conflict"),
+            "invalid": sum(1 for item in items if item is None)
+        }
+        if batch_id is not None:
+            with bulk_booking_lock:
+                bulk_booking_batches[batch_id] = body
+        logger.info(f"Bulk booking: {confirmed}/{len(results)} confirmed across {len(by_center)} centers")
+        return jsonify(body)
+        
+    except Exception as e:
+        # Nothing from a failed request stays booked, so retrying it is safe
+        for booking_id in reserved:
+            slot_inventory.release(booking_id)
+        if batch_id is not None:
+            with bulk_booking_lock:
+                bulk_booking_batches.pop(batch_id, None)
+        logger.error(f"Error in bulk booking: {str(e)}")
+        return jsonify({"error": "Bulk booking failed"}), 500
+
+@app.route('/service-centers/bookings/<booking_id>', methods=['DELETE'])
+def cancel_booking(booking_id):
+    """Cancel a booking and return its slot to the inventory"""
+    booking = slot_inventory.release(booking_id)
+    if booking is None:
+        return jsonify({"error": "Booking not found"}), 404
+    return jsonify({"booking_id": booking_id, "status": "cancelled", "center_id": booking[0], "slot": booking[1]})
+
+@app.route('/service-centers/<center_id>/inventory', methods=['GET'])
+def get_center_inventory(center_id):
+    """Slot and capacity utilization for a service center"""
+    if center_id not in slot_inventory.centers:
+        return jsonify({"error": "Service center not found"}), 404
+    return jsonify({"center_id": center_id, **slot_inventory.utilization(center_id)})
+
 @app.route('/manufacturing/feedback', methods=['POST'])
 def submit_manufacturing_feedback():
     """Submit feedback to manufacturing team"""
@@ -353,48 +725,65 @@ def submit_manufacturing_feedback():
         logger.error(f"Error submitting manufacturing feedback: {str(e)}")
         return jsonify({"error": "Feedback submission failed"}), 500
 
+def score_ueba_event(monitoring_data: Dict) -> Dict:
+    """Simulate UEBA analysis for a single agent action"""
+    agent_id = monitoring_data.get('agent_id', 'unknown')
+    action = monitoring_data.get('action', 'unknown')
+    
+    # Calculate risk score based on action type
+    risk_factors = {
+        'data_access': 0.2,
+        'customer_contact': 0.3,
+        'service_booking': 0.1,
+        'manufacturing_feedback': 0.4,
+        'emergency_override': 0.8
+    }
+    
+    base_risk = risk_factors.get(action, 0.5)
+    risk_score = base_risk + random.uniform(-0.1, 0.1)
+    risk_score = max(0.0, min(1.0, risk_score))
+    
+    return {
+        "monitoring_id": f"UEBA_{uuid.uuid4().hex[:8].upper()}",
+        "agent_id": agent_id,
+        "action": action,
+        "risk_score": round(risk_score, 3),
+        "risk_level": "HIGH" if risk_score > 0.7 else "MEDIUM" if risk_score > 0.4 else "LOW",
+        "anomaly_detected": risk_score > 0.7,
+        "recommended_action": "BLOCK" if risk_score > 0.7 else "MONITOR" if risk_score > 0.4 else "ALLOW",
+        "timestamp": datetime.now().isoformat(),
+        "confidence": random.uniform(0.8, 0.95)
+    }
+
 @app.route('/ueba/monitor', methods=['POST'])
 def ueba_monitor():
     """UEBA security monitoring endpoint"""
     try:
         monitoring_data = request.get_json()
+        ueba_result = score_ueba_event(monitoring_data)
         
-        # Simulate UEBA analysis
-        agent_id = monitoring_data.get('agent_id', 'unknown')
-        action = monitoring_data.get('action', 'unknown')
-        
-        # Calculate risk score based on action type
-        risk_factors = {
-            'data_access': 0.2,
-            'customer_contact': 0.3,
-            'service_booking': 0.1,
-            'manufacturing_feedback': 0.4,
-            'emergency_override': 0.8
-        }
-        
-        base_risk = risk_factors.get(action, 0.5)
-        risk_score = base_risk + random.uniform(-0.1, 0.1)
-        risk_score = max(0.0, min(1.0, risk_score))
-        
-        ueba_result = {
-            "monitoring_id": f"UEBA_{uuid.uuid4().hex[:8].upper()}",
-            "agent_id": agent_id,
-            "action": action,
-            "risk_score": round(risk_score, 3),
-            "risk_level": "HIGH" if risk_score > 0.7 else "MEDIUM" if risk_score > 0.4 else "LOW",
-            "anomaly_detected": risk_score > 0.7,
-            "recommended_action": "BLOCK" if risk_score > 0.7 else "MONITOR" if risk_score > 0.4 else "ALLOW",
-            "timestamp": datetime.now().isoformat(),
-            "confidence": random.uniform(0.8, 0.95)
-        }
-        
-        logger.info(f"UEBA monitoring: {agent_id} - Risk: {risk_score:.3f}")
+        logger.info(f"UEBA monitoring: {ueba_result['agent_id']} - Risk: {ueba_result['risk_score']:.3f}")
         return jsonify(ueba_result)
         
     except Exception as e:
         logger.error(f"Error in UEBA monitoring: {str(e)}")
         return jsonify({"error": "UEBA monitoring failed"}), 500
 
+@app.route('/ueba/monitor/batch', methods=['POST'])
+def ueba_monitor_batch():
+    """UEBA monitoring for a batch of already-actioned agent events"""
+    try:
+        events = request.get_json().get('events', [])
+        results = [score_ueba_event(event) for event in events]
+        
+        high_risk = len([r for r in results if r["anomaly_detected"]])
+        logger.info(f"UEBA batch monitoring: {len(results)} events, {high_risk} high risk")
+        return jsonify({"results": results, "total_events": len(results), "high_risk_events": high_risk})
+        
+    except Exception as e:
+        logger.error(f"Error in UEBA batch monitoring: {str(e)}")
+        return jsonify({"error": "UEBA batch monitoring failed"}), 500
+
 @app.route('/analytics/predictions', methods=['POST'])
 def get_predictions():
     """Get failure predictions for analytics"""
@@ -455,5 +844,6 @@ def internal_error(error):
     return jsonify({"error": "Internal server error"}), 500
 
 if __name__ == '__main__':
+    # Development server only; containers run under gunicorn (see gunicorn.conf.py)
     logger.info("Starting Mock API Server...")
-    app.run(host='0.0.0.0', port=8000, debug=False)
+    app.run(host='0.0.0.0', port=8000, debug=False, threaded=True)
@@ -0,0 +1,19 @@
+"""
+Gunicorn configuration for the Mock API Server
+Threaded workers so slow (latency-injected) requests do not serialize the whole API
+"""
+
+import os
+
+bind = f"0.0.0.0:{os.getenv('MOCKAPI_PORT', '8000')}"
+worker_class = "gthread"
+# Each worker process holds its own copy of the mock data and the slot
+# inventory, so more than one process lets bookings overlap across processes
+workers = int(os.getenv("MOCKAPI_WORKERS", "1"))
+threads = int(os.getenv("MOCKAPI_THREADS", "64"))
+backlog = int(os.getenv("MOCKAPI_BACKLOG", "2048"))
+keepalive = int(os.getenv("MOCKAPI_KEEPALIVE", "30"))
+timeout = int(os.getenv("MOCKAPI_TIMEOUT", "60"))
+preload_app = True  # Load data once and share it copy-on-write across workers
+accesslog = None
+loglevel = os.getenv("LOG_LEVEL", "info").lower()
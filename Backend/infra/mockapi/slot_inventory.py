@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Slot Inventory for the Mock API Server
+Concurrency-safe reservation of service-center time slots with capacity accounting
+"""
+
+import threading
+import time
+import uuid
+from bisect import bisect_left
+from typing import Dict, List, Optional, Tuple, Union
+
+class SlotConflict(Exception):
+    """The requested slot cannot be reserved"""
+
+    def __init__(self, message: str, next_available: Optional[str] = None):
+        super().__init__(message)
+        self.next_available = next_available
+
+class CenterInventory:
+    """Slots of one service center, guarded by the center's own lock
+
+    Every availability slot takes up to ``bookings_per_slot`` vehicles and each
+    day at most ``capacity`` vehicles. ``free`` holds the slots that can still
+    be booked in time order, so the next free slot is a binary search; a slot
+    leaves it when full or when its day reaches capacity.
+    """
+
+    def __init__(self, center_id: str, slots: List[str], capacity: int, bookings_per_slot: int):
+        self.center_id = center_id
+        self.capacity = capacity
+        self.bookings_per_slot = bookings_per_slot
+        self.lock = threading.Lock()
+        self.booked: Dict[str, int] = {slot: 0 for slot in slots}
+        self.day_booked: Dict[str, int] = {}
+        self.free: List[str] = sorted(self.booked)
+        self.day_slots: Dict[str, List[str]] = {}
+        for slot in self.free:
+            self.day_slots.setdefault(self._day(slot), []).append(slot)
+
+    @staticmethod
+    def _day(slot: str) -> str:
+        return slot[:10]
+
+    def _bookable(self, slot: str) -> bool:
+        return (self.booked[slot] < self.bookings_per_slot
+                and self.day_booked.get(self._day(slot), 0) < self.capacity)
+
+    def _refresh_day(self, day: str):
+        """Re-derive free-list membership for the slots of one day"""
+        for slot in self.day_slots.get(day, ()):
+            i = bisect_left(self.free, slot)
+            listed = i < len(self.free) and self.free[i] == slot
+            if self._bookable(slot) and not listed:
+                self.free.insert(i, slot)
+            elif not self._bookable(slot) and listed:
+                del self.free[i]
+
+    def next_free(self, not_before: Optional[str] = None) -> Optional[str]:
+        """Earliest bookable slot at or after ``not_before``"""
+        i = bisect_left(self.free, not_before) if not_before else 0
+        return self.free[i] if i < len(self.free) else None
+
+    def free_slots(self) -> List[str]:
+        return list(self.free)
+
+    def _reserve_locked(self, slot: Optional[str], not_before: Optional[str]) -> str:
+        if slot is None:
+            slot = self.next_free(not_before)
+            if slot is None:
+                raise SlotConflict(f"No free slots at {self.center_id}")
+        elif slot not in self.booked:
+            raise SlotConflict(f"{slot} is not a slot at {self.center_id}", self.next_free(slot))
+        elif not self._bookable(slot):
+            raise SlotConflict(f"{slot} is fully booked at {self.center_id}", self.next_free(slot))
+
+        self.booked[slot] += 1
+        day = self._day(slot)
+        self.day_booked[day] = self.day_booked.get(day, 0) + 1
+        self._refresh_day(day)
+        return slot
+
+    def _release_locked(self, slot: str):
+        if self.booked.get(slot, 0) == 0:
+            return
+        self.booked[slot] -= 1
+        day = self._day(slot)
+        self.day_booked[day] -= 1
+        self._refresh_day(day)
+
+    def reserve(self, slot: Optional[str] = None, not_before: Optional[str] = None) -> str:
+        """Reserve ``slot`` exactly, or the next free slot at or after ``not_before``"""
+        with self.lock:
+            return self._reserve_locked(slot, not_before)
+
+    def reserve_many(self, requests: List[Tuple[Optional[str], Optional[str]]],
+                     all_or_nothing: bool = False) -> List[Union[str, SlotConflict]]:
+        """Reserve several ``(slot, not_before)`` requests under one lock hold
+
+        No other booking can interleave with the group. Each request yields its
+        slot or the ``SlotConflict`` it raised; with ``all_or_nothing`` any
+        conflict releases the slots already taken and fails the whole group.
+        Any other exception releases the group's slots and propagates.
+        """
+        with self.lock:
+            outcomes: List[Union[str, SlotConflict]] = []
+            try:
+                for slot, not_before in requests:
+                    try:
+                        outcomes.append(self._reserve_locked(slot, not_before))
+                    except SlotConflict as conflict:
+                        outcomes.append(conflict)
+            except Exception:
+                # Anything but a conflict aborts the group without keeping its slots
+                for outcome in outcomes:
+                    if not isinstance(outcome, SlotConflict):
+                        self._release_locked(outcome)
+                raise
+
+            failed = next((o for o in outcomes if isinstance(o, SlotConflict)), None)
+            if all_or_nothing and failed is not None:
+                for outcome in outcomes:
+                    if not isinstance(outcome, SlotConflict):
+                        self._release_locked(outcome)
+                outcomes = [o if isinstance(o, SlotConflict)
+                            else SlotConflict(f"Rolled back: {failed}", failed.next_available)
+                            for o in outcomes]
+            return outcomes
+
+    def release(self, slot: str):
+        with self.lock:
+            self._release_locked(slot)
+
+class SlotInventory:
+    """Per-center slot inventories plus the ledger of confirmed bookings"""
+
+    def __init__(self, centers: List[Dict], bookings_per_slot: int = 1):
+        self.centers: Dict[str, CenterInventory] = {
+            center["id"]: CenterInventory(
+                center["id"],
+                center.get("availability") or [],
+                center.get("capacity") or 1,
+                bookings_per_slot
+            )
+            for center in centers
+        }
+        self.bookings: Dict[str, Tuple[str, str]] = {}
+        # Bumped on every change so clients can revalidate cached availability
+        self.version = 0
+        self.modified_at = time.time()
+        self._version_lock = threading.Lock()
+
+    def _touch(self):
+        with self._version_lock:
+            self.version += 1
+            self.modified_at = time.time()
+
+    def reserve(self, center_id: str, slot: Optional[str] = None,
+                not_before: Optional[str] = None) -> Tuple[str, str]:
+        """Reserve a slot and record it; returns (booking_id, slot)"""
+        inventory = self.centers.get(center_id)
+        if inventory is None:
+            raise KeyError(center_id)
+        reserved = inventory.reserve(slot, not_before)
+        self._touch()
+        return self._record(center_id, reserved), reserved
+
+    def reserve_many(self, center_id: str, requests: List[Tuple[Optional[str], Optional[str]]],
+                     all_or_nothing: bool = False) -> List[Union[Tuple[str, str], SlotConflict]]:
+        """Reserve a group of requests at one center atomically; see ``CenterInventory.reserve_many``"""
+        inventory = self.centers.get(center_id)
+        if inventory is None:
+            raise KeyError(center_id)
+        outcomes = inventory.reserve_many(requests, all_or_nothing)
+        if not all(isinstance(outcome, SlotConflict) for outcome in outcomes):
+            self._touch()
+        return [
+            outcome if isinstance(outcome, SlotConflict) else (self._record(center_id, outcome), outcome)
+            for outcome in outcomes
+        ]
+
+    def _record(self, center_id: str, slot: str) -> str:
+        booking_id = f"BOOK_{uuid.uuid4().hex[:8].upper()}"
+        self.bookings[booking_id] = (center_id, slot)
+        return booking_id
+
+    def release(self, booking_id: str) -> Optional[Tuple[str, str]]:
+        """Cancel a booking, returning its (center_id, slot) if it existed"""
+        booking = self.bookings.pop(booking_id, None)
+        if booking is not None:
+            self.centers[booking[0]].release(booking[1])
+            self._touch()
+        return booking
+
+    def free_slots(self, center_id: str) -> List[str]:
+        return self.centers[center_id].free_slots()
+
+    def utilization(self, center_id: str) -> Dict:
+        inventory = self.centers[center_id]
+        with inventory.lock:
+            return {
+                "slots": len(inventory.booked),
+                "free_slots": len(inventory.free),
+                "bookings": sum(inventory.booked.values()),
+                "daily_capacity": inventory.capacity,
+                "bookings_by_day": dict(inventory.day_booked)
+            }
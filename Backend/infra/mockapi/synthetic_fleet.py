@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+Synthetic Fleet Generator for the Mock API Server
+Deterministically generates vehicles, customers and service centers on demand
+"""
+
+import random
+from collections.abc import Mapping
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List, Optional
+
+# Base date for generated records; the seed picks a day within the following year
+FLEET_EPOCH = datetime(2024, 1, 1)
+
+CITIES = [
+    # (city, state, latitude, longitude)
+    ("Bangalore", "Karnataka", 12.9716, 77.5946),
+    ("Mumbai", "Maharashtra", 19.0760, 72.8777),
+    ("Delhi", "Delhi", 28.7041, 77.1025),
+    ("Chennai", "Tamil Nadu", 13.0827, 80.2707),
+    ("Hyderabad", "Telangana", 17.3850, 78.4867),
+    ("Pune", "Maharashtra", 18.5204, 73.8567),
+    ("Kolkata", "West Bengal", 22.5726, 88.3639),
+    ("Ahmedabad", "Gujarat", 23.0225, 72.5714),
+    ("Jaipur", "Rajasthan", 26.9124, 75.7873),
+    ("Lucknow", "Uttar Pradesh", 26.8467, 80.9462),
+]
+
+VEHICLE_MODELS = [
+    # (make, model, engine_type)
+    ("Hero", "Splendor", "4-stroke"),
+    ("Hero", "Passion Pro", "4-stroke"),
+    ("Mahindra", "XUV300", "Diesel"),
+    ("Mahindra", "Scorpio", "Diesel"),
+    ("Maruti", "Swift", "Petrol"),
+    ("Tata", "Nexon", "Petrol"),
+    ("Honda", "City", "Petrol"),
+    ("Bajaj", "Pulsar", "4-stroke"),
+]
+
+DTC_POOL = ["P0301", "P0302", "P0303", "P0304", "P0171", "P0172", "P0420", "P0430",
+            "P0443", "P0445", "P0700", "P0701", "P0102", "P0103", "P0011"]
+SERVICE_TYPES = ["Oil Change", "General Checkup", "Transmission Service", "Brake Service", "Battery Replacement"]
+SPECIALIZATIONS = ["Engine", "Diesel Engine", "Transmission", "Electrical", "Suspension", "Brakes", "Emission"]
+SERVICES_OFFERED = ["General Maintenance", "Emergency Repair", "Warranty Service", "Fleet Service"]
+FIRST_NAMES = ["Rajesh", "Priya", "Amit", "Sneha", "Vikram", "Anita", "Arjun", "Kavya", "Rahul", "Meera"]
+LAST_NAMES = ["Kumar", "Sharma", "Patel", "Reddy", "Singh", "Iyer", "Gupta", "Nair", "Das", "Rao"]
+LANGUAGES = ["Hindi", "English", "Tamil", "Kannada", "Marathi"]
+
+VIN_PREFIX = "SYN"
+CUSTOMER_PREFIX = "SCUST"
+CENTER_PREFIX = "SSC"
+
+class SyntheticFleet:
+    """Seedable fleet whose records are generated from their index on demand
+
+    Record ``i`` is always produced from its own RNG seeded by ``(seed, i)``, so
+    any vehicle or customer can be generated in isolation, in any order, with
+    identical results and without holding the fleet in memory. Identifiers
+    encode the index (``SYN00000000000042``) so lookups are O(1). Vehicle ``i``
+    belongs to customer ``i % customer_count``.
+    """
+
+    def __init__(self, vehicle_count: int, customer_count: Optional[int] = None,
+                 center_count: int = 200, seed: int = 42, start_date: Optional[datetime] = None):
+        self.vehicle_count = vehicle_count
+        self.customer_count = max(1, customer_count or vehicle_count)
+        self.center_count = center_count
+        self.seed = seed
+        # Dates are anchored to a fixed day derived from the seed, so the same
+        # seed yields the same fleet on every run
+        self.start_date = (start_date or FLEET_EPOCH + timedelta(days=seed % 365)).replace(
+            hour=0, minute=0, second=0, microsecond=0)
+        self._centers = [self._generate_center(k) for k in range(center_count)]
+
+    def _rng(self, kind: int, index: int) -> random.Random:
+        return random.Random((self.seed * 4 + kind) * 1_000_000_007 + index)
+
+    @staticmethod
+    def _parse_index(identifier: str, prefix: str, count: int, make_id) -> Optional[int]:
+        """Index encoded in ``identifier``, or None unless it is the canonical id
+        
+        Only the exact spelling ``make_id`` produces is accepted, so other zero
+        paddings or digit forms cannot alias the same record.
+        """
+        if not identifier.startswith(prefix):
+            return None
+        digits = identifier[len(prefix):]
+        if not (digits.isascii() and digits.isdigit()):
+            return None
+        index = int(digits)
+        return index if index < count and make_id(index) == identifier else None
+
+    def vin(self, index: int) -> str:
+        return f"{VIN_PREFIX}{index:014d}"
+
+    def customer_id(self, index: int) -> str:
+        return f"{CUSTOMER_PREFIX}{index:08d}"
+
+    def vehicle_index(self, vin: str) -> Optional[int]:
+        return self._parse_index(vin, VIN_PREFIX, self.vehicle_count, self.vin)
+
+    def customer_index(self, customer_id: str) -> Optional[int]:
+        return self._parse_index(customer_id, CUSTOMER_PREFIX, self.customer_count, self.customer_id)
+
+    def vehicle(self, index: int) -> Dict:
+        """Generate the telematics record for vehicle ``index``"""
+        rng = self._rng(0, index)
+        make, model, engine_type = rng.choice(VEHICLE_MODELS)
+        year = rng.randint(2015, 2024)
+        mileage = rng.randint(1000, 150000)
+        running = rng.random() < 0.6
+
+        history = []
+        last_date = self.start_date
+        last_mileage = mileage
+        for _ in range(rng.randint(0, 4)):
+            last_date -= timedelta(days=rng.randint(20, 240))
+            last_mileage = max(0, last_mileage - rng.randint(1000, 8000))
+            history.append({
+                "date": last_date.strftime("%Y-%m-%d"),
+                "service_type": rng.choice(SERVICE_TYPES),
+                "mileage": last_mileage,
+                "cost": rng.randint(5, 60) * 100,
+                "center": rng.choice(self._centers)["name"] if self._centers else "Independent Garage"
+            })
+
+        return {
+            "vehicle_info": {
+                "vin": self.vin(index),
+                "make": make,
+                "model": model,
+                "year": year,
+                "engine_type": engine_type,
+                "mileage": mileage
+            },
+            "current_status": {
+                "engine_rpm": rng.randint(700, 3500) if running else 0,
+                "speed": rng.randint(0, 90) if running else 0,
+                "fuel_level": rng.randint(5, 100),
+                "battery_voltage": round(rng.gauss(12.5, 0.4), 2),
+                "engine_temp": rng.randint(75, 110) if running else 0,
+                "oil_pressure": rng.randint(25, 60) if running else 0,
+                "last_updated": self.start_date.isoformat()
+            },
+            "sensor_data": {
+                "ignition_coil_resistance": round(rng.uniform(1.2, 2.8), 2),
+                "spark_plug_gap": round(rng.uniform(0.6, 1.1), 2),
+                "air_filter_condition": round(rng.uniform(0.2, 1.0), 2),
+                "brake_pad_thickness": round(rng.uniform(2.0, 12.0), 1),
+                "tire_pressure": [rng.randint(26, 35) for _ in range(4)],
+                "transmission_fluid_level": round(rng.uniform(0.3, 1.0), 2)
+            },
+            "dtc_codes": rng.sample(DTC_POOL, rng.choice((0, 0, 0, 1, 1, 2, 3))),
+            "maintenance_history": history
+        }
+
+    def customer(self, index: int) -> Dict:
+        """Generate the customer record for customer ``index``"""
+        rng = self._rng(1, index)
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        city, state, lat, lon = rng.choice(CITIES)
+        vehicles = [self.vin(i) for i in range(index, self.vehicle_count, self.customer_count)[:5]]
+
+        return {
+            "customer_id": self.customer_id(index),
+            "name": f"{first} {last}",
+            "phone": f"+91-9{rng.randint(100000000, 999999999)}",
+            "email": f"{first.lower()}.{last.lower()}{index}@email.com",
+            "address": {
+                "street": f"{rng.randint(1, 999)} {rng.choice(['MG Road', 'Park Street', 'Station Road', 'Main Road'])}",
+                "city": city,
+                "state": state,
+                "pincode": f"{rng.randint(110000, 855999)}",
+                "latitude": round(lat + rng.uniform(-0.2, 0.2), 4),
+                "longitude": round(lon + rng.uniform(-0.2, 0.2), 4)
+            },
+            "preferences": {
+                "communication_method": rng.choice(["voice", "app", "sms", "email"]),
+                "service_reminders": rng.random() < 0.8,
+                "language": rng.choice(LANGUAGES),
+                "preferred_time": rng.choice(["morning", "afternoon", "evening"])
+            },
+            "vehicles": vehicles,
+            "service_history": {
+                "total_services": rng.randint(0, 12),
+                "last_service_date": (self.start_date - timedelta(days=rng.randint(10, 400))).strftime("%Y-%m-%d"),
+                "satisfaction_score": round(rng.uniform(3.0, 5.0), 1),
+                "loyalty_tier": rng.choice(["Bronze", "Silver", "Gold", "Platinum"])
+            }
+        }
+
+    def _generate_center(self, index: int) -> Dict:
+        rng = self._rng(2, index)
+        city, state, lat, lon = CITIES[index % len(CITIES)]
+        make = rng.choice(VEHICLE_MODELS)[0]
+
+        slots = []
+        for day in range(1, 15):
+            date = self.start_date + timedelta(days=day)
+            for hour in sorted(rng.sample(range(8, 18), rng.randint(1, 4))):
+                slots.append(date.replace(hour=hour).isoformat())
+
+        return {
+            "id": f"{CENTER_PREFIX}{index:04d}",
+            "name": f"{make} Service Center {city} {index // len(CITIES) + 1}",
+            "location": f"{city}, {state}",
+            "address": f"{rng.randint(1, 999)} Service Road, {city}",
+            "phone": f"+91-{rng.randint(10, 99)}-{rng.randint(10000000, 99999999)}",
+            "latitude": round(lat + rng.uniform(-0.3, 0.3), 4),
+            "longitude": round(lon + rng.uniform(-0.3, 0.3), 4),
+            "capacity": rng.choice([25, 40, 50, 75, 100]),
+            "specializations": rng.sample(SPECIALIZATIONS, rng.randint(2, 4)),
+            "availability": slots,
+            "ratings": round(rng.uniform(3.5, 4.9), 1),
+            "services_offered": rng.sample(SERVICES_OFFERED, rng.randint(2, 4))
+        }
+
+    def centers(self) -> List[Dict]:
+        """All service centers (small enough to keep materialized)"""
+        return self._centers
+
+    def vehicles(self) -> "SyntheticRecords":
+        return SyntheticRecords(self.vehicle_count, self.vehicle_index, self.vin, self.vehicle)
+
+    def customers(self) -> "SyntheticRecords":
+        return SyntheticRecords(self.customer_count, self.customer_index, self.customer_id, self.customer)
+
+class SyntheticRecords(Mapping):
+    """Read-only mapping view over generated records; nothing is cached"""
+
+    def __init__(self, count: int, parse, make_id, generate):
+        self._count = count
+        self._parse = parse
+        self._make_id = make_id
+        self._generate = generate
+
+    def __getitem__(self, key: str) -> Dict:
+        index = self._parse(key) if isinstance(key, str) else None
+        if index is None:
+            raise KeyError(key)
+        return self._generate(index)
+
+    def __contains__(self, key) -> bool:
+        return isinstance(key, str) and self._parse(key) is not None
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __iter__(self) -> Iterator[str]:
+        return (self._make_id(i) for i in range(self._count))
+
+    def ids(self, offset: int = 0, limit: int = 100) -> List[str]:
+        return [self._make_id(i) for i in range(offset, min(offset + limit, self._count))]
+
+class LayeredRecords(Mapping):
+    """Lookups fall through from the sample data to the synthetic fleet"""
+
+    def __init__(self, *layers: Mapping):
+        self.layers = layers
+
+    def __getitem__(self, key):
+        for layer in self.layers:
+            if key in layer:
+                return layer[key]
+        raise KeyError(key)
+
+    def __contains__(self, key) -> bool:
+        return any(key in layer for layer in self.layers)
+
+    def __len__(self) -> int:
+        return sum(len(layer) for layer in self.layers)
+
+    def __iter__(self) -> Iterator:
+        for layer in self.layers:
+            yield from layer
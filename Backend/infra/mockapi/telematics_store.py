@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+Columnar Telematics Store for the Mock API Server
+Memory-mapped, fixed-schema columns with a sorted VIN index
+
+Layout of a store directory:
+    meta.json            row count, VIN width, column list and category tables
+    vin.npy              sorted fixed-width VINs (row i belongs to vin[i])
+    <column>.npy         one numeric column per fixed-schema field
+    tire_pressure.npy    rows x 4
+    extra.bin/.idx.npy   per-row JSON for the ragged parts (DTC codes,
+                         maintenance history, any non-schema fields)
+
+Usage:
+    python telematics_store.py --out data/telematics_store --from-json data/telematics.json
+    python telematics_store.py --out data/telematics_store --synthetic 1000000 --seed 42
+"""
+
+import argparse
+import json
+import os
+from collections.abc import Mapping
+from typing import Dict, Iterable, Iterator, Optional, Tuple
+
+import numpy as np
+
+CATEGORY_COLUMNS = ["make", "model", "engine_type"]
+VEHICLE_COLUMNS = {"year": np.int16, "mileage": np.int32}
+STATUS_COLUMNS = ["engine_rpm", "speed", "fuel_level", "battery_voltage", "engine_temp", "oil_pressure"]
+SENSOR_COLUMNS = ["ignition_coil_resistance", "spark_plug_gap", "air_filter_condition",
+                  "brake_pad_thickness", "transmission_fluid_level"]
+TIRE_COUNT = 4
+BUILD_CHUNK_ROWS = 8192
+
+def _number(value: float):
+    """Emit whole numbers as ints so records round-trip like the JSON source"""
+    return int(value) if value.is_integer() else value
+
+def build_store(records: Iterable[Tuple[str, Dict]], count: int, path: str, vin_width: int = 17):
+    """Write ``count`` (vin, record) pairs, already sorted by VIN, as a columnar store
+
+    Rows are parsed in chunks and copied into memory-mapped columns, so arbitrarily large
+    fleets can be built without holding them in memory.
+    """
+    os.makedirs(path, exist_ok=True)
+
+    def column(name, dtype, shape=(count,), fill=0):
+        array = np.lib.format.open_memmap(os.path.join(path, f"{name}.npy"), mode="w+", dtype=dtype, shape=shape)
+        array[...] = fill
+        return array
+
+    vins = column("vin", f"S{vin_width}", fill=b"")
+    categories = {name: {} for name in CATEGORY_COLUMNS}
+    category_codes = {name: column(name, np.uint16) for name in CATEGORY_COLUMNS}
+    vehicle = {name: column(name, dtype) for name, dtype in VEHICLE_COLUMNS.items()}
+    numeric = {name: column(name, np.float64, fill=np.nan) for name in STATUS_COLUMNS + SENSOR_COLUMNS}
+    tires = column("tire_pressure", np.float64, (count, TIRE_COUNT), fill=np.nan)
+    extra_index = column("extra.idx", np.int64, (count + 1,))
+
+    previous = None
+    offset = 0
+    written = 0
+    chunk = []
+
+    def flush_chunk():
+        """Copy a chunk of parsed rows into the column maps with slice assignments"""
+        lo, hi = written - len(chunk), written
+        vins[lo:hi] = [row["vin"] for row in chunk]
+        for name in CATEGORY_COLUMNS:
+            category_codes[name][lo:hi] = [row[name] for row in chunk]
+        for name in VEHICLE_COLUMNS:
+            vehicle[name][lo:hi] = [row[name] for row in chunk]
+        for name in numeric:
+            numeric[name][lo:hi] = [row[name] for row in chunk]
+        tires[lo:hi] = [row["tire_pressure"] for row in chunk]
+        extra_index[lo + 1:hi + 1] = [row["offset"] for row in chunk]
+        chunk.clear()
+
+    with open(os.path.join(path, "extra.bin"), "wb") as extra:
+        for vin, record in records:
+            if previous is not None and vin <= previous:
+                raise ValueError(f"Records must be sorted by VIN: {vin} after {previous}")
+            previous = vin
+
+            info = dict(record.get("vehicle_info", {}))
+            status = dict(record.get("current_status", {}))
+            sensors = dict(record.get("sensor_data", {}))
+            info.pop("vin", None)
+            status.pop("last_updated", None)
+
+            row = {"vin": vin.encode()}
+            for name in CATEGORY_COLUMNS:
+                table = categories[name]
+                row[name] = table.setdefault(info.pop(name, ""), len(table))
+            for name in VEHICLE_COLUMNS:
+                row[name] = info.pop(name, 0)
+            for name in STATUS_COLUMNS:
+                row[name] = status.pop(name, np.nan)
+            for name in SENSOR_COLUMNS:
+                row[name] = sensors.pop(name, np.nan)
+            pressures = sensors.pop("tire_pressure", [])[:TIRE_COUNT]
+            row["tire_pressure"] = list(pressures) + [np.nan] * (TIRE_COUNT - len(pressures))
+
+            # Everything outside the fixed schema is kept verbatim
+            rest = {k: v for k, v in record.items() if k not in ("vehicle_info", "current_status", "sensor_data")}
+            if info:
+                rest["vehicle_info"] = info
+            if status:
+                rest["current_status"] = status
+            if sensors:
+                rest["sensor_data"] = sensors
+            blob = json.dumps(rest, separators=(",", ":")).encode()
+            extra.write(blob)
+            offset += len(blob)
+            row["offset"] = offset
+
+            chunk.append(row)
+            written += 1
+            if written > count:
+                raise ValueError(f"Expected {count} records, got more")
+            if len(chunk) == BUILD_CHUNK_ROWS:
+                flush_chunk()
+        if chunk:
+            flush_chunk()
+
+    if written != count:
+        raise ValueError(f"Expected {count} records, got {written}")
+
+    for array in [vins, tires, extra_index, *category_codes.values(), *vehicle.values(), *numeric.values()]:
+        array.flush()
+
+    with open(os.path.join(path, "meta.json"), "w") as f:
+        json.dump({
+            "rows": count,
+            "vin_width": vin_width,
+            "categories": {name: list(table) for name, table in categories.items()},
+            "vehicle_columns": list(VEHICLE_COLUMNS),
+            "status_columns": STATUS_COLUMNS,
+            "sensor_columns": SENSOR_COLUMNS
+        }, f, indent=2)
+
+class ColumnarTelematicsStore(Mapping):
+    """Read-only VIN -> telematics record mapping backed by memory-mapped columns
+
+    Opening a store only maps the files; pages are read lazily as rows are
+    accessed, so startup time and resident memory do not grow with the fleet.
+    Lookups binary-search the sorted VIN column.
+    """
+
+    def __init__(self, path: str):
+        with open(os.path.join(path, "meta.json"), "r") as f:
+            meta = json.load(f)
+
+        def load(name):
+            return np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r")
+
+        self.rows = meta["rows"]
+        self.vins = load("vin")
+        self.categories = {name: (load(name), meta["categories"][name]) for name in CATEGORY_COLUMNS}
+        self.vehicle = {name: load(name) for name in meta["vehicle_columns"]}
+        self.status = {name: load(name) for name in meta["status_columns"]}
+        self.sensors = {name: load(name) for name in meta["sensor_columns"]}
+        self.tires = load("tire_pressure")
+        self.extra_index = load("extra.idx")
+        self.extra = np.memmap(os.path.join(path, "extra.bin"), dtype=np.uint8, mode="r") \
+            if self.extra_index[-1] > 0 else np.zeros(0, dtype=np.uint8)
+
+    def row(self, vin: str) -> Optional[int]:
+        """Row number for a VIN, or None"""
+        try:
+            key = vin.encode()
+        except AttributeError:
+            return None
+        i = int(np.searchsorted(self.vins, key))
+        return i if i < self.rows and self.vins[i] == key else None
+
+    def record(self, i: int) -> Dict:
+        """Assemble the telematics record stored at row ``i``"""
+        extra = json.loads(self.extra[self.extra_index[i]:self.extra_index[i + 1]].tobytes() or b"{}")
+
+        vehicle_info = {"vin": self.vins[i].decode()}
+        for name, (codes, table) in self.categories.items():
+            vehicle_info[name] = table[codes[i]]
+        for name, column in self.vehicle.items():
+            vehicle_info[name] = int(column[i])
+        vehicle_info.update(extra.pop("vehicle_info", {}))
+
+        current_status = {name: _number(float(column[i])) for name, column in self.status.items()
+                          if not np.isnan(column[i])}
+        current_status.update(extra.pop("current_status", {}))
+
+        sensor_data = {name: _number(float(column[i])) for name, column in self.sensors.items()
+                       if not np.isnan(column[i])}
+        pressures = [_number(float(p)) for p in self.tires[i] if not np.isnan(p)]
+        if pressures:
+            sensor_data["tire_pressure"] = pressures
+        sensor_data.update(extra.pop("sensor_data", {}))
+
+        return {
+            "vehicle_info": vehicle_info,
+            "current_status": current_status,
+            "sensor_data": sensor_data,
+            **extra
+        }
+
+    def __getitem__(self, vin: str) -> Dict:
+        i = self.row(vin)
+        if i is None:
+            raise KeyError(vin)
+        return self.record(i)
+
+    def __contains__(self, vin) -> bool:
+        return self.row(vin) is not None
+
+    def __len__(self) -> int:
+        return self.rows
+
+    def __iter__(self) -> Iterator[str]:
+        return (vin.decode() for vin in self.vins)
+
+def main():
+    parser = argparse.ArgumentParser(description="Build a columnar telematics store")
+    parser.add_argument("--out", required=True, help="Store directory to write")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--from-json", help="telematics.json file to convert")
+    source.add_argument("--synthetic", type=int, help="Number of synthetic vehicles to generate")
+    parser.add_argument("--seed", type=int, default=42, help="Synthetic fleet seed")
+    args = parser.parse_args()
+
+    if args.from_json:
+        with open(args.from_json, "r") as f:
+            data = json.load(f)
+        records = sorted(data.items())
+        width = max((len(vin) for vin in data), default=1)
+        build_store(records, len(records), args.out, vin_width=width)
+    else:
+        from synthetic_fleet import SyntheticFleet
+        fleet = SyntheticFleet(args.synthetic, seed=args.seed)
+        records = ((fleet.vin(i), fleet.vehicle(i)) for i in range(args.synthetic))
+        build_store(records, args.synthetic, args.out, vin_width=len(fleet.vin(0)))
+
+    print(f"Wrote {args.from_json or f'{args.synthetic} synthetic vehicles'} to {args.out}")
+
+if __name__ == "__main__":
+    main()
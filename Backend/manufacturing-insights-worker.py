@@ -1,16 +1,22 @@
 # workers/manufacturing_insights/app.py - Manufacturing Insights Worker Agent
 from fastapi import FastAPI
 from pydantic import BaseModel
-import requests
+import os
 import json
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Any
 from datetime import datetime
 from collections import Counter
 
-app = FastAPI(title="Manufacturing Insights Worker", version="1.0")
+from mock_api_client import MockAPIClient
 
 MOCK_API_BASE = "http://mockapi:8000"
 
+MOCK_API_POOL_LIMIT = int(os.getenv("MOCK_API_POOL_LIMIT", "200"))
+
+mock_api = MockAPIClient(MOCK_API_BASE, MOCK_API_POOL_LIMIT)
+
+app = FastAPI(title="Manufacturing Insights Worker", version="1.0", lifespan=mock_api.lifespan)
+
 class ManufacturingTask(BaseModel):
     session_id: str
     vin: str
@@ -164,7 +170,7 @@ def calculate_cost_impact(failure_patterns: Dict) -> Dict:
         "roi_percentage": ((potential_savings - investigation_cost - implementation_cost) / (investigation_cost + implementation_cost)) * 100 if (investigation_cost + implementation_cost) > 0 else 0
     }
 
-def submit_manufacturing_feedback(recommendations: Dict, failure_patterns: Dict) -> Dict:
+async def submit_manufacturing_feedback(recommendations: Dict, failure_patterns: Dict) -> Dict:
     """Submit feedback to manufacturing system"""
     
     feedback_data = {
@@ -176,22 +182,18 @@ def submit_manufacturing_feedback(recommendations: Dict, failure_patterns: Dict)
     }
     
     try:
-        feedback_response = requests.post(
-            f"{MOCK_API_BASE}/manufacturing/feedback",
-            json=feedback_data,
-            timeout=10
-        )
+        status, body = await mock_api.post("/manufacturing/feedback", feedback_data, timeout=10)
         
-        if feedback_response.status_code == 200:
-            return feedback_response.json()
+        if status == 200:
+            return body
         else:
-            return {"error": f"Feedback submission failed: {feedback_response.status_code}"}
+            return {"error": f"Feedback submission failed: {status}"}
     
     except Exception as e:
         return {"error": f"Feedback submission error: {str(e)}"}
 
 @app.post("/task")
-def generate_manufacturing_insights(task: ManufacturingTask):
+async def generate_manufacturing_insights(task: ManufacturingTask):
     """Generate manufacturing insights from failure analysis"""
     try:
         # Analyze failure patterns
@@ -207,7 +209,7 @@ def generate_manufacturing_insights(task: ManufacturingTask):
         )
         
         # Submit feedback to manufacturing team
-        feedback_submission = submit_manufacturing_feedback(
+        feedback_submission = await submit_manufacturing_feedback(
             manufacturing_recommendations,
             failure_patterns
         )
@@ -5,14 +5,18 @@ Coordinates all worker agents and manages the complete workflow
 """
 
 from fastapi import FastAPI, HTTPException, BackgroundTasks
+from fastapi.responses import StreamingResponse
+from collections import OrderedDict, deque
 from pydantic import BaseModel, Field
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Set
 import asyncio
 import aiohttp
+import heapq
 import logging
+import redis.asyncio as aioredis
 import uuid
 import json
-from datetime import datetime, timedelta
+from datetime import datetime
 import os
 from contextlib import asynccontextmanager
 
@@ -23,9 +27,6 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# Global session store
-session_store = {}
-
 class CorrelationIDFilter(logging.Filter):
     def filter(self, record):
         record.correlation_id = getattr(record, 'correlation_id', 'unknown')
@@ -36,6 +37,24 @@ logger.addFilter(CorrelationIDFilter())
 # Configuration
 MOCK_API_URL = os.getenv('MOCK_API_URL', 'http://mockapi:8000')
 UEBA_THRESHOLD = float(os.getenv('UEBA_THRESHOLD', '0.7'))
+WORKER_STEP_TIMEOUT = float(os.getenv('WORKER_STEP_TIMEOUT', '20'))
+WORKFLOW_DEADLINE = float(os.getenv('WORKFLOW_DEADLINE', '30'))
+HTTP_POOL_LIMIT = int(os.getenv('HTTP_POOL_LIMIT', '100'))
+HTTP_KEEPALIVE_TIMEOUT = float(os.getenv('HTTP_KEEPALIVE_TIMEOUT', '30'))
+HTTP_DNS_CACHE_TTL = int(os.getenv('HTTP_DNS_CACHE_TTL', '300'))
+SESSION_BACKEND = os.getenv('SESSION_BACKEND', 'memory')
+REDIS_URL = os.getenv('REDIS_URL', 'redis://redis:6379/0')
+SESSION_TTL_HOURS = float(os.getenv('SESSION_TTL_HOURS', '24'))
+UEBA_EVENT_LOG_SIZE = int(os.getenv('UEBA_EVENT_LOG_SIZE', '100'))
+BATCH_CHUNK_SIZE = int(os.getenv('BATCH_CHUNK_SIZE', '50'))
+BATCH_CHUNK_PARALLELISM = int(os.getenv('BATCH_CHUNK_PARALLELISM', '4'))
+BATCH_MAX_CONCURRENCY = int(os.getenv('BATCH_MAX_CONCURRENCY', '200'))
+BATCH_MAX_VINS = int(os.getenv('BATCH_MAX_VINS', '100000'))
+BATCH_JOB_RETENTION = int(os.getenv('BATCH_JOB_RETENTION', '100'))
+UEBA_BLOCKING_ACTIONS = [a.strip() for a in os.getenv('UEBA_BLOCKING_ACTIONS', 'emergency_override').split(',') if a.strip()]
+UEBA_BASELINE_MIN_SAMPLES = int(os.getenv('UEBA_BASELINE_MIN_SAMPLES', '5'))
+UEBA_BATCH_SIZE = int(os.getenv('UEBA_BATCH_SIZE', '50'))
+UEBA_FLUSH_INTERVAL = float(os.getenv('UEBA_FLUSH_INTERVAL', '2.0'))
 WORKER_URLS = {
     'data_analysis': 'http://data-analysis-worker:8002',
     'diagnosis': 'http://diagnosis-worker:8003',
@@ -59,12 +78,19 @@ class EmergencyRequest(BaseModel):
     location: Optional[str] = Field(None, description="Vehicle location")
     customer_id: Optional[str] = Field(None, description="Customer ID")
 
+class BatchMaintenanceRequest(BaseModel):
+    vins: List[str] = Field(..., min_length=1, max_length=BATCH_MAX_VINS, description="Vehicle Identification Numbers")
+    priority: str = Field("MEDIUM", description="Priority level: LOW, MEDIUM, HIGH, CRITICAL")
+    analysis_type: str = Field("predictive", description="Type of analysis: predictive, emergency, routine")
+    include_details: bool = Field(False, description="Keep full worker results per VIN instead of summaries")
+
 class WorkerResponse(BaseModel):
     worker: str
     data: Optional[Dict[str, Any]] = None
     error: Optional[str] = None
     confidence: float = Field(0.0, ge=0.0, le=1.0)
     sources: List[str] = []
+    timed_out: bool = Field(False, description="The step did not finish within its deadline")
 
 class OrchestrationResult(BaseModel):
     session_id: str
@@ -76,12 +102,63 @@ class OrchestrationResult(BaseModel):
     processing_time_seconds: float
     timestamp: str
 
+class HTTPClientPool:
+    """Application-lifetime HTTP client with one keep-alive connection pool per upstream"""
+    
+    def __init__(self, limit: int = HTTP_POOL_LIMIT, keepalive_timeout: float = HTTP_KEEPALIVE_TIMEOUT,
+                 dns_cache_ttl: int = HTTP_DNS_CACHE_TTL):
+        self.limit = limit
+        self.keepalive_timeout = keepalive_timeout
+        self.dns_cache_ttl = dns_cache_ttl
+        self.sessions: Dict[str, aiohttp.ClientSession] = {}
+    
+    def get_session(self, upstream: str) -> aiohttp.ClientSession:
+        """Get the pooled session for an upstream, creating it on first use"""
+        session = self.sessions.get(upstream)
+        if session is None or session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.limit,
+                limit_per_host=self.limit,
+                keepalive_timeout=self.keepalive_timeout,
+                ttl_dns_cache=self.dns_cache_ttl
+            )
+            session = aiohttp.ClientSession(connector=connector)
+            self.sessions[upstream] = session
+        return session
+    
+    async def start(self):
+        """Open pools for the mock API and every configured worker"""
+        for upstream in ["mockapi", *WORKER_URLS]:
+            self.get_session(upstream)
+        logger.info(f"HTTP client pools ready for {len(self.sessions)} upstreams (limit {self.limit} each)")
+    
+    async def close(self):
+        """Close all pooled sessions and their connections"""
+        sessions, self.sessions = list(self.sessions.values()), {}
+        await asyncio.gather(*(session.close() for session in sessions), return_exceptions=True)
+    
+    def stats(self) -> Dict[str, Any]:
+        """Report pool configuration and open upstream sessions"""
+        return {
+            "upstreams": sorted(name for name, session in self.sessions.items() if not session.closed),
+            "limit_per_upstream": self.limit,
+            "keepalive_timeout_seconds": self.keepalive_timeout
+        }
+
+http_pool = HTTPClientPool()
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan management"""
     logger.info("Starting Master Agent Orchestrator...")
+    await http_pool.start()
+    await ueba.start()
     yield
     logger.info("Shutting down Master Agent Orchestrator...")
+    await batch_jobs.shutdown()
+    await ueba.stop()
+    await http_pool.close()
+    await session_manager.close()
 
 app = FastAPI(
     title="Automotive Predictive Maintenance - Master Agent",
@@ -91,92 +168,480 @@ app = FastAPI(
 )
 
 class UEBA:
-    """User and Entity Behavior Analytics for AI Agent Security"""
+    """User and Entity Behavior Analytics for AI Agent Security
+    
+    Well-known (agent_id, action) pairs are scored locally from a learned
+    baseline and their events are shipped to the UEBA endpoint in batches.
+    Blocking actions, and pairs without an established low-risk baseline,
+    still get a synchronous decision from the UEBA endpoint.
+    """
     
     def __init__(self):
+        # (agent_id, action) -> {"mean_risk": float, "samples": int}
         self.baseline_patterns = {}
         self.risk_threshold = UEBA_THRESHOLD
+        self.blocking_actions = set(UEBA_BLOCKING_ACTIONS)
+        self.min_samples = UEBA_BASELINE_MIN_SAMPLES
+        self.batch_size = UEBA_BATCH_SIZE
+        self.flush_interval = UEBA_FLUSH_INTERVAL
+        self.baseline_alpha = 0.2
+        self.pending_events: Optional[asyncio.Queue] = None
+        self.flusher_task: Optional[asyncio.Task] = None
+    
+    async def start(self):
+        """Start the background batch shipper"""
+        self.pending_events = asyncio.Queue(maxsize=self.batch_size * 100)
+        self.flusher_task = asyncio.create_task(self._flush_loop())
+    
+    async def stop(self):
+        """Stop the batch shipper and ship any events still queued"""
+        if self.flusher_task:
+            self.flusher_task.cancel()
+            await asyncio.gather(self.flusher_task, return_exceptions=True)
+            self.flusher_task = None
+        if self.pending_events:
+            remaining = []
+            while not self.pending_events.empty():
+                remaining.append(self.pending_events.get_nowait())
+            self.pending_events = None
+            for i in range(0, len(remaining), self.batch_size):
+                await self._ship_batch(remaining[i:i + self.batch_size])
+    
+    def _update_baseline(self, agent_id: str, action: str, risk_score: float):
+        """Fold an authoritative risk score into the pair's baseline (EWMA)"""
+        key = (agent_id, action)
+        baseline = self.baseline_patterns.get(key)
+        if baseline is None:
+            self.baseline_patterns[key] = {"mean_risk": risk_score, "samples": 1}
+        else:
+            baseline["mean_risk"] += self.baseline_alpha * (risk_score - baseline["mean_risk"])
+            baseline["samples"] += 1
+    
+    def score_locally(self, agent_id: str, action: str) -> Optional[Dict]:
+        """Score a well-known, low-risk pair from its baseline; None if not eligible"""
+        if action in self.blocking_actions:
+            return None
+        baseline = self.baseline_patterns.get((agent_id, action))
+        if baseline is None or baseline["samples"] < self.min_samples:
+            return None
+        risk_score = baseline["mean_risk"]
+        if self.should_block_action(risk_score):
+            return None
+        return {
+            "monitoring_id": f"UEBA_LOCAL_{uuid.uuid4().hex[:8].upper()}",
+            "agent_id": agent_id,
+            "action": action,
+            "risk_score": round(risk_score, 3),
+            "risk_level": "MEDIUM" if risk_score > 0.4 else "LOW",
+            "anomaly_detected": False,
+            "recommended_action": "MONITOR" if risk_score > 0.4 else "ALLOW",
+            "timestamp": datetime.now().isoformat(),
+            "source": "local_baseline"
+        }
     
     async def monitor_action(self, agent_id: str, action: str, context: Dict) -> Dict:
         """Monitor agent action for security anomalies"""
+        monitoring_data = {
+            "agent_id": agent_id,
+            "action": action,
+            "context": context,
+            "timestamp": datetime.now().isoformat()
+        }
+        
+        # Fast path: score locally and ship the event asynchronously
+        if self.pending_events is not None:
+            local_result = self.score_locally(agent_id, action)
+            if local_result is not None:
+                try:
+                    self.pending_events.put_nowait(monitoring_data)
+                    return local_result
+                except asyncio.QueueFull:
+                    logger.warning("UEBA event queue full, falling back to synchronous monitoring")
+        
+        result = await self._monitor_remote(monitoring_data)
+        if result is None:
+            return {"risk_score": 0.1, "risk_level": "LOW", "anomaly_detected": False}
+        self._update_baseline(agent_id, action, result.get("risk_score", 0.0))
+        return result
+    
+    async def _monitor_remote(self, monitoring_data: Dict) -> Optional[Dict]:
+        """Get a blocking decision from the UEBA endpoint"""
         try:
-            async with aiohttp.ClientSession() as session:
-                monitoring_data = {
-                    "agent_id": agent_id,
-                    "action": action,
-                    "context": context,
-                    "timestamp": datetime.now().isoformat()
-                }
-                
-                async with session.post(
-                    f"{MOCK_API_URL}/ueba/monitor",
-                    json=monitoring_data,
-                    timeout=5
-                ) as response:
-                    if response.status == 200:
-                        return await response.json()
-                    else:
-                        logger.warning(f"UEBA monitoring failed: {response.status}")
-                        return {"risk_score": 0.1, "risk_level": "LOW", "anomaly_detected": False}
+            session = http_pool.get_session("mockapi")
+            async with session.post(
+                f"{MOCK_API_URL}/ueba/monitor",
+                json=monitoring_data,
+                timeout=aiohttp.ClientTimeout(total=5)
+            ) as response:
+                if response.status == 200:
+                    return await response.json()
+                else:
+                    logger.warning(f"UEBA monitoring failed: {response.status}")
+                    return None
         except Exception as e:
             logger.error(f"UEBA monitoring error: {str(e)}")
-            return {"risk_score": 0.1, "risk_level": "LOW", "anomaly_detected": False}
+            return None
+    
+    async def _flush_loop(self):
+        """Collect queued events into batches bounded by size and flush interval"""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.pending_events.get()]
+            flush_at = loop.time() + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining = flush_at - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.pending_events.get(), timeout=remaining))
+                except asyncio.TimeoutError:
+                    break
+            await self._ship_batch(batch)
+    
+    async def _ship_batch(self, batch: List[Dict]):
+        """Ship a batch of events and refresh baselines from the returned scores"""
+        if not batch:
+            return
+        try:
+            session = http_pool.get_session("mockapi")
+            async with session.post(
+                f"{MOCK_API_URL}/ueba/monitor/batch",
+                json={"events": batch},
+                timeout=aiohttp.ClientTimeout(total=10)
+            ) as response:
+                if response.status != 200:
+                    logger.warning(f"UEBA batch shipping failed: {response.status}")
+                    return
+                results = (await response.json()).get("results", [])
+        except Exception as e:
+            logger.error(f"UEBA batch shipping error: {str(e)}")
+            return
+        
+        for result in results:
+            risk_score = result.get("risk_score", 0.0)
+            self._update_baseline(result.get("agent_id"), result.get("action"), risk_score)
+            if self.should_block_action(risk_score):
+                logger.warning(f"UEBA flagged locally scored {result.get('agent_id')} {result.get('action')} (risk: {risk_score:.3f})")
     
     def should_block_action(self, risk_score: float) -> bool:
         """Determine if action should be blocked based on risk score"""
         return risk_score > self.risk_threshold
+    
+    def stats(self) -> Dict[str, Any]:
+        """Report baseline coverage and batch backlog"""
+        return {
+            "baseline_pairs": len(self.baseline_patterns),
+            "locally_scored_pairs": len([
+                b for b in self.baseline_patterns.values()
+                if b["samples"] >= self.min_samples and not self.should_block_action(b["mean_risk"])
+            ]),
+            "pending_events": self.pending_events.qsize() if self.pending_events else 0,
+            "blocking_actions": sorted(self.blocking_actions)
+        }
 
 ueba = UEBA()
 
+class UEBAEventLog:
+    """Bounded append-only UEBA event ring with incrementally maintained counters"""
+    
+    __slots__ = ("events", "total_events", "high_risk_events", "last_risk_score")
+    
+    def __init__(self, max_events: int):
+        self.events = deque(maxlen=max_events)
+        self.total_events = 0
+        self.high_risk_events = 0
+        self.last_risk_score = 0
+    
+    def append(self, event: Dict, high_risk: bool):
+        self.events.append(event)
+        self.total_events += 1
+        self.high_risk_events += int(high_risk)
+        self.last_risk_score = event.get("risk_score", 0)
+    
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "total_events": self.total_events,
+            "high_risk_events": self.high_risk_events,
+            "last_risk_score": self.last_risk_score
+        }
+
+class InMemorySessionStore:
+    """Process-local session store with a time-ordered expiry index"""
+    
+    def __init__(self, max_events: int = UEBA_EVENT_LOG_SIZE):
+        self.sessions = {}
+        self.event_logs = {}
+        self.max_events = max_events
+        self.expiry_index = []  # min-heap of (expires_at, session_id)
+        self.ueba_totals = {"total_events": 0, "high_risk_events": 0}
+    
+    async def create(self, session_id: str, session: Dict, ttl_seconds: float):
+        self.sessions[session_id] = session
+        heapq.heappush(self.expiry_index, (datetime.now().timestamp() + ttl_seconds, session_id))
+    
+    async def update(self, session_id: str, updates: Dict) -> bool:
+        session = self.sessions.get(session_id)
+        if session is None:
+            return False
+        session.update(updates)
+        return True
+    
+    async def get(self, session_id: str) -> Optional[Dict]:
+        await self.purge_expired()
+        return self.sessions.get(session_id)
+    
+    async def count(self) -> int:
+        await self.purge_expired()
+        return len(self.sessions)
+    
+    async def list_ids(self) -> List[str]:
+        await self.purge_expired()
+        return list(self.sessions.keys())
+    
+    async def purge_expired(self) -> int:
+        """Pop expired sessions off the head of the expiry index"""
+        now = datetime.now().timestamp()
+        purged = 0
+        while self.expiry_index and self.expiry_index[0][0] <= now:
+            _, session_id = heapq.heappop(self.expiry_index)
+            self.event_logs.pop(session_id, None)
+            if self.sessions.pop(session_id, None) is not None:
+                purged += 1
+        return purged
+    
+    async def append_event(self, session_id: str, event: Dict, high_risk: bool):
+        if session_id not in self.sessions:
+            return
+        event_log = self.event_logs.get(session_id)
+        if event_log is None:
+            event_log = self.event_logs[session_id] = UEBAEventLog(self.max_events)
+        event_log.append(event, high_risk)
+        self.ueba_totals["total_events"] += 1
+        self.ueba_totals["high_risk_events"] += int(high_risk)
+    
+    async def event_summary(self, session_id: str) -> Dict[str, Any]:
+        event_log = self.event_logs.get(session_id)
+        return event_log.summary() if event_log else UEBAEventLog(0).summary()
+    
+    async def list_events(self, session_id: str) -> List[Dict]:
+        event_log = self.event_logs.get(session_id)
+        return list(event_log.events) if event_log else []
+    
+    async def event_totals(self) -> Dict[str, int]:
+        return dict(self.ueba_totals)
+    
+    async def close(self):
+        pass
+
+class RedisSessionStore:
+    """Redis-backed session store shared across master-agent replicas
+    
+    Each session is a hash whose fields hold JSON-encoded values, so updates
+    are atomic per field. Expiry uses native key TTLs; a sorted set indexed
+    by expiry time keeps counts and listings cheap.
+    """
+    
+    # Update a session only if it still exists, in one server-side step so it
+    # cannot race the key's expiry, and pin the key back to the session's
+    # expiry time from the index. ARGV: session id, then field/value pairs.
+    UPDATE_SCRIPT = """
+    local expires_at = redis.call('ZSCORE', KEYS[2], ARGV[1])
+    if not expires_at or redis.call('EXISTS', KEYS[1]) == 0 then
+        return 0
+    end
+    redis.call('HSET', KEYS[1], unpack(ARGV, 2))
+    redis.call('PEXPIREAT', KEYS[1], math.floor(tonumber(expires_at) * 1000))
+    return 1
+    """
+    
+    def __init__(self, url: str, key_prefix: str = "session:", max_events: int = UEBA_EVENT_LOG_SIZE):
+        self.client = aioredis.from_url(url, decode_responses=True)
+        self.key_prefix = key_prefix
+        self.max_events = max_events
+        self.index_key = f"{key_prefix}index"
+        self.totals_key = f"{key_prefix}ueba_totals"
+        self._update_script = self.client.register_script(self.UPDATE_SCRIPT)
+    
+    def _key(self, session_id: str) -> str:
+        return f"{self.key_prefix}{session_id}"
+    
+    async def create(self, session_id: str, session: Dict, ttl_seconds: float):
+        expires_at = datetime.now().timestamp() + ttl_seconds
+        async with self.client.pipeline(transaction=True) as pipe:
+            pipe.hset(self._key(session_id), mapping={k: json.dumps(v, default=str) for k, v in session.items()})
+            pipe.expire(self._key(session_id), int(ttl_seconds))
+            pipe.hset(f"{self._key(session_id)}:ueba_stats", mapping={
+                "total_events": 0, "high_risk_events": 0, "last_risk_score": 0
+            })
+            pipe.expire(f"{self._key(session_id)}:ueba_stats", int(ttl_seconds))
+            pipe.zadd(self.index_key, {session_id: expires_at})
+            await pipe.execute()
+    
+    async def update(self, session_id: str, updates: Dict) -> bool:
+        if not updates:
+            return await self.client.exists(self._key(session_id)) > 0
+        fields = [item for k, v in updates.items() for item in (k, json.dumps(v, default=str))]
+        updated = await self._update_script(keys=[self._key(session_id), self.index_key], args=[session_id, *fields])
+        return bool(updated)
+    
+    async def get(self, session_id: str) -> Optional[Dict]:
+        fields = await self.client.hgetall(self._key(session_id))
+        if not fields:
+            return None
+        return {k: json.loads(v) for k, v in fields.items()}
+    
+    async def count(self) -> int:
+        await self.purge_expired()
+        return await self.client.zcard(self.index_key)
+    
+    async def list_ids(self) -> List[str]:
+        return await self.client.zrangebyscore(self.index_key, datetime.now().timestamp(), "+inf")
+    
+    async def purge_expired(self) -> int:
+        """Trim the expiry index; the session keys themselves expire natively"""
+        return await self.client.zremrangebyscore(self.index_key, "-inf", datetime.now().timestamp())
+    
+    async def append_event(self, session_id: str, event: Dict, high_risk: bool):
+        stats_key = f"{self._key(session_id)}:ueba_stats"
+        ttl = await self.client.ttl(stats_key)
+        if ttl <= 0:
+            return
+        events_key = f"{self._key(session_id)}:ueba_events"
+        async with self.client.pipeline(transaction=True) as pipe:
+            pipe.rpush(events_key, json.dumps(event, default=str))
+            pipe.ltrim(events_key, -self.max_events, -1)
+            pipe.expire(events_key, ttl)
+            pipe.hincrby(stats_key, "total_events", 1)
+            pipe.hincrby(stats_key, "high_risk_events", int(high_risk))
+            pipe.hset(stats_key, "last_risk_score", event.get("risk_score", 0))
+            pipe.hincrby(self.totals_key, "total_events", 1)
+            pipe.hincrby(self.totals_key, "high_risk_events", int(high_risk))
+            await pipe.execute()
+    
+    async def event_summary(self, session_id: str) -> Dict[str, Any]:
+        stats = await self.client.hgetall(f"{self._key(session_id)}:ueba_stats")
+        return {
+            "total_events": int(stats.get("total_events", 0)),
+            "high_risk_events": int(stats.get("high_risk_events", 0)),
+            "last_risk_score": float(stats.get("last_risk_score", 0))
+        }
+    
+    async def list_events(self, session_id: str) -> List[Dict]:
+        events = await self.client.lrange(f"{self._key(session_id)}:ueba_events", 0, -1)
+        return [json.loads(event) for event in events]
+    
+    async def event_totals(self) -> Dict[str, int]:
+        totals = await self.client.hgetall(self.totals_key)
+        return {
+            "total_events": int(totals.get("total_events", 0)),
+            "high_risk_events": int(totals.get("high_risk_events", 0))
+        }
+    
+    async def close(self):
+        await self.client.aclose()
+
+def create_session_store(backend: str = SESSION_BACKEND):
+    """Build the configured session store backend"""
+    if backend == "redis":
+        logger.info(f"Using Redis session store at {REDIS_URL}")
+        return RedisSessionStore(REDIS_URL)
+    return InMemorySessionStore()
+
 class SessionManager:
     """Manages session state and context across worker interactions"""
     
-    def __init__(self):
-        self.sessions = {}
+    def __init__(self, store=None, ttl_hours: float = SESSION_TTL_HOURS):
+        self.store = store or create_session_store()
+        self.ttl_seconds = ttl_hours * 3600
     
-    def create_session(self, vin: str, customer_id: Optional[str] = None) -> str:
+    async def create_session(self, vin: str, customer_id: Optional[str] = None) -> str:
         """Create a new session"""
         session_id = str(uuid.uuid4())
-        self.sessions[session_id] = {
+        now = datetime.now().isoformat()
+        await self.store.create(session_id, {
             "vin": vin,
             "customer_id": customer_id,
-            "created_at": datetime.now(),
-            "last_updated": datetime.now(),
+            "created_at": now,
+            "last_updated": now,
             "context": {},
-            "worker_results": {},
-            "ueba_events": []
-        }
+            "worker_results": {}
+        }, self.ttl_seconds)
         return session_id
     
-    def update_session(self, session_id: str, updates: Dict):
+    async def update_session(self, session_id: str, updates: Dict):
         """Update session with new information"""
-        if session_id in self.sessions:
-            self.sessions[session_id].update(updates)
-            self.sessions[session_id]["last_updated"] = datetime.now()
+        await self.store.update(session_id, {**updates, "last_updated": datetime.now().isoformat()})
     
-    def get_session(self, session_id: str) -> Optional[Dict]:
+    async def get_session(self, session_id: str) -> Optional[Dict]:
         """Get session information"""
-        return self.sessions.get(session_id)
+        return await self.store.get(session_id)
+    
+    async def record_ueba_event(self, session_id: str, event: Dict, high_risk: bool):
+        """Append a UEBA event to the session's bounded event log"""
+        await self.store.append_event(session_id, event, high_risk)
+    
+    async def get_ueba_summary(self, session_id: str) -> Dict[str, Any]:
+        """Get the session's UEBA counters without touching its events"""
+        return await self.store.event_summary(session_id)
+    
+    async def get_ueba_events(self, session_id: str) -> List[Dict]:
+        """Get the most recent UEBA events retained for the session"""
+        return await self.store.list_events(session_id)
     
-    def cleanup_expired_sessions(self, max_age_hours: int = 24):
+    async def get_ueba_totals(self) -> Dict[str, int]:
+        """Get UEBA event counters across all sessions"""
+        return await self.store.event_totals()
+    
+    async def count_sessions(self) -> int:
+        """Count live sessions"""
+        return await self.store.count()
+    
+    async def list_session_ids(self) -> List[str]:
+        """List live session IDs"""
+        return await self.store.list_ids()
+    
+    async def cleanup_expired_sessions(self):
         """Clean up expired sessions"""
-        cutoff_time = datetime.now() - timedelta(hours=max_age_hours)
-        expired_sessions = [
-            sid for sid, session in self.sessions.items()
-            if session["created_at"] < cutoff_time
-        ]
-        for sid in expired_sessions:
-            del self.sessions[sid]
-        logger.info(f"Cleaned up {len(expired_sessions)} expired sessions")
+        expired = await self.store.purge_expired()
+        if expired:
+            logger.info(f"Cleaned up {expired} expired sessions")
+    
+    async def close(self):
+        await self.store.close()
 
 session_manager = SessionManager()
 
+def maintenance_recommendations(data_analysis: Optional[WorkerResponse],
+                                diagnosis: Optional[WorkerResponse]) -> List[str]:
+    """Recommendations from one vehicle's data analysis and diagnosis results
+    
+    Each response's ``data`` is a single vehicle's result, either a worker's
+    ``/task`` payload or that vehicle's entry of a ``/task/batch`` payload, so
+    the per-VIN workflow and batched jobs apply the same rules.
+    """
+    recommendations = []
+    if data_analysis and data_analysis.confidence > 0.7:
+        data = data_analysis.data or {}
+        anomaly_count = data.get("anomaly_count", (data.get("anomaly_detection") or {}).get("anomaly_count", 0))
+        if anomaly_count > 0:
+            recommendations.append("Schedule immediate inspection")
+            recommendations.append("Monitor sensor readings closely")
+    if diagnosis and diagnosis.confidence > 0.6:
+        data = diagnosis.data or {}
+        risk_score = data.get("overall_risk_score", (data.get("failure_predictions") or {}).get("overall_risk_score", 0))
+        if risk_score > 0.7:
+            recommendations.append("Schedule preventive maintenance")
+            recommendations.append("Prepare for potential component replacement")
+    return recommendations
+
 class WorkerOrchestrator:
     """Orchestrates communication with worker agents"""
     
     def __init__(self):
         self.timeout = 30
         self.retry_attempts = 3
+        self.step_timeout = WORKER_STEP_TIMEOUT
+        self.workflow_deadline = WORKFLOW_DEADLINE
     
     async def call_worker(self, worker_name: str, endpoint: str, payload: Dict, session_id: str) -> WorkerResponse:
         """Call a specific worker agent"""
@@ -195,8 +660,12 @@ class WorkerOrchestrator:
             context={"session_id": session_id, "payload_keys": list(payload.keys())}
         )
         
+        # Add UEBA event to session; blocked actions count as high risk
+        high_risk = ueba.should_block_action(ueba_result.get("risk_score", 0.0))
+        await session_manager.record_ueba_event(session_id, ueba_result, high_risk)
+        
         # Block action if risk is too high
-        if ueba.should_block_action(ueba_result.get("risk_score", 0.0)):
+        if high_risk:
             logger.warning(f"Blocked {worker_name} action due to high risk: {ueba_result['risk_score']}")
             return WorkerResponse(
                 worker=worker_name,
@@ -204,33 +673,28 @@ class WorkerOrchestrator:
                 confidence=0.0
             )
         
-        # Add UEBA event to session
-        session_manager.update_session(session_id, {
-            "ueba_events": session_manager.get_session(session_id).get("ueba_events", []) + [ueba_result]
-        })
-        
         # Attempt to call worker with retries
         for attempt in range(self.retry_attempts):
             try:
-                async with aiohttp.ClientSession() as session:
-                    url = f"{worker_url}{endpoint}"
-                    async with session.post(
-                        url,
-                        json=payload,
-                        timeout=aiohttp.ClientTimeout(total=self.timeout)
-                    ) as response:
-                        if response.status == 200:
-                            result = await response.json()
-                            return WorkerResponse(**result)
-                        else:
-                            error_text = await response.text()
-                            logger.error(f"Worker {worker_name} returned {response.status}: {error_text}")
-                            if attempt == self.retry_attempts - 1:
-                                return WorkerResponse(
-                                    worker=worker_name,
-                                    error=f"HTTP {response.status}: {error_text}",
-                                    confidence=0.0
-                                )
+                session = http_pool.get_session(worker_name)
+                url = f"{worker_url}{endpoint}"
+                async with session.post(
+                    url,
+                    json=payload,
+                    timeout=aiohttp.ClientTimeout(total=self.timeout)
+                ) as response:
+                    if response.status == 200:
+                        result = await response.json()
+                        return WorkerResponse(**result)
+                    else:
+                        error_text = await response.text()
+                        logger.error(f"Worker {worker_name} returned {response.status}: {error_text}")
+                        if attempt == self.retry_attempts - 1:
+                            return WorkerResponse(
+                                worker=worker_name,
+                                error=f"HTTP {response.status}: {error_text}",
+                                confidence=0.0
+                            )
             except asyncio.TimeoutError:
                 logger.warning(f"Timeout calling {worker_name} (attempt {attempt + 1})")
                 if attempt == self.retry_attempts - 1:
@@ -257,9 +721,123 @@ class WorkerOrchestrator:
             confidence=0.0
         )
     
+    async def fetch_telematics(self, vin: str, timeout: float = 10) -> Optional[Dict]:
+        """Fetch the telematics snapshot once so it can be forwarded to workers"""
+        try:
+            session = http_pool.get_session("mockapi")
+            async with session.get(
+                f"{MOCK_API_URL}/telematics/{vin}",
+                timeout=aiohttp.ClientTimeout(total=timeout)
+            ) as response:
+                if response.status == 200:
+                    return await response.json()
+                logger.warning(f"Telematics prefetch for {vin} failed: {response.status}")
+        except Exception as e:
+            logger.warning(f"Telematics prefetch error for {vin}: {str(e)}")
+        # Workers fall back to fetching the snapshot themselves
+        return None
+    
+    async def fetch_telematics_bulk(self, vins: List[str]) -> Dict[str, Dict]:
+        """Fetch telematics for many VINs in one mock API call; VINs that fail are left out"""
+        records = {}
+        try:
+            session = http_pool.get_session("mockapi")
+            async with session.post(
+                f"{MOCK_API_URL}/telematics/bulk",
+                json={"vins": vins, "stream": True},
+                timeout=aiohttp.ClientTimeout(total=30)
+            ) as response:
+                if response.status != 200:
+                    logger.warning(f"Bulk telematics fetch for {len(vins)} VINs failed: {response.status}")
+                    return records
+                async for line in response.content:
+                    if line.strip():
+                        item = json.loads(line)
+                        if "telematics" in item:
+                            records[item["vin"]] = item["telematics"]
+        except Exception as e:
+            logger.warning(f"Bulk telematics fetch error: {str(e)}")
+        return records
+    
+    async def run_step(self, worker_name: str, endpoint: str, payload: Dict, session_id: str,
+                       step_timeout: float) -> WorkerResponse:
+        """Run a single workflow step bounded by its own deadline"""
+        try:
+            return await asyncio.wait_for(
+                self.call_worker(worker_name, endpoint, payload, session_id),
+                timeout=step_timeout
+            )
+        except asyncio.TimeoutError:
+            logger.warning(f"Step {worker_name} exceeded its {step_timeout:.1f}s deadline")
+            return WorkerResponse(
+                worker=worker_name,
+                error=f"Step deadline exceeded ({step_timeout:.1f}s)",
+                confidence=0.0,
+                timed_out=True
+            )
+        except Exception as e:
+            logger.error(f"Step {worker_name} failed: {str(e)}")
+            return WorkerResponse(
+                worker=worker_name,
+                error=f"Step failed: {str(e)}",
+                confidence=0.0
+            )
+    
+    async def execute_workflow_steps(self, workflow_steps: List[tuple], session_id: str,
+                                     deadline: Optional[float] = None) -> tuple:
+        """Execute workflow steps concurrently under a shared request deadline.
+        
+        Each step is a ``(worker_name, endpoint, payload)`` tuple with an optional
+        fourth element overriding the per-step timeout. Steps still running when
+        the overall deadline is hit are cancelled and reported as partial results.
+        Returns the per-worker responses and the names of steps that did not finish.
+        """
+        deadline = self.workflow_deadline if deadline is None else deadline
+        
+        tasks = {}
+        for step in workflow_steps:
+            worker_name, endpoint, payload = step[:3]
+            step_timeout = step[3] if len(step) > 3 else self.step_timeout
+            tasks[worker_name] = asyncio.create_task(
+                self.run_step(worker_name, endpoint, payload, session_id, min(step_timeout, deadline))
+            )
+        
+        try:
+            done, pending = await asyncio.wait(tasks.values(), timeout=deadline)
+        finally:
+            # Cancel stragglers, including when the caller itself is cancelled
+            stragglers = [task for task in tasks.values() if not task.done()]
+            for task in stragglers:
+                task.cancel()
+            if stragglers:
+                await asyncio.gather(*stragglers, return_exceptions=True)
+        
+        worker_results = {}
+        incomplete_steps = []
+        for worker_name, task in tasks.items():
+            if task in done:
+                result = task.result()
+                if result.timed_out:
+                    incomplete_steps.append(worker_name)
+            else:
+                logger.warning(f"Cancelled {worker_name}: workflow deadline of {deadline:.1f}s exceeded")
+                result = WorkerResponse(
+                    worker=worker_name,
+                    error=f"Cancelled: workflow deadline exceeded ({deadline:.1f}s)",
+                    confidence=0.0,
+                    timed_out=True
+                )
+                incomplete_steps.append(worker_name)
+            worker_results[worker_name] = result
+        
+        return worker_results, incomplete_steps
+    
     async def orchestrate_maintenance_workflow(self, request: MaintenanceRequest, session_id: str) -> OrchestrationResult:
         """Orchestrate the complete maintenance workflow"""
         start_time = datetime.now()
+        # The deadline covers the whole request, telematics prefetch included
+        loop = asyncio.get_running_loop()
+        deadline_at = loop.time() + self.workflow_deadline
         
         # Prepare base context
         base_context = {
@@ -270,14 +848,20 @@ class WorkerOrchestrator:
             "analysis_type": request.analysis_type
         }
         
+        # Fetch telematics once and forward it to the workers that need it
+        telematics = await self.fetch_telematics(request.vin, timeout=min(10, self.workflow_deadline))
+        telematics_context = {"telematics": telematics} if telematics is not None else {}
+        
         # Define workflow steps
         workflow_steps = [
             ("data_analysis", "/task", {
                 **base_context,
+                **telematics_context,
                 "analysis_type": request.analysis_type
             }),
             ("diagnosis", "/task", {
                 **base_context,
+                **telematics_context,
                 "diagnosis_type": "predictive" if request.analysis_type == "predictive" else "emergency"
             })
         ]
@@ -289,53 +873,29 @@ class WorkerOrchestrator:
                 "engagement_type": "proactive"
             }))
         
-        # Execute workflow steps in parallel where possible
-        worker_tasks = []
-        for worker_name, endpoint, payload in workflow_steps:
-            task = self.call_worker(worker_name, endpoint, payload, session_id)
-            worker_tasks.append((worker_name, task))
-        
-        # Wait for all worker responses
-        worker_results = {}
-        for worker_name, task in worker_tasks:
-            result = await task
-            worker_results[worker_name] = result
-        
-        # Determine next steps based on results
-        recommendations = []
-        overall_confidence = 0.0
+        # Execute all workflow steps concurrently under the request deadline
+        worker_results, incomplete_steps = await self.execute_workflow_steps(
+            workflow_steps, session_id, deadline=max(deadline_at - loop.time(), 0.0)
+        )
         
         # Analyze results and generate recommendations
-        if worker_results.get("data_analysis", {}).get("confidence", 0) > 0.7:
-            data_analysis = worker_results["data_analysis"]
-            if data_analysis.get("data", {}).get("anomaly_detected", False):
-                recommendations.append("Schedule immediate inspection")
-                recommendations.append("Monitor sensor readings closely")
-        
-        if worker_results.get("diagnosis", {}).get("confidence", 0) > 0.6:
-            diagnosis = worker_results["diagnosis"]
-            if diagnosis.get("data", {}).get("failure_prediction", {}).get("probability", 0) > 0.7:
-                recommendations.append("Schedule preventive maintenance")
-                recommendations.append("Prepare for potential component replacement")
+        recommendations = maintenance_recommendations(worker_results.get("data_analysis"), worker_results.get("diagnosis"))
+        
+        if incomplete_steps:
+            recommendations.append(f"Re-run analysis: {', '.join(incomplete_steps)} did not respond in time")
         
         # Calculate overall confidence
         confidences = [result.confidence for result in worker_results.values() if result.confidence > 0]
         overall_confidence = sum(confidences) / len(confidences) if confidences else 0.0
         
         # Get UEBA status
-        session = session_manager.get_session(session_id)
-        ueba_events = session.get("ueba_events", []) if session else []
-        ueba_status = {
-            "total_events": len(ueba_events),
-            "high_risk_events": len([e for e in ueba_events if e.get("risk_score", 0) > 0.7]),
-            "last_risk_score": ueba_events[-1].get("risk_score", 0) if ueba_events else 0
-        }
+        ueba_status = await session_manager.get_ueba_summary(session_id)
         
         processing_time = (datetime.now() - start_time).total_seconds()
         
         return OrchestrationResult(
             session_id=session_id,
-            status="completed",
+            status="partial" if incomplete_steps else "completed",
             results=worker_results,
             overall_confidence=overall_confidence,
             recommendations=recommendations,
@@ -346,6 +906,261 @@ class WorkerOrchestrator:
 
 orchestrator = WorkerOrchestrator()
 
+class BatchJob:
+    """State and incremental results of one fleet batch analysis job"""
+    
+    def __init__(self, job_id: str, request: BatchMaintenanceRequest, session_id: str):
+        self.job_id = job_id
+        self.request = request
+        self.session_id = session_id
+        self.status = "queued"
+        self.total = len(request.vins)
+        self.completed = 0
+        self.failed = 0
+        self.results: List[Dict] = []
+        self.reported: Set[str] = set()
+        self.created_at = datetime.now().isoformat()
+        self.finished_at: Optional[str] = None
+        self.task: Optional[asyncio.Task] = None
+        self.updated = asyncio.Event()
+    
+    def add_result(self, result: Dict):
+        """Record a per-VIN result and wake any progress streams"""
+        self.results.append(result)
+        self.reported.add(result["vin"])
+        if result["status"] == "failed":
+            self.failed += 1
+        else:
+            self.completed += 1
+        self._notify()
+    
+    def finish(self, status: str):
+        self.status = status
+        self.finished_at = datetime.now().isoformat()
+        self._notify()
+    
+    def _notify(self):
+        updated, self.updated = self.updated, asyncio.Event()
+        updated.set()
+    
+    def progress(self) -> Dict[str, Any]:
+        processed = self.completed + self.failed
+        return {
+            "job_id": self.job_id,
+            "status": self.status,
+            "total": self.total,
+            "processed": processed,
+            "completed": self.completed,
+            "failed": self.failed,
+            "progress": processed / self.total if self.total else 1.0,
+            "session_id": self.session_id,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at
+        }
+
+class BatchJobManager:
+    """Runs fleet batch analysis jobs in chunks of batched worker calls
+    
+    ``chunk_parallelism`` chunks of a job run at once. Each chunk's batched
+    worker calls and each per-VIN fallback workflow hold a slot of one
+    concurrency bound shared by all jobs.
+    """
+    
+    def __init__(self, chunk_size: int = BATCH_CHUNK_SIZE, chunk_parallelism: int = BATCH_CHUNK_PARALLELISM,
+                 max_concurrency: int = BATCH_MAX_CONCURRENCY, retention: int = BATCH_JOB_RETENTION):
+        self.chunk_size = chunk_size
+        self.chunk_parallelism = chunk_parallelism
+        self.max_concurrency = max_concurrency
+        self.retention = retention
+        self.jobs: "OrderedDict[str, BatchJob]" = OrderedDict()
+        self._semaphore: Optional[asyncio.Semaphore] = None
+    
+    @property
+    def semaphore(self) -> asyncio.Semaphore:
+        """Global bound on worker workflows in flight across all jobs"""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+    
+    async def submit(self, request: BatchMaintenanceRequest) -> BatchJob:
+        """Create a job and start it in the background"""
+        job_id = f"JOB_{uuid.uuid4().hex[:12].upper()}"
+        session_id = await session_manager.create_session(f"batch:{job_id}")
+        job = BatchJob(job_id, request, session_id)
+        self.jobs[job_id] = job
+        self._evict_finished()
+        job.task = asyncio.create_task(self._run_job(job))
+        return job
+    
+    def get_job(self, job_id: str) -> Optional[BatchJob]:
+        return self.jobs.get(job_id)
+    
+    def _evict_finished(self):
+        """Drop the oldest finished jobs beyond the retention limit"""
+        finished = [job_id for job_id, job in self.jobs.items() if job.finished_at]
+        for job_id in finished[:max(0, len(self.jobs) - self.retention)]:
+            del self.jobs[job_id]
+    
+    async def _run_job(self, job: BatchJob):
+        job.status = "running"
+        vins = list(dict.fromkeys(job.request.vins))
+        job.total = len(vins)
+        chunks = asyncio.Queue()
+        for i in range(0, len(vins), self.chunk_size):
+            chunks.put_nowait(vins[i:i + self.chunk_size])
+        
+        async def chunk_consumer():
+            while not chunks.empty():
+                chunk = chunks.get_nowait()
+                try:
+                    await self._run_chunk(job, chunk)
+                except Exception as e:
+                    # A failed chunk fails its own VINs; the rest of the job carries on
+                    logger.error(f"Batch job {job.job_id} chunk failed: {str(e)}")
+                    for vin in chunk:
+                        if vin not in job.reported:
+                            job.add_result({"vin": vin, "status": "failed", "error": f"Chunk failed: {str(e)}"})
+        
+        try:
+            await asyncio.gather(*(chunk_consumer() for _ in range(self.chunk_parallelism)))
+            job.finish("completed")
+        except asyncio.CancelledError:
+            job.finish("cancelled")
+            raise
+    
+    async def _run_chunk(self, job: BatchJob, vins: List[str]):
+        """Analyze one chunk of VINs with one bulk telematics fetch and one batched call per worker
+        
+        VINs the batched path cannot cover (no telematics, or missing from a
+        worker's batch result) and whole chunks whose batch calls fail fall back
+        to the per-VIN workflow.
+        """
+        start_time = datetime.now()
+        telematics = await orchestrator.fetch_telematics_bulk(vins)
+        batched = [vin for vin in vins if vin in telematics]
+        
+        by_worker: Dict[str, Dict[str, Dict]] = {}
+        worker_results = {}
+        if batched:
+            snapshots = [
+                {**telematics[vin].get("current_status", {}), **telematics[vin].get("sensor_data", {})}
+                for vin in batched
+            ]
+            sensor_names = sorted({
+                name for snapshot in snapshots for name, value in snapshot.items()
+                if isinstance(value, (int, float)) and not isinstance(value, bool)
+            })
+            values = [
+                [value if isinstance(value, (int, float)) and not isinstance(value, bool) else None
+                 for value in (snapshot.get(name) for name in sensor_names)]
+                for snapshot in snapshots
+            ]
+            history = {vin: telematics[vin].get("maintenance_history", []) for vin in batched}
+            async with self.semaphore:
+                worker_results, _ = await orchestrator.execute_workflow_steps([
+                    ("data_analysis", "/task/batch", {
+                        "session_id": job.session_id,
+                        "vins": batched,
+                        "sensor_names": sensor_names,
+                        "values": values,
+                        "maintenance_history": [history[vin] for vin in batched]
+                    }),
+                    ("diagnosis", "/task/batch", {
+                        "session_id": job.session_id,
+                        "vehicles": [
+                            {"vin": vin, "dtc_codes": telematics[vin].get("dtc_codes", []), "maintenance_history": history[vin]}
+                            for vin in batched
+                        ],
+                        "diagnosis_type": "predictive" if job.request.analysis_type == "predictive" else "emergency",
+                        "include_details": job.request.include_details
+                    })
+                ], job.session_id)
+            for worker_name, result in worker_results.items():
+                if result.error is None and result.data:
+                    by_worker[worker_name] = {vehicle["vin"]: vehicle for vehicle in result.data.get("vehicles", [])}
+        
+        if len(by_worker) < 2:
+            fallback = vins
+        else:
+            fallback = [vin for vin in vins if not all(vin in vehicles for vehicles in by_worker.values())]
+            processing_time = (datetime.now() - start_time).total_seconds()
+            for vin in vins:
+                if vin not in fallback:
+                    job.add_result(self._batched_result(job, vin, by_worker, worker_results, processing_time))
+        
+        if fallback:
+            await asyncio.gather(*(self._run_vin(job, vin) for vin in fallback))
+    
+    @staticmethod
+    def _batched_result(job: BatchJob, vin: str, by_worker: Dict[str, Dict[str, Dict]],
+                        worker_results: Dict[str, WorkerResponse], processing_time: float) -> Dict:
+        """Per-VIN result, shaped like the per-VIN workflow's, from the batched worker outputs"""
+        analysis, diagnosis = by_worker["data_analysis"][vin], by_worker["diagnosis"][vin]
+        recommendations = maintenance_recommendations(
+            WorkerResponse(worker="data_analysis", data=analysis, confidence=worker_results["data_analysis"].confidence),
+            WorkerResponse(worker="diagnosis", data=diagnosis, confidence=worker_results["diagnosis"].confidence)
+        )
+        
+        confidences = [result.confidence for result in worker_results.values() if result.confidence > 0]
+        vin_result = {
+            "vin": vin,
+            "status": "completed",
+            "overall_confidence": sum(confidences) / len(confidences) if confidences else 0.0,
+            "recommendations": recommendations,
+            "worker_errors": {},
+            "processing_time_seconds": processing_time
+        }
+        if job.request.include_details:
+            vin_result["results"] = {"data_analysis": analysis, "diagnosis": diagnosis}
+        return vin_result
+    
+    async def _run_vin(self, job: BatchJob, vin: str):
+        async with self.semaphore:
+            try:
+                result = await orchestrator.orchestrate_maintenance_workflow(
+                    MaintenanceRequest(vin=vin, priority=job.request.priority, analysis_type=job.request.analysis_type),
+                    job.session_id
+                )
+            except Exception as e:
+                job.add_result({"vin": vin, "status": "failed", "error": str(e)})
+                return
+        
+        vin_result = {
+            "vin": vin,
+            "status": result.status,
+            "overall_confidence": result.overall_confidence,
+            "recommendations": result.recommendations,
+            "worker_errors": {name: r.error for name, r in result.results.items() if r.error},
+            "processing_time_seconds": result.processing_time_seconds
+        }
+        if job.request.include_details:
+            vin_result["results"] = {name: r.model_dump() for name, r in result.results.items()}
+        job.add_result(vin_result)
+    
+    async def stream(self, job: BatchJob):
+        """Yield NDJSON lines with per-VIN results as they complete, then a final progress line"""
+        sent = 0
+        while True:
+            updated = job.updated
+            while sent < len(job.results):
+                yield json.dumps({"type": "result", **job.results[sent]}) + "\n"
+                sent += 1
+                if sent % self.chunk_size == 0:
+                    yield json.dumps({"type": "progress", **job.progress()}) + "\n"
+            if job.finished_at:
+                break
+            await updated.wait()
+        yield json.dumps({"type": "progress", **job.progress()}) + "\n"
+    
+    async def shutdown(self):
+        """Cancel jobs that are still running"""
+        running = [job.task for job in self.jobs.values() if job.task and not job.task.done()]
+        for task in running:
+            task.cancel()
+        await asyncio.gather(*running, return_exceptions=True)
+
+batch_jobs = BatchJobManager()
+
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
@@ -354,7 +1169,8 @@ async def health_check():
         "service": "master-agent",
         "timestamp": datetime.now().isoformat(),
         "version": "1.0.0",
-        "active_sessions": len(session_manager.sessions)
+        "active_sessions": await session_manager.count_sessions(),
+        "http_pools": http_pool.stats()
     }
 
 @app.post("/maintenance/analyze", response_model=OrchestrationResult)
@@ -362,7 +1178,7 @@ async def analyze_maintenance(request: MaintenanceRequest, background_tasks: Bac
     """Analyze vehicle maintenance needs using multi-agent workflow"""
     try:
         # Create session
-        session_id = session_manager.create_session(request.vin, request.customer_id)
+        session_id = await session_manager.create_session(request.vin, request.customer_id)
         
         # Set correlation ID for logging
         correlation_id = session_id[:8]
@@ -381,12 +1197,39 @@ async def analyze_maintenance(request: MaintenanceRequest, background_tasks: Bac
         logger.error(f"Error in maintenance analysis: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Analysis failed: {str(e)}")
 
+@app.post("/maintenance/analyze-batch")
+async def analyze_maintenance_batch(request: BatchMaintenanceRequest):
+    """Start a fleet batch analysis job"""
+    job = await batch_jobs.submit(request)
+    logger.info(f"Started batch job {job.job_id} for {job.total} vehicles")
+    return job.progress()
+
+@app.get("/maintenance/jobs/{job_id}")
+async def get_batch_job(job_id: str, offset: int = 0, limit: int = 1000):
+    """Get batch job progress and a page of per-VIN results"""
+    job = batch_jobs.get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return {
+        **job.progress(),
+        "offset": offset,
+        "results": job.results[offset:offset + limit]
+    }
+
+@app.get("/maintenance/jobs/{job_id}/stream")
+async def stream_batch_job(job_id: str):
+    """Stream per-VIN results and progress of a batch job as NDJSON"""
+    job = batch_jobs.get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return StreamingResponse(batch_jobs.stream(job), media_type="application/x-ndjson")
+
 @app.post("/emergency/alert", response_model=OrchestrationResult)
 async def handle_emergency(request: EmergencyRequest, background_tasks: BackgroundTasks):
     """Handle emergency alerts with high-priority workflow"""
     try:
         # Create session with emergency priority
-        session_id = session_manager.create_session(request.vin, request.customer_id)
+        session_id = await session_manager.create_session(request.vin, request.customer_id)
         
         # Set correlation ID for logging
         correlation_id = session_id[:8]
@@ -420,17 +1263,21 @@ async def handle_emergency(request: EmergencyRequest, background_tasks: Backgrou
 @app.get("/sessions/{session_id}")
 async def get_session(session_id: str):
     """Get session information"""
-    session = session_manager.get_session(session_id)
+    session = await session_manager.get_session(session_id)
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
-    return session
+    return {
+        **session,
+        "ueba_events": await session_manager.get_ueba_events(session_id),
+        "ueba_summary": await session_manager.get_ueba_summary(session_id)
+    }
 
 @app.get("/sessions")
 async def list_sessions():
     """List all active sessions"""
     return {
-        "active_sessions": len(session_manager.sessions),
-        "sessions": list(session_manager.sessions.keys())
+        "active_sessions": await session_manager.count_sessions(),
+        "sessions": await session_manager.list_session_ids()
     }
 
 @app.get("/ueba/status")
@@ -439,7 +1286,9 @@ async def get_ueba_status():
     return {
         "risk_threshold": UEBA_THRESHOLD,
         "monitoring_active": True,
-        "total_sessions_monitored": len(session_manager.sessions)
+        "total_sessions_monitored": await session_manager.count_sessions(),
+        **await session_manager.get_ueba_totals(),
+        **ueba.stats()
     }
 
 if __name__ == "__main__":
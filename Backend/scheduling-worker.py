@@ -1,15 +1,71 @@
 # workers/scheduling/app.py - Scheduling Worker Agent
 from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-import requests
-import random
+import asyncio
+import hashlib
+import json
+import os
+import math
+import time
+import uuid
+import numpy as np
+from scipy.sparse import csr_matrix
+from scipy.spatial import cKDTree
+from scipy.sparse.csgraph import connected_components, min_weight_full_bipartite_matching
+from bisect import bisect_left, bisect_right
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Any, Tuple, Set, Callable
 
-app = FastAPI(title="Scheduling Worker", version="1.0")
+from mock_api_client import MockAPIClient
 
 MOCK_API_BASE = "http://mockapi:8000"
 
+MOCK_API_POOL_LIMIT = int(os.getenv("MOCK_API_POOL_LIMIT", "200"))
+BATCH_BOOKING_CONCURRENCY = int(os.getenv("BATCH_BOOKING_CONCURRENCY", "50"))
+BULK_BOOKING_CHUNK = int(os.getenv("BULK_BOOKING_CHUNK", "200"))
+BULK_BOOKING_ATTEMPTS = int(os.getenv("BULK_BOOKING_ATTEMPTS", "3"))
+BULK_BOOKING_POLL_SECONDS = float(os.getenv("BULK_BOOKING_POLL_SECONDS", "300"))
+CATALOGUE_TTL_SECONDS = float(os.getenv("CATALOGUE_TTL_SECONDS", "30"))
+EARTH_RADIUS_KM = 6371.0
+CENTER_GRID_CELL_DEG = float(os.getenv("CENTER_GRID_CELL_DEG", "0.5"))
+OPTIMIZER_CANDIDATE_CENTERS = int(os.getenv("OPTIMIZER_CANDIDATE_CENTERS", "8"))
+OPTIMIZER_SLOTS_PER_CENTER = int(os.getenv("OPTIMIZER_SLOTS_PER_CENTER", "8"))
+
+# Assignment cost weights: each waiting hour costs more for urgent vehicles, and
+# leaving a vehicle unassigned costs enough that higher priorities always win
+# contested slots over lower ones
+PRIORITY_WAIT_COST_PER_HOUR = {"CRITICAL": 50.0, "HIGH": 10.0, "MEDIUM": 2.0, "LOW": 0.5}
+PRIORITY_UNASSIGNED_COST = {"CRITICAL": 1e9, "HIGH": 1e8, "MEDIUM": 1e7, "LOW": 1e6}
+RELAXED_CONSTRAINT_COST = 1e5
+
+# Fallback coordinates for catalogue entries and customers that only carry a city name
+CITY_COORDINATES = {
+    "bangalore": (12.9716, 77.5946),
+    "mumbai": (19.0760, 72.8777),
+    "delhi": (28.7041, 77.1025),
+    "chennai": (13.0827, 80.2707),
+    "hyderabad": (17.3850, 78.4867),
+    "pune": (18.5204, 73.8567),
+    "kolkata": (22.5726, 88.3639),
+    "ahmedabad": (23.0225, 72.5714),
+    "jaipur": (26.9124, 75.7873),
+    "lucknow": (26.8467, 80.9462),
+}
+
+# What a centre must offer to take a given service type
+SERVICE_REQUIREMENTS = {
+    "Emergency Repair": {"service": "Emergency Repair", "specialization": None},
+    "Ignition System Service": {"service": None, "specialization": "Engine"},
+    "Transmission Service": {"service": None, "specialization": "Transmission"},
+    "General Maintenance": {"service": "General Maintenance", "specialization": None},
+    "Sensor Replacement": {"service": None, "specialization": "Electrical"},
+}
+
+mock_api = MockAPIClient(MOCK_API_BASE, MOCK_API_POOL_LIMIT)
+
+app = FastAPI(title="Scheduling Worker", version="1.0", lifespan=mock_api.lifespan)
+
 class SchedulingTask(BaseModel):
     session_id: str
     customer_id: Optional[str] = None
@@ -17,55 +73,625 @@ class SchedulingTask(BaseModel):
     service_type: str = "General Maintenance"
     priority: str = "MEDIUM"  # LOW, MEDIUM, HIGH, CRITICAL
     preferred_date: Optional[str] = None
+    customer_location: Optional[str] = None  # e.g. "Bangalore, Karnataka"
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
 
-def find_optimal_service_center(customer_location: str = None, priority: str = "MEDIUM") -> Dict:
-    """Find the best available service center based on location and priority"""
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle distance between two points in kilometres"""
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return EARTH_RADIUS_KM * 2 * math.asin(math.sqrt(a))
+
+def sphere_points(latitudes: np.ndarray, longitudes: np.ndarray) -> np.ndarray:
+    """Unit-sphere vectors for lat/lon arrays; chord order between them is great-circle order"""
+    latitudes, longitudes = np.radians(latitudes), np.radians(longitudes)
+    return np.column_stack((np.cos(latitudes) * np.cos(longitudes),
+                            np.cos(latitudes) * np.sin(longitudes),
+                            np.sin(latitudes)))
+
+def resolve_coordinates(latitude: Optional[float] = None, longitude: Optional[float] = None,
+                        location: Optional[str] = None) -> Optional[Tuple[float, float]]:
+    """Explicit coordinates if given, otherwise the coordinates of a known city name"""
+    if latitude is not None and longitude is not None:
+        return latitude, longitude
+    if location:
+        return CITY_COORDINATES.get(location.split(",")[0].strip().lower())
+    return None
+
+class ServiceCenterIndex:
+    """Query structure over the service-centre catalogue
+    
+    Centres are bucketed into a lat/lon grid for nearest-centre search (ring by
+    ring outward from the customer), indexed by specialization and service
+    offered, and keep their availability as sorted slot lists so the first slot
+    inside a time window is a binary search. Without a customer location the
+    earliest-available ordering is used instead. Built once per catalogue.
+    """
+    
+    def __init__(self, centers: List[Dict], cell_deg: float = CENTER_GRID_CELL_DEG):
+        self.centers = centers
+        self.cell_deg = cell_deg
+        self.slots: List[List[str]] = [sorted(center.get("availability") or []) for center in centers]
+        self.coordinates: List[Optional[Tuple[float, float]]] = [
+            resolve_coordinates(center.get("latitude"), center.get("longitude"), center.get("location"))
+            for center in centers
+        ]
+        self.by_id = {center["id"]: i for i, center in enumerate(centers)}
+        
+        self.by_specialization: Dict[str, Set[int]] = {}
+        self.by_service: Dict[str, Set[int]] = {}
+        for i, center in enumerate(centers):
+            for specialization in center.get("specializations", []):
+                self.by_specialization.setdefault(specialization, set()).add(i)
+            for service in center.get("services_offered", []):
+                self.by_service.setdefault(service, set()).add(i)
+        
+        self.grid: Dict[Tuple[int, int], List[int]] = {}
+        self.unlocated: List[int] = []
+        for i, point in enumerate(self.coordinates):
+            if point is None:
+                self.unlocated.append(i)
+            else:
+                self.grid.setdefault(self._cell(*point), []).append(i)
+        rows = [cell[0] for cell in self.grid] or [0]
+        cols = [cell[1] for cell in self.grid] or [0]
+        self.grid_bounds = (min(rows), max(rows), min(cols), max(cols))
+        # KD-trees over the located centres on the unit sphere, overall and per
+        # (specialization, service) pair, for k-nearest queries over a whole fleet
+        self._trees: Dict[Tuple[Optional[str], Optional[str]], Tuple[Optional[cKDTree], np.ndarray]] = {}
+        
+        # Earliest-available ordering for queries without a location
+        self.by_first_slot = sorted(
+            (i for i in range(len(centers)) if self.slots[i]),
+            key=lambda i: (self.slots[i][0], -centers[i].get("capacity", 0))
+        )
+        # Oldest slot in the catalogue; windows are measured from here when the
+        # catalogue predates the current time (as the bundled sample data does)
+        first_slots = [slots[0] for slots in self.slots if slots]
+        self.reference_time = min([datetime.now().isoformat()] + first_slots)
+        # Windows closing before this time cannot match any centre
+        self.earliest_slot = min(first_slots) if first_slots else None
+    
+    def _cell(self, latitude: float, longitude: float) -> Tuple[int, int]:
+        return math.floor(latitude / self.cell_deg), math.floor(longitude / self.cell_deg)
+    
+    def eligible(self, specialization: Optional[str] = None, service: Optional[str] = None) -> Optional[Set[int]]:
+        """Centres offering the specialization and service, or None for no constraint"""
+        sets = []
+        if specialization:
+            sets.append(self.by_specialization.get(specialization, set()))
+        if service:
+            sets.append(self.by_service.get(service, set()))
+        if not sets:
+            return None
+        return set.intersection(*sorted(sets, key=len))
+    
+    def center_tree(self, specialization: Optional[str] = None,
+                    service: Optional[str] = None) -> Tuple[Optional[cKDTree], np.ndarray]:
+        """KD-tree over the located centres eligible for the pair, and the centre
+        index of each tree point; built once per pair"""
+        key = (specialization, service)
+        if key not in self._trees:
+            allowed = self.eligible(specialization, service)
+            members = np.array([i for i, point in enumerate(self.coordinates)
+                                if point is not None and (allowed is None or i in allowed)], dtype=int)
+            points = np.array([self.coordinates[i] for i in members], dtype=float).reshape(-1, 2)
+            tree = cKDTree(sphere_points(points[:, 0], points[:, 1])) if len(members) else None
+            self._trees[key] = (tree, members)
+        return self._trees[key]
+    
+    def nearest_many(self, latitudes: np.ndarray, longitudes: np.ndarray, k: int,
+                     specialization: Optional[str] = None,
+                     service: Optional[str] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """The k nearest eligible centres to each point, nearest first
+        
+        Returns centre indices and distances in km as (points, k) arrays, padded
+        with -1 where fewer than k centres are eligible.
+        """
+        tree, members = self.center_tree(specialization, service)
+        centers = np.full((len(latitudes), k), -1, dtype=int)
+        distances = np.zeros((len(latitudes), k))
+        width = min(k, len(members))
+        if tree is None or not len(latitudes) or not width:
+            return centers, distances
+        chords, positions = tree.query(sphere_points(latitudes, longitudes), k=width)
+        chords, positions = chords.reshape(-1, width), positions.reshape(-1, width)
+        centers[:, :width] = members[positions]
+        distances[:, :width] = 2 * EARTH_RADIUS_KM * np.arcsin(np.minimum(chords / 2, 1.0))
+        return centers, distances
+    
+    def slots_in_window(self, i: int, not_before: Optional[str] = None, not_after: Optional[str] = None) -> List[str]:
+        """Centre i's slots inside [not_before, not_after], in time order"""
+        slots = self.slots[i]
+        lo = bisect_left(slots, not_before) if not_before else 0
+        hi = bisect_right(slots, not_after) if not_after else len(slots)
+        return slots[lo:hi]
+    
+    def _window_open(self, not_after: Optional[str]) -> bool:
+        return self.earliest_slot is not None and (not_after is None or self.earliest_slot <= not_after)
+    
+    def _has_slot(self, i: int, not_before: Optional[str], not_after: Optional[str]) -> bool:
+        slots = self.slots[i]
+        lo = bisect_left(slots, not_before) if not_before else 0
+        return lo < len(slots) and (not_after is None or slots[lo] <= not_after)
+    
+    def nearby(self, latitude: float, longitude: float, accept: Callable[[int], bool],
+               k: int) -> List[Tuple[int, float]]:
+        """The k closest accepted centres, searching grid rings outward until no closer cell can exist"""
+        grid = self.grid
+        row, col = self._cell(latitude, longitude)
+        # Minimum width of one cell in km at this latitude, for the ring stopping bound
+        cell_km = self.cell_deg * 111.0 * max(math.cos(math.radians(min(abs(latitude) + self.cell_deg, 89.0))), 0.01)
+        min_row, max_row, min_col, max_col = self.grid_bounds
+        last_ring = max(abs(row - min_row), abs(row - max_row), abs(col - min_col), abs(col - max_col))
+        found: List[Tuple[float, int, int]] = []
+        
+        def visit(cell):
+            for i in grid.get(cell, ()):
+                if accept(i):
+                    distance = haversine_km(latitude, longitude, *self.coordinates[i])
+                    found.append((distance, -self.centers[i].get("capacity", 0), i))
+        
+        for ring in range(last_ring + 1):
+            if len(found) >= k and found[k - 1][0] <= (ring - 1) * cell_km:
+                break
+            if 8 * ring > len(grid):
+                # Rings now hold more cells than are occupied: visit the remaining
+                # occupied cells directly, nearest ring first
+                remaining = sorted(
+                    (max(abs(cell[0] - row), abs(cell[1] - col)), cell) for cell in grid
+                )
+                for cell_ring, cell in remaining:
+                    if cell_ring < ring:
+                        continue
+                    if len(found) >= k and found[k - 1][0] <= (cell_ring - 1) * cell_km:
+                        break
+                    visit(cell)
+                    found.sort()
+                break
+            for cell in self._ring_cells(row, col, ring):
+                visit(cell)
+            found.sort()
+        return [(i, distance) for distance, _, i in found[:k]]
+    
+    def nearest(self, latitude: float, longitude: float, accept: Callable[[int], bool]) -> Optional[Tuple[int, float]]:
+        """Closest accepted centre (larger capacity breaks ties)"""
+        found = self.nearby(latitude, longitude, accept, 1)
+        return found[0] if found else None
+    
+    @staticmethod
+    def _ring_cells(row: int, col: int, ring: int):
+        if ring == 0:
+            yield row, col
+            return
+        for d in range(-ring, ring + 1):
+            yield row - ring, col + d
+            yield row + ring, col + d
+        for d in range(-ring + 1, ring):
+            yield row + d, col - ring
+            yield row + d, col + ring
+    
+    def find(self, location: Optional[Tuple[float, float]] = None, specialization: Optional[str] = None,
+             service: Optional[str] = None, not_before: Optional[str] = None,
+             not_after: Optional[str] = None) -> Optional[Tuple[int, Optional[float]]]:
+        """Best centre with a free slot in the window: nearest if a location is known, else earliest"""
+        if not self._window_open(not_after):
+            return None
+        allowed = self.eligible(specialization, service)
+        
+        def accept(i: int) -> bool:
+            return (allowed is None or i in allowed) and self._has_slot(i, not_before, not_after)
+        
+        if location is not None and self.grid:
+            found = self.nearest(location[0], location[1], accept)
+            if found is not None:
+                return found
+        
+        # Earliest-available order; only the head is normally inspected
+        for i in self.by_first_slot:
+            if accept(i):
+                return i, None
+        return None
+
+class ServiceCenterCatalogue:
+    """Local cache of the service-centre catalogue and its index
+    
+    The cached index is served for ``ttl`` seconds, then revalidated with a
+    conditional GET. A 304, or a 200 whose body is byte-identical to the cached
+    one, just renews it; the index is rebuilt only when the content changed.
+    If the mock API is unreachable the last good index keeps being served.
+    """
+    
+    def __init__(self, ttl: float = CATALOGUE_TTL_SECONDS):
+        self.ttl = ttl
+        self.index: Optional[ServiceCenterIndex] = None
+        self.validators: Dict[str, str] = {}
+        self.digest: Optional[str] = None
+        self.checked_at = 0.0
+        self.stats = {"hits": 0, "not_modified": 0, "unchanged": 0, "rebuilds": 0, "errors": 0}
+        self._lock: Optional[asyncio.Lock] = None
+    
+    async def get(self, max_age: Optional[float] = None) -> Optional[ServiceCenterIndex]:
+        """The catalogue index, revalidated if older than ``max_age`` (default: the TTL)"""
+        max_age = self.ttl if max_age is None else max_age
+        if self.index is not None and time.monotonic() - self.checked_at < max_age:
+            self.stats["hits"] += 1
+            return self.index
+        
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            # Concurrent callers share one revalidation
+            if self.index is not None and time.monotonic() - self.checked_at < max_age:
+                self.stats["hits"] += 1
+                return self.index
+            try:
+                await self._revalidate()
+            except Exception:
+                self.stats["errors"] += 1
+            return self.index
+    
+    async def _revalidate(self):
+        status, validators, body = await mock_api.get_conditional(
+            "/service-centers/availability", timeout=5, validators=self.validators if self.index else {}
+        )
+        if status == 304 and self.index is not None:
+            self.stats["not_modified"] += 1
+        elif status == 200:
+            digest = hashlib.sha256(body).hexdigest()
+            if digest == self.digest and self.index is not None:
+                self.stats["unchanged"] += 1
+            else:
+                self.index = ServiceCenterIndex(json.loads(body).get("centers", []))
+                self.digest = digest
+                self.stats["rebuilds"] += 1
+            self.validators = validators
+        else:
+            self.stats["errors"] += 1
+            return
+        self.checked_at = time.monotonic()
+
+service_center_catalogue = ServiceCenterCatalogue()
+
+async def load_service_center_index(max_age: Optional[float] = None) -> Optional[ServiceCenterIndex]:
+    """The indexed service-centre catalogue, from the local cache when fresh enough"""
+    return await service_center_catalogue.get(max_age)
+
+def select_service_center(index: ServiceCenterIndex, customer_location: Optional[Tuple[float, float]] = None,
+                          priority: str = "MEDIUM", service_type: str = "General Maintenance",
+                          preferred_date: Optional[str] = None) -> Dict:
+    """Pick the best centre and slots for one vehicle from an indexed catalogue"""
+    urgency = calculate_service_urgency(priority, service_type)
+    requirements = SERVICE_REQUIREMENTS.get(service_type, {})
+    specialization = requirements.get("specialization") if urgency["requires_specialist"] else None
+    if preferred_date and parse_slot_time(preferred_date) is None:
+        # As before windows existed, a date we cannot read just doesn't constrain the search
+        not_before, not_after = None, None
+    else:
+        not_before, not_after = scheduling_window(index, priority, service_type, preferred_date)
+    
+    # Relax constraints step by step rather than fail: specialist and service
+    # within the urgency window, then any centre in the window, then any slot
+    found = (
+        index.find(customer_location, specialization, requirements.get("service"), not_before, not_after)
+        or index.find(customer_location, None, None, not_before, not_after)
+        or index.find(customer_location, None, None, not_before)
+    )
+    if found is None:
+        return {"error": "No available service centers"}
+    
+    i, distance_km = found
+    center = index.centers[i]
+    available_slots = index.slots_in_window(i, not_before, not_after) or index.slots_in_window(i, not_before)
+    # Priority customers get the earliest slots
+    if priority in ["HIGH", "CRITICAL"]:
+        available_slots = available_slots[:2]
+    
+    return {
+        "center_id": center["id"],
+        "center_name": center["name"],
+        "location": center["location"],
+        "available_dates": available_slots,
+        "recommended_date": available_slots[0],
+        "capacity": center["capacity"],
+        "distance_km": round(distance_km, 1) if distance_km is not None else None
+    }
+
+def parse_slot_time(value: Any) -> Optional[datetime]:
+    """Parse an ISO date or timestamp as naive local time (like the catalogue's
+    slots), or None if it is missing or malformed"""
+    if not isinstance(value, str):
+        return None
     try:
-        # Fetch available service centers
-        centers_response = requests.get(f"{MOCK_API_BASE}/service-centers/availability", timeout=5)
-        if centers_response.status_code != 200:
-            return {"error": "Service centers unavailable"}
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone().replace(tzinfo=None)
+    return parsed
+
+def scheduling_window(index: ServiceCenterIndex, priority: str, service_type: str,
+                      preferred_date: Optional[str]) -> Tuple[Optional[str], str]:
+    """Earliest and latest acceptable slot times for a vehicle
+    
+    A preferred date that cannot be parsed is treated as absent, so the window
+    starts from the catalogue's reference time instead.
+    """
+    urgency = calculate_service_urgency(priority, service_type)
+    preferred = parse_slot_time(preferred_date)
+    not_before = preferred.isoformat() if preferred is not None else None
+    start = preferred or datetime.fromisoformat(index.reference_time)
+    return not_before, (start + timedelta(days=urgency["max_wait_days"])).isoformat()
+
+def solve_assignment(rows: List[int], cols: List[int], costs: List[float],
+                     row_count: int, col_count: int) -> List[Tuple[int, int]]:
+    """Minimum-cost matching of every row, solved per connected component
+    
+    Vehicles in different regions never compete for the same slots, so the
+    graph falls apart into many small independent problems that are far
+    cheaper to solve one at a time than as one large one.
+    """
+    rows, cols, costs = np.asarray(rows), np.asarray(cols), np.asarray(costs, dtype=float)
+    adjacency = csr_matrix((np.ones(len(rows)), (rows, cols + row_count)),
+                           shape=(row_count + col_count, row_count + col_count))
+    _, labels = connected_components(adjacency, directed=False)
+    row_labels = labels[:row_count]
+    edge_order = np.argsort(row_labels[rows], kind="stable")
+    edge_labels = row_labels[rows][edge_order]
+    
+    matches: List[Tuple[int, int]] = []
+    for label in np.unique(row_labels):
+        lo, hi = np.searchsorted(edge_labels, [label, label + 1])
+        edges = edge_order[lo:hi]
+        component_rows, row_positions = np.unique(rows[edges], return_inverse=True)
+        component_cols, col_positions = np.unique(cols[edges], return_inverse=True)
+        graph = csr_matrix((costs[edges], (row_positions, col_positions)),
+                           shape=(len(component_rows), len(component_cols)))
+        matched_rows, matched_cols = min_weight_full_bipartite_matching(graph)
+        matches.extend(zip(component_rows[matched_rows].tolist(), component_cols[matched_cols].tolist()))
+    return matches
+
+def optimize_fleet_assignment(index: ServiceCenterIndex, tasks: List["SchedulingTask"]) -> List[Dict]:
+    """Assign a whole fleet to centres and slots in one min-cost matching
+    
+    Every slot is one unit of capacity, and a centre offers at most ``capacity``
+    slot units per day. Each vehicle is connected to free slot units of its
+    nearest (or earliest) centres at a cost of travel distance plus
+    priority-weighted waiting time, and to a private "unassigned" node whose
+    cost grows with priority. Constraints relax in levels, each costlier than
+    the last: eligible centres inside the max_wait_days window, any centre
+    inside the window, then any centre after it. A vehicle gets the next
+    level's units whenever the previous levels offered it fewer than a centre's
+    worth. A minimum-weight full bipartite matching over that sparse graph
+    gives the globally cheapest assignment.
+    
+    Vehicles left unassigned are matched again against the remaining units
+    with twice the centres and units per centre each round, until none of them
+    can reach a free unit or the graph holds every feasible edge. Candidate
+    centres come from KD-tree queries and the per-centre unit ranges from
+    searches over one sorted array, so each round is a handful of array
+    operations rather than a loop over vehicles. Returns one
+    ``select_service_center``-shaped result (or an error) per task, in input
+    order.
+    """
+    center_count = len(index.centers)
+    
+    # Slot units in (centre, time) order, respecting each centre's daily
+    # capacity, with their times in hours for the waiting cost
+    unit_slots: List[str] = []
+    unit_centers: List[int] = []
+    unit_times: List[float] = []
+    for i, slots in enumerate(index.slots):
+        per_day: Dict[str, int] = {}
+        capacity = index.centers[i].get("capacity", 1)
+        for slot in slots:
+            day = slot[:10]
+            # Slots the catalogue lists in a malformed format cannot be scheduled
+            time_ = parse_slot_time(slot)
+            if time_ is not None and per_day.get(day, 0) < capacity:
+                per_day[day] = per_day.get(day, 0) + 1
+                unit_slots.append(slot)
+                unit_centers.append(i)
+                unit_times.append(time_.timestamp() / 3600)
+    unit_center = np.array(unit_centers, dtype=int)
+    unit_hour = np.array(unit_times, dtype=float)
+    order = np.lexsort((unit_hour, unit_center))
+    unit_slots = [unit_slots[u] for u in order]
+    unit_center, unit_hour = unit_center[order], unit_hour[order]
+    free = np.ones(len(unit_slots), dtype=bool)
+    
+    # Units are searched by a key that sorts by centre, then time: each
+    # centre's units occupy their own stretch of width ``span``
+    origin = unit_hour.min() if len(unit_hour) else 0.0
+    span = (unit_hour.max() - origin if len(unit_hour) else 0.0) + 2.0
+    
+    def offset(hours: np.ndarray) -> np.ndarray:
+        return np.clip(hours - origin, -0.5, span - 1.0)
+    
+    # Per-vehicle plan as arrays
+    vehicle_count = len(tasks)
+    latitude = np.zeros(vehicle_count)
+    longitude = np.zeros(vehicle_count)
+    located = np.zeros(vehicle_count, dtype=bool)
+    not_before = np.full(vehicle_count, -np.inf)
+    not_after = np.zeros(vehicle_count)
+    window_start = np.zeros(vehicle_count)
+    wait_cost = np.zeros(vehicle_count)
+    unassigned_cost = np.zeros(vehicle_count)
+    groups: Dict[Tuple[Optional[str], Optional[str]], int] = {}
+    group = np.zeros(vehicle_count, dtype=int)
+    reference_hour = datetime.fromisoformat(index.reference_time).timestamp() / 3600
+    for v, task in enumerate(tasks):
+        requirements = SERVICE_REQUIREMENTS.get(task.service_type, {})
+        urgency = calculate_service_urgency(task.priority, task.service_type)
+        window = scheduling_window(index, task.priority, task.service_type, task.preferred_date)
+        location = resolve_coordinates(task.latitude, task.longitude, task.customer_location)
+        if location is not None:
+            latitude[v], longitude[v] = location
+            located[v] = True
+        if window[0] is not None:
+            not_before[v] = datetime.fromisoformat(window[0]).timestamp() / 3600
+        not_after[v] = datetime.fromisoformat(window[1]).timestamp() / 3600
+        window_start[v] = not_before[v] if window[0] is not None else reference_hour
+        wait_cost[v] = PRIORITY_WAIT_COST_PER_HOUR.get(task.priority, PRIORITY_WAIT_COST_PER_HOUR["MEDIUM"])
+        unassigned_cost[v] = PRIORITY_UNASSIGNED_COST.get(task.priority, PRIORITY_UNASSIGNED_COST["MEDIUM"])
+        key = (requirements.get("specialization") if urgency["requires_specialist"] else None,
+               requirements.get("service"))
+        group[v] = groups.setdefault(key, len(groups))
+    
+    eligible = np.ones((len(groups), center_count), dtype=bool)
+    for key, g in groups.items():
+        allowed = index.eligible(*key)
+        if allowed is not None:
+            eligible[g] = False
+            eligible[g, list(allowed)] = True
+    # Vehicles without a location (or a catalogue without located centres)
+    # take centres in earliest-available order, as select_service_center does
+    if index.center_tree()[0] is None:
+        located[:] = False
+    by_first_slot = np.array(index.by_first_slot, dtype=int)
+    has_coordinates = np.array([point is not None for point in index.coordinates], dtype=bool)
+    
+    def candidate_centers(vehicles: np.ndarray, k: int,
+                          key: Tuple[Optional[str], Optional[str]] = (None, None)) -> Tuple[np.ndarray, np.ndarray]:
+        """(vehicles, k) arrays of candidate centres (-1 padded) and distances"""
+        centers = np.full((len(vehicles), k), -1, dtype=int)
+        distances = np.zeros((len(vehicles), k))
+        near = located[vehicles]
+        centers[near], distances[near] = index.nearest_many(
+            latitude[vehicles[near]], longitude[vehicles[near]], k, *key)
+        allowed = index.eligible(*key)
+        earliest = [i for i in by_first_slot if allowed is None or i in allowed][:k]
+        centers[~near, :len(earliest)] = earliest
+        return centers, distances
+    
+    assigned_unit = np.full(vehicle_count, -1, dtype=int)
+    pending = np.arange(vehicle_count)
+    round_number = 0
+    while len(pending) and free.any():
+        free_units = np.flatnonzero(free)
+        free_center = unit_center[free_units]
+        free_key = free_center * span + offset(unit_hour[free_units])
+        center_end = np.searchsorted(free_center, np.arange(center_count), side="right")
+        free_per_center = np.diff(np.concatenate(([0], center_end)))
         
-        centers = centers_response.json().get("centers", [])
+        # Vehicles whose window opens after the last free unit they could
+        # reach can never be matched
+        latest = np.full(center_count, -np.inf)
+        latest[free_center] = unit_hour[free_units]
+        reachable_from = np.where(located[pending], latest[has_coordinates].max(initial=-np.inf), latest.max())
+        pending = pending[not_before[pending] <= reachable_from]
+        if not len(pending):
+            break
         
-        # Filter by availability and priority
-        available_centers = []
-        for center in centers:
-            if center.get("availability") and len(center["availability"]) > 0:
-                # Priority customers get better time slots
-                if priority in ["HIGH", "CRITICAL"]:
-                    # Reserve earliest slots for high priority
-                    available_slots = center["availability"][:2]
-                else:
-                    available_slots = center["availability"]
-                
-                if available_slots:
-                    available_centers.append({
-                        **center,
-                        "available_slots": available_slots,
-                        "distance_score": random.uniform(0.5, 1.0)  # Mock distance scoring
-                    })
-        
-        if not available_centers:
-            return {"error": "No available service centers"}
-        
-        # Sort by distance and capacity
-        best_center = sorted(available_centers, 
-                           key=lambda x: (x["distance_score"], -x["capacity"]))[0]
+        k = min(OPTIMIZER_CANDIDATE_CENTERS << round_number, center_count)
+        per_center = OPTIMIZER_SLOTS_PER_CENTER << round_number
+        saturated = k >= center_count and per_center >= free_per_center.max()
+        # The final round offers every feasible edge, so its matching is maximal
+        budget = np.inf if saturated else per_center
         
-        return {
-            "center_id": best_center["id"],
-            "center_name": best_center["name"],
-            "location": best_center["location"],
-            "available_dates": best_center["available_slots"],
-            "recommended_date": best_center["available_slots"][0],
-            "capacity": best_center["capacity"]
-        }
+        # (vehicle, centre) candidate pairs: eligible centres per constraint
+        # group for the first level, any centre for the relaxed levels
+        pair_rows, pair_centers, pair_distances = [], [], []
+        for g in np.unique(group[pending]):
+            rows = np.flatnonzero(group[pending] == g)
+            centers, distances = candidate_centers(pending[rows], k, list(groups)[g])
+            pair_rows.append(np.repeat(rows, k))
+            pair_centers.append(centers.ravel())
+            pair_distances.append(distances.ravel())
+        eligible_pairs = (np.concatenate(pair_rows), np.concatenate(pair_centers), np.concatenate(pair_distances))
+        centers, distances = candidate_centers(pending, k)
+        any_pairs = (np.repeat(np.arange(len(pending)), k), centers.ravel(), distances.ravel())
+        
+        def unit_range(pairs, low_hours, high_hours):
+            rows, centers_ = pairs[0], pairs[1]
+            low = np.searchsorted(free_key, centers_ * span + offset(low_hours[pending[rows]]), side="left")
+            high = np.searchsorted(free_key, centers_ * span + offset(high_hours[pending[rows]]), side="right")
+            return low, np.maximum(high, low)
+        
+        levels = []
+        valid = eligible_pairs[1] >= 0
+        eligible_pairs = tuple(a[valid] for a in eligible_pairs)
+        low, high = unit_range(eligible_pairs, not_before, not_after)
+        levels.append((eligible_pairs, low, high))
+        valid = any_pairs[1] >= 0
+        any_pairs = tuple(a[valid] for a in any_pairs)
+        low, high = unit_range(any_pairs, not_before, not_after)
+        # Eligible centres' in-window units are already offered by the first level
+        relaxed = ~eligible[group[pending[any_pairs[0]]], any_pairs[1]]
+        levels.append((tuple(a[relaxed] for a in any_pairs), low[relaxed], high[relaxed]))
+        # After the window: from the window's end to the centre's last unit
+        levels.append((any_pairs, high, center_end[any_pairs[1]]))
+        
+        offered = np.zeros(len(pending))
+        edge_rows, edge_units, edge_costs = [], [], []
+        for level, ((rows, _, distances), low, high) in enumerate(levels):
+            take = offered[rows] < budget
+            count = np.minimum(high - low, budget if saturated else per_center)[take].astype(int)
+            rows, low, distances = rows[take], low[take], distances[take]
+            positions = np.repeat(low - np.cumsum(count) + count, count) + np.arange(count.sum())
+            rows, distances = np.repeat(rows, count), np.repeat(distances, count)
+            vehicles = pending[rows]
+            waiting = np.maximum(unit_hour[free_units[positions]] - window_start[vehicles], 0.0)
+            # +1 keeps every real edge strictly positive (zeros would be dropped)
+            edge_rows.append(rows)
+            edge_units.append(positions)
+            edge_costs.append(1.0 + distances + level * RELAXED_CONSTRAINT_COST + waiting * wait_cost[vehicles])
+            offered += np.bincount(rows, minlength=len(pending))
+        
+        rows = np.concatenate(edge_rows)
+        columns, cols = np.unique(np.concatenate(edge_units), return_inverse=True)
+        # One private "unassigned" column per vehicle keeps a full matching feasible
+        rows = np.concatenate((rows, np.arange(len(pending))))
+        cols = np.concatenate((cols, len(columns) + np.arange(len(pending))))
+        costs = np.concatenate(edge_costs + [unassigned_cost[pending]])
+        
+        matches = solve_assignment(rows, cols, costs, len(pending), len(columns) + len(pending))
+        matched = np.array([(row, col) for row, col in matches if col < len(columns)], dtype=int).reshape(-1, 2)
+        units = free_units[columns[matched[:, 1]]]
+        assigned_unit[pending[matched[:, 0]]] = units
+        free[units] = False
+        pending = np.setdiff1d(pending, pending[matched[:, 0]])
+        
+        if saturated:
+            break
+        round_number += 1
+    
+    results = []
+    for v, task in enumerate(tasks):
+        unit = assigned_unit[v]
+        if unit < 0:
+            results.append({"error": "No available service centers"})
+            continue
+        i, slot = unit_center[unit], unit_slots[unit]
+        center = index.centers[i]
+        distance_km = (haversine_km(latitude[v], longitude[v], *index.coordinates[i])
+                       if located[v] and index.coordinates[i] is not None else None)
+        results.append({
+            "center_id": center["id"],
+            "center_name": center["name"],
+            "location": center["location"],
+            "available_dates": [slot],
+            "recommended_date": slot,
+            "capacity": center["capacity"],
+            "distance_km": round(distance_km, 1) if distance_km is not None else None
+        })
+    return results
+
+async def find_optimal_service_center(customer_location: Optional[Tuple[float, float]] = None, priority: str = "MEDIUM",
+                                      service_type: str = "General Maintenance", preferred_date: Optional[str] = None) -> Dict:
+    """Find the best available service center based on location and priority"""
+    try:
+        index = await load_service_center_index()
+        if index is None:
+            return {"error": "Service centers unavailable"}
+        return select_service_center(index, customer_location, priority, service_type, preferred_date)
     
     except Exception as e:
         return {"error": f"Center lookup failed: {str(e)}"}
 
-def book_service_appointment(center_id: str, customer_id: str, vin: str, 
+async def book_service_appointment(center_id: str, customer_id: str, vin: str, 
                            service_type: str, preferred_date: str) -> Dict:
     """Book a service appointment at the selected center"""
     try:
@@ -76,16 +702,17 @@ def book_service_appointment(center_id: str, customer_id: str, vin: str,
             "preferred_date": preferred_date
         }
         
-        booking_response = requests.post(
-            f"{MOCK_API_BASE}/service-centers/{center_id}/book",
-            json=booking_data,
-            timeout=10
-        )
+        status, body = await mock_api.post(f"/service-centers/{center_id}/book", booking_data, timeout=10)
         
-        if booking_response.status_code == 200:
-            return booking_response.json()
+        if status == 409 and preferred_date:
+            # Slot taken meanwhile: take the centre's next free slot from that day on
+            booking_data["preferred_date"] = preferred_date[:10]
+            status, body = await mock_api.post(f"/service-centers/{center_id}/book", booking_data, timeout=10)
+        
+        if status == 200:
+            return body
         else:
-            return {"error": f"Booking failed with status {booking_response.status_code}"}
+            return {"error": f"Booking failed with status {status}"}
     
     except Exception as e:
         return {"error": f"Booking request failed: {str(e)}"}
@@ -118,14 +745,19 @@ def calculate_service_urgency(priority: str, service_type: str) -> Dict:
     }
 
 @app.post("/task")
-def schedule_service(task: SchedulingTask):
+async def schedule_service(task: SchedulingTask):
     """Schedule service appointment for vehicle"""
     try:
         # Calculate service urgency
         urgency_info = calculate_service_urgency(task.priority, task.service_type)
         
         # Find optimal service center
-        center_info = find_optimal_service_center(priority=task.priority)
+        center_info = await find_optimal_service_center(
+            customer_location=resolve_coordinates(task.latitude, task.longitude, task.customer_location),
+            priority=task.priority,
+            service_type=task.service_type,
+            preferred_date=task.preferred_date
+        )
         
         if "error" in center_info:
             return {
@@ -134,15 +766,40 @@ def schedule_service(task: SchedulingTask):
                 "confidence": 0.0
             }
         
+        booking_date = task.preferred_date if parse_slot_time(task.preferred_date) else center_info["recommended_date"]
+        return await book_selected_center(task, urgency_info, center_info, booking_date)
+        
+    except Exception as e:
+        return {
+            "worker": "scheduling",
+            "error": f"Scheduling failed: {str(e)}",
+            "confidence": 0.0
+        }
+
+async def book_selected_center(task: SchedulingTask, urgency_info: Dict, center_info: Dict, booking_date: str) -> Dict:
+    """Book a vehicle at an already selected centre and build the worker response"""
+    try:
         # Book the appointment
-        booking_result = book_service_appointment(
+        booking_result = await book_service_appointment(
             center_id=center_info["center_id"],
             customer_id=task.customer_id,
             vin=task.vin,
             service_type=task.service_type,
-            preferred_date=task.preferred_date or center_info["recommended_date"]
+            preferred_date=booking_date
         )
         
+        return booking_response(task, urgency_info, center_info, booking_result)
+        
+    except Exception as e:
+        return {
+            "worker": "scheduling",
+            "error": f"Scheduling failed: {str(e)}",
+            "confidence": 0.0
+        }
+
+def booking_response(task: SchedulingTask, urgency_info: Dict, center_info: Dict, booking_result: Dict) -> Dict:
+    """Worker response for a booking confirmation (or booking error)"""
+    try:
         if "error" in booking_result:
             return {
                 "worker": "scheduling",
@@ -181,37 +838,169 @@ def schedule_service(task: SchedulingTask):
             "confidence": 0.0
         }
 
+async def plan_fleet_schedule(fleet_vehicles: List[Dict]) -> Tuple[Optional[List[SchedulingTask]], List[Dict]]:
+    """Fetch the catalogue once and assign the fleet, most urgent vehicles first"""
+    # Sort by priority for optimal scheduling
+    sorted_vehicles = sorted(fleet_vehicles, 
+                           key=lambda x: {"CRITICAL": 4, "HIGH": 3, "MEDIUM": 2, "LOW": 1}.get(x.get("priority", "MEDIUM"), 2),
+                           reverse=True)
+    
+    # Revalidate before planning a batch; unchanged availability costs only a 304
+    index = await load_service_center_index(max_age=0)
+    if index is None:
+        return None, []
+    
+    tasks = [SchedulingTask(**vehicle) for vehicle in sorted_vehicles]
+    # The matching is CPU-bound; keep the event loop serving other requests meanwhile
+    assignments = await asyncio.to_thread(optimize_fleet_assignment, index, tasks)
+    return tasks, assignments
+
+async def book_fleet(tasks: List[SchedulingTask], assignments: List[Dict]):
+    """Book every assigned slot, yielding ``(position, {"vin", "result"})`` pairs in completion order
+    
+    Assigned slots go to the mock API's bulk booking endpoint in chunks of
+    BULK_BOOKING_CHUNK, BATCH_BOOKING_CONCURRENCY chunks at a time. Each chunk
+    carries a batch id and is retried with it after timeouts or 5xx, so a chunk
+    the server already committed is replayed, never booked twice; while the
+    server reports the batch in progress, it is polled until it completes. Items that
+    conflict are retried through the single booking path (which falls back to
+    the centre's next free slot), as are whole chunks when the mock API has no
+    bulk endpoint.
+    """
+    semaphore = asyncio.Semaphore(BATCH_BOOKING_CONCURRENCY)
+    
+    def item(position: int, result: Dict) -> Tuple[int, Dict]:
+        return position, {"vin": tasks[position].vin, "result": result}
+    
+    async def book_one(position: int) -> Tuple[int, Dict]:
+        task, center_info = tasks[position], assignments[position]
+        urgency_info = calculate_service_urgency(task.priority, task.service_type)
+        return item(position, await book_selected_center(task, urgency_info, center_info, center_info["recommended_date"]))
+    
+    async def book_chunk(positions: List[int]) -> List[Tuple[int, Dict]]:
+        payload = {
+            # Retries reuse the batch id, so the mock API replays a batch it has
+            # already committed instead of booking it again
+            "batch_id": f"BATCH_{uuid.uuid4().hex.upper()}",
+            "bookings": [
+                {
+                    "center_id": assignments[position]["center_id"],
+                    "customer_id": tasks[position].customer_id,
+                    "vin": tasks[position].vin,
+                    "service_type": tasks[position].service_type,
+                    "preferred_date": assignments[position]["recommended_date"]
+                }
+                for position in positions
+            ]
+        }
+        async with semaphore:
+            loop = asyncio.get_running_loop()
+            poll_until = loop.time() + BULK_BOOKING_POLL_SECONDS
+            status, body = None, None
+            failures, polls = 0, 0
+            while True:
+                try:
+                    status, body = await mock_api.post("/service-centers/bookings/bulk", payload, timeout=30)
+                except Exception:
+                    status, body = None, None
+                if status == 409:
+                    # An earlier attempt is still being processed and may commit:
+                    # wait for its outcome rather than report the chunk as failed
+                    if loop.time() >= poll_until:
+                        break
+                    polls += 1
+                    await asyncio.sleep(min(0.25 * 2 ** (polls - 1), 5.0))
+                    continue
+                # Timeouts and 5xx may or may not have committed; the retry replays or books
+                if status is not None and status < 500:
+                    break
+                failures += 1
+                if failures >= BULK_BOOKING_ATTEMPTS:
+                    break
+                await asyncio.sleep(0.5 * 2 ** (failures - 1))
+            
+            if status in (404, 405):
+                # No bulk endpoint: nothing was booked, so single bookings are safe
+                return list(await asyncio.gather(*(book_one(position) for position in positions)))
+            if status != 200:
+                outcome = "is still in progress" if status == 409 else f"failed with status {status}"
+                error = {"worker": "scheduling", "error": f"Bulk booking {payload['batch_id']} {outcome}",
+                         "confidence": 0.0}
+                return [item(position, error) for position in positions]
+            
+            booked, conflicted = [], []
+            for position, booking_result in zip(positions, body["results"]):
+                task = tasks[position]
+                urgency_info = calculate_service_urgency(task.priority, task.service_type)
+                if booking_result.get("status") == "conflict":
+                    conflicted.append(position)
+                else:
+                    booked.append(item(position, booking_response(task, urgency_info, assignments[position], booking_result)))
+            # Conflicts were not booked; retry those through the single path
+            return booked + list(await asyncio.gather(*(book_one(position) for position in conflicted)))
+    
+    unassigned = [item(position, {"worker": "scheduling", "error": center_info["error"], "confidence": 0.0})
+                  for position, center_info in enumerate(assignments) if "error" in center_info]
+    for pair in unassigned:
+        yield pair
+    
+    assigned = [position for position, center_info in enumerate(assignments) if "error" not in center_info]
+    pending = [asyncio.ensure_future(book_chunk(assigned[i:i + BULK_BOOKING_CHUNK]))
+               for i in range(0, len(assigned), BULK_BOOKING_CHUNK)]
+    try:
+        for finished in asyncio.as_completed(pending):
+            for pair in await finished:
+                yield pair
+    finally:
+        # A client that stops reading a stream should not leave bookings running
+        for future in pending:
+            future.cancel()
+
+def batch_summary(total_vehicles: int, batch_results: List[Dict]) -> Dict:
+    successful_bookings = sum(1 for r in batch_results if r["result"].get("confidence", 0) > 0.7)
+    return {
+        "batch_scheduling": True,
+        "total_vehicles": total_vehicles,
+        "successful_bookings": successful_bookings,
+        "success_rate": successful_bookings / total_vehicles if total_vehicles else 0.0
+    }
+
 @app.post("/batch-schedule")
-def batch_schedule_fleet(fleet_vehicles: List[Dict]):
-    """Schedule multiple vehicles for fleet management"""
+async def batch_schedule_fleet(fleet_vehicles: List[Dict], stream: bool = False):
+    """Schedule multiple vehicles for fleet management
+    
+    With ``stream=true`` the per-vehicle results are sent as NDJSON lines as the
+    bookings complete, followed by a summary line.
+    """
     try:
-        batch_results = []
-        
-        # Sort by priority for optimal scheduling
-        sorted_vehicles = sorted(fleet_vehicles, 
-                               key=lambda x: {"CRITICAL": 4, "HIGH": 3, "MEDIUM": 2, "LOW": 1}.get(x.get("priority", "MEDIUM"), 2),
-                               reverse=True)
+        tasks, assignments = await plan_fleet_schedule(fleet_vehicles)
+        if tasks is None:
+            return {
+                "worker": "scheduling",
+                "error": "Service centers unavailable",
+                "confidence": 0.0
+            }
         
-        for vehicle in sorted_vehicles:
-            task = SchedulingTask(**vehicle)
-            result = schedule_service(task)
-            batch_results.append({
-                "vin": vehicle["vin"],
-                "result": result
-            })
+        if stream:
+            async def result_stream():
+                batch_results = []
+                async for _, item in book_fleet(tasks, assignments):
+                    batch_results.append(item)
+                    yield json.dumps({"type": "result", **item}) + "\n"
+                yield json.dumps({"type": "summary", **batch_summary(len(fleet_vehicles), batch_results)}) + "\n"
+            
+            return StreamingResponse(result_stream(), media_type="application/x-ndjson")
         
-        successful_bookings = sum(1 for r in batch_results if r["result"].get("confidence", 0) > 0.7)
+        # Results keep the priority order of the unstreamed response
+        batch_results: List[Optional[Dict]] = [None] * len(tasks)
+        async for position, item in book_fleet(tasks, assignments):
+            batch_results[position] = item
         
+        summary = batch_summary(len(fleet_vehicles), batch_results)
         return {
             "worker": "scheduling",
-            "data": {
-                "batch_scheduling": True,
-                "total_vehicles": len(fleet_vehicles),
-                "successful_bookings": successful_bookings,
-                "success_rate": successful_bookings / len(fleet_vehicles),
-                "results": batch_results
-            },
-            "confidence": successful_bookings / len(fleet_vehicles),
+            "data": {**summary, "results": batch_results},
+            "confidence": summary["success_rate"],
             "sources": ["fleet_management"]
         }
         
@@ -224,7 +1013,7 @@ def batch_schedule_fleet(fleet_vehicles: List[Dict]):
 
 @app.get("/health")
 def health_check():
-    return {"status": "healthy", "worker": "scheduling"}
+    return {"status": "healthy", "worker": "scheduling", "catalogue_cache": service_center_catalogue.stats}
 
 if __name__ == "__main__":
     import uvicorn
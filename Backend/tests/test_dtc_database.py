@@ -0,0 +1,43 @@
+"""DTC index of the diagnosis worker"""
+
+import importlib.util
+import os
+import sys
+
+import pytest
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(BACKEND, "workers", "common"))
+
+spec = importlib.util.spec_from_file_location("diagnosis", os.path.join(BACKEND, "workers", "diagnosis", "app.py"))
+diagnosis = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(diagnosis)
+
+@pytest.fixture
+def database():
+    return diagnosis.DTCDatabase()
+
+def test_mutating_lookups_does_not_corrupt_the_index(database):
+    code = database.codes[0]
+    info = database.get_dtc_info(code)
+    info["severity"] = "BOGUS"
+    info["common_causes"].append("tampered")
+    analyzed = database.analyze_dtc_codes([code])["codes_analyzed"][0]
+    analyzed["estimated_cost"] = -1
+    analyzed["common_causes"].clear()
+
+    fresh = database.get_dtc_info(code)
+    assert fresh["severity"] != "BOGUS"
+    assert "tampered" not in fresh["common_causes"]
+    again = database.analyze_dtc_codes([code])
+    assert again["codes_analyzed"][0]["estimated_cost"] == fresh["estimated_cost"]
+    assert again["codes_analyzed"][0]["common_causes"] == fresh["common_causes"]
+    with pytest.raises(TypeError):
+        database.dtc_codes[code]["severity"] = "BOGUS"
+
+def test_codes_analyzed_keep_the_original_fields(database):
+    code = database.codes[0]
+    entry = database.analyze_dtc_codes([code])["codes_analyzed"][0]
+    assert set(entry) == {"code", "description", "severity", "component", "common_causes",
+                          "estimated_cost", "repair_time_hours"}
+    assert isinstance(entry["common_causes"], list)
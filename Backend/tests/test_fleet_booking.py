@@ -0,0 +1,58 @@
+"""Fleet booking through the mock API's bulk endpoint"""
+
+import asyncio
+import importlib.util
+import os
+import sys
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(BACKEND, "workers", "common"))
+
+spec = importlib.util.spec_from_file_location("scheduling_worker", os.path.join(BACKEND, "scheduling-worker.py"))
+scheduling = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(scheduling)
+
+def fleet(count):
+    tasks = [scheduling.SchedulingTask(session_id="test", vin=f"VIN{v}") for v in range(count)]
+    assignments = [{"center_id": "SC001", "center_name": "Center", "location": "Bangalore, Karnataka",
+                    "recommended_date": f"2024-03-10T{9 + v:02d}:00:00", "capacity": 10, "distance_km": 1.0}
+                   for v in range(count)]
+    return tasks, assignments
+
+def book(tasks, assignments):
+    async def collect():
+        return [pair async for pair in scheduling.book_fleet(tasks, assignments)]
+    return dict(asyncio.run(collect()))
+
+def test_in_progress_batches_are_polled_until_they_complete(monkeypatch):
+    tasks, assignments = fleet(3)
+    calls = []
+
+    async def post(path, payload, timeout):
+        calls.append(payload["batch_id"])
+        if len(calls) < 4:
+            return 409, None
+        return 200, {"batch_id": payload["batch_id"], "results": [
+            {"booking_id": f"BOOK_{i}", "status": "confirmed", "appointment_date": booking["preferred_date"]}
+            for i, booking in enumerate(payload["bookings"])
+        ]}
+
+    monkeypatch.setattr(scheduling.mock_api, "post", post)
+    monkeypatch.setattr(scheduling, "BULK_BOOKING_ATTEMPTS", 1)
+    results = book(tasks, assignments)
+
+    assert len(set(calls)) == 1
+    assert all("error" not in results[position]["result"] for position in range(3))
+
+def test_unresolved_batches_report_their_batch_id(monkeypatch):
+    tasks, assignments = fleet(2)
+
+    async def post(path, payload, timeout):
+        return 409, None
+
+    monkeypatch.setattr(scheduling.mock_api, "post", post)
+    monkeypatch.setattr(scheduling, "BULK_BOOKING_POLL_SECONDS", 0.3)
+    results = book(tasks, assignments)
+
+    errors = [results[position]["result"]["error"] for position in range(2)]
+    assert all("BATCH_" in error and "in progress" in error for error in errors)
@@ -0,0 +1,70 @@
+"""Fleet assignment optimizer: completeness and the 10k-vehicle benchmark"""
+
+import importlib.util
+import os
+import random
+import sys
+import time
+from collections import Counter
+
+import pytest
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(BACKEND, "workers", "common"))
+sys.path.insert(0, os.path.join(BACKEND, "infra", "mockapi"))
+
+from synthetic_fleet import CITIES, SyntheticFleet  # noqa: E402
+
+spec = importlib.util.spec_from_file_location("scheduling_worker", os.path.join(BACKEND, "scheduling-worker.py"))
+scheduling = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(scheduling)
+
+# Generous bound for slow CI machines; the matching takes a few seconds locally
+BENCHMARK_SECONDS = float(os.getenv("OPTIMIZER_BENCHMARK_SECONDS", "20"))
+
+def fleet_tasks(count, seed=0, preferred_dates=(None,)):
+    rng = random.Random(seed)
+    tasks = []
+    for v in range(count):
+        city = rng.choice(CITIES)
+        tasks.append(scheduling.SchedulingTask(
+            session_id="test",
+            vin=f"VIN{v:06d}",
+            priority=rng.choice(["LOW", "MEDIUM", "MEDIUM", "HIGH", "CRITICAL"]),
+            service_type=rng.choice(list(scheduling.SERVICE_REQUIREMENTS)),
+            latitude=city[2] + rng.uniform(-0.3, 0.3),
+            longitude=city[3] + rng.uniform(-0.3, 0.3),
+            preferred_date=rng.choice(preferred_dates)
+        ))
+    return tasks
+
+def check_assignment(index, tasks, results):
+    assigned = [r for r in results if "error" not in r]
+    booked = Counter((r["center_id"], r["recommended_date"]) for r in assigned)
+    assert all(n == 1 for n in booked.values()), "a slot was assigned twice"
+    per_day = Counter((r["center_id"], r["recommended_date"][:10]) for r in assigned)
+    for (center_id, _), n in per_day.items():
+        assert n <= index.centers[index.by_id[center_id]]["capacity"]
+    return assigned
+
+def test_unparseable_preferred_dates_do_not_fail_the_batch():
+    index = scheduling.ServiceCenterIndex(SyntheticFleet(10, center_count=20, seed=3).centers())
+    tasks = fleet_tasks(50, preferred_dates=(None, "next week", "2026-01-01T09:00:00Z", "bogus"))
+    results = scheduling.optimize_fleet_assignment(index, tasks)
+    assert len(results) == len(tasks)
+    check_assignment(index, tasks, results)
+
+@pytest.mark.parametrize("vehicles,centers", [(2000, 100), (10000, 500)])
+def test_every_vehicle_is_assigned_while_units_remain(vehicles, centers):
+    index = scheduling.ServiceCenterIndex(SyntheticFleet(10, center_count=centers, seed=3).centers())
+    tasks = fleet_tasks(vehicles)
+
+    started = time.perf_counter()
+    results = scheduling.optimize_fleet_assignment(index, tasks)
+    elapsed = time.perf_counter() - started
+
+    assigned = check_assignment(index, tasks, results)
+    units = sum(len(slots) for slots in index.slots)
+    assert units > vehicles
+    assert len(assigned) == vehicles
+    assert elapsed < BENCHMARK_SECONDS, f"{vehicles} vehicles took {elapsed:.1f}s"
@@ -0,0 +1,176 @@
+"""Master agent orchestration: UEBA accounting, deadlines and batch jobs"""
+
+import asyncio
+import importlib.util
+import os
+
+import pytest
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+spec = importlib.util.spec_from_file_location("master_agent", os.path.join(BACKEND, "master-agent", "app.py"))
+master_agent = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(master_agent)
+
+@pytest.fixture
+def sessions(monkeypatch):
+    manager = master_agent.SessionManager(master_agent.InMemorySessionStore())
+    monkeypatch.setattr(master_agent, "session_manager", manager)
+    return manager
+
+def test_blocked_actions_count_as_high_risk(sessions, monkeypatch):
+    async def monitor_action(agent_id, action, context):
+        return {"risk_score": 0.95, "risk_level": "HIGH", "anomaly_detected": True}
+
+    monkeypatch.setattr(master_agent.ueba, "monitor_action", monitor_action)
+
+    async def scenario():
+        session_id = await sessions.create_session("VIN1")
+        result = await master_agent.WorkerOrchestrator().call_worker("diagnosis", "/task", {}, session_id)
+        return result, await sessions.get_ueba_summary(session_id), await sessions.get_ueba_totals()
+
+    result, summary, totals = asyncio.run(scenario())
+    assert result.error.startswith("Action blocked by UEBA")
+    assert summary["total_events"] == 1
+    assert summary["high_risk_events"] == 1
+    assert totals["high_risk_events"] == 1
+
+def test_batched_chunks_share_the_global_concurrency_bound(sessions, monkeypatch):
+    in_flight = {"now": 0, "peak": 0}
+
+    async def fetch_telematics_bulk(vins):
+        return {vin: {"current_status": {"speed": 10}, "dtc_codes": []} for vin in vins}
+
+    async def execute_workflow_steps(steps, session_id, deadline=None):
+        in_flight["now"] += 1
+        in_flight["peak"] = max(in_flight["peak"], in_flight["now"])
+        await asyncio.sleep(0.01)
+        in_flight["now"] -= 1
+        vins = steps[0][2]["vins"]
+        return {
+            "data_analysis": master_agent.WorkerResponse(
+                worker="data_analysis", confidence=0.8,
+                data={"vehicles": [{"vin": vin, "anomaly_count": 0} for vin in vins]}),
+            "diagnosis": master_agent.WorkerResponse(
+                worker="diagnosis", confidence=0.8,
+                data={"vehicles": [{"vin": vin, "overall_risk_score": 0.1} for vin in vins]})
+        }, []
+
+    monkeypatch.setattr(master_agent.orchestrator, "fetch_telematics_bulk", fetch_telematics_bulk)
+    monkeypatch.setattr(master_agent.orchestrator, "execute_workflow_steps", execute_workflow_steps)
+    manager = master_agent.BatchJobManager(chunk_size=2, chunk_parallelism=4, max_concurrency=3)
+
+    async def scenario():
+        jobs = [await manager.submit(master_agent.BatchMaintenanceRequest(vins=[f"J{j}V{v}" for v in range(16)]))
+                for j in range(3)]
+        await asyncio.gather(*(job.task for job in jobs))
+        return jobs
+
+    jobs = asyncio.run(scenario())
+    assert all(job.status == "completed" and job.completed == 16 for job in jobs)
+    assert in_flight["peak"] == 3
+
+def test_batched_and_per_vin_results_get_the_same_recommendations():
+    response = master_agent.WorkerResponse
+    per_vin = master_agent.maintenance_recommendations(
+        response(worker="data_analysis", confidence=0.8, data={"anomaly_detection": {"anomaly_count": 2}}),
+        response(worker="diagnosis", confidence=0.9, data={"failure_predictions": {"overall_risk_score": 0.85}})
+    )
+    batched = master_agent.maintenance_recommendations(
+        response(worker="data_analysis", confidence=0.8, data={"vin": "V1", "anomaly_count": 2}),
+        response(worker="diagnosis", confidence=0.9, data={"vin": "V1", "overall_risk_score": 0.85})
+    )
+    assert per_vin == batched
+    assert len(per_vin) == 4
+
+def test_a_failed_chunk_fails_only_its_own_vins(sessions, monkeypatch):
+    async def fetch_telematics_bulk(vins):
+        if "BAD" in vins:
+            raise RuntimeError("boom")
+        return {vin: {"current_status": {"speed": 10}} for vin in vins}
+
+    async def execute_workflow_steps(steps, session_id, deadline=None):
+        vins = steps[0][2]["vins"]
+        return {
+            "data_analysis": master_agent.WorkerResponse(
+                worker="data_analysis", confidence=0.8, data={"vehicles": [{"vin": vin} for vin in vins]}),
+            "diagnosis": master_agent.WorkerResponse(
+                worker="diagnosis", confidence=0.8, data={"vehicles": [{"vin": vin} for vin in vins]})
+        }, []
+
+    monkeypatch.setattr(master_agent.orchestrator, "fetch_telematics_bulk", fetch_telematics_bulk)
+    monkeypatch.setattr(master_agent.orchestrator, "execute_workflow_steps", execute_workflow_steps)
+    manager = master_agent.BatchJobManager(chunk_size=2, chunk_parallelism=2)
+
+    async def scenario():
+        job = await manager.submit(master_agent.BatchMaintenanceRequest(vins=["V1", "V2", "BAD", "V3", "V4", "V5"]))
+        await job.task
+        return job
+
+    job = asyncio.run(scenario())
+    assert job.status == "completed"
+    assert (job.completed, job.failed) == (4, 2)
+    assert {r["vin"] for r in job.results if r["status"] == "failed"} == {"BAD", "V3"}
+
+def sleeping_worker(delays):
+    """call_worker stand-in that answers after a per-worker delay"""
+    async def call_worker(worker_name, endpoint, payload, session_id):
+        await asyncio.sleep(delays[worker_name])
+        return master_agent.WorkerResponse(worker=worker_name, confidence=0.8, data={})
+    return call_worker
+
+def test_a_slow_step_times_out_on_its_own_deadline(monkeypatch):
+    orchestrator = master_agent.WorkerOrchestrator()
+    monkeypatch.setattr(orchestrator, "call_worker", sleeping_worker({"data_analysis": 0.01, "diagnosis": 5}))
+
+    results, incomplete = asyncio.run(orchestrator.execute_workflow_steps([
+        ("data_analysis", "/task", {}),
+        ("diagnosis", "/task", {}, 0.05)
+    ], "session", deadline=5))
+
+    assert incomplete == ["diagnosis"]
+    assert results["diagnosis"].timed_out and results["diagnosis"].error.startswith("Step deadline exceeded")
+    assert not results["data_analysis"].timed_out and results["data_analysis"].error is None
+
+def test_the_overall_deadline_cancels_unfinished_steps(monkeypatch):
+    orchestrator = master_agent.WorkerOrchestrator()
+    monkeypatch.setattr(orchestrator, "call_worker", sleeping_worker({"data_analysis": 0.01, "diagnosis": 5}))
+
+    async def scenario():
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        outcome = await orchestrator.execute_workflow_steps([
+            ("data_analysis", "/task", {}, 10),
+            ("diagnosis", "/task", {}, 10)
+        ], "session", deadline=0.1)
+        return outcome, loop.time() - started
+
+    (results, incomplete), elapsed = asyncio.run(scenario())
+    assert incomplete == ["diagnosis"]
+    assert results["diagnosis"].timed_out
+    assert elapsed < 1
+
+def test_the_telematics_prefetch_counts_against_the_deadline(sessions, monkeypatch):
+    orchestrator = master_agent.WorkerOrchestrator()
+    orchestrator.workflow_deadline = 0.5
+
+    async def fetch_telematics(vin, timeout=10):
+        await asyncio.sleep(0.3)
+        return {"vin": vin}
+
+    # Each step alone fits the deadline, but not after the prefetch
+    monkeypatch.setattr(orchestrator, "fetch_telematics", fetch_telematics)
+    monkeypatch.setattr(orchestrator, "call_worker", sleeping_worker({"data_analysis": 0.3, "diagnosis": 0.3}))
+
+    async def scenario():
+        session_id = await sessions.create_session("VIN1")
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        result = await orchestrator.orchestrate_maintenance_workflow(
+            master_agent.MaintenanceRequest(vin="VIN1", analysis_type="emergency"), session_id)
+        return result, loop.time() - started
+
+    result, elapsed = asyncio.run(scenario())
+    assert result.status == "partial"
+    assert all(response.timed_out for response in result.results.values())
+    assert elapsed < 0.5 + 0.2
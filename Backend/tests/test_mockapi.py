@@ -0,0 +1,57 @@
+"""Mock API bookings"""
+
+import importlib.util
+import os
+import sys
+
+import pytest
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(BACKEND, "infra", "mockapi"))
+
+spec = importlib.util.spec_from_file_location("mockapi", os.path.join(BACKEND, "infra", "mockapi", "app.py"))
+mockapi = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(mockapi)
+
+@pytest.fixture
+def client():
+    return mockapi.app.test_client()
+
+@pytest.fixture
+def center():
+    """A center whose first slot is free, with the slot; bookings are cancelled afterwards"""
+    before = set(mockapi.slot_inventory.bookings)
+    center_id = next(c for c, inventory in mockapi.slot_inventory.centers.items() if inventory.free)
+    yield center_id, mockapi.slot_inventory.centers[center_id].free[0]
+    for booking_id in set(mockapi.slot_inventory.bookings) - before:
+        mockapi.slot_inventory.release(booking_id)
+
+def test_utc_preferred_date_books_the_matching_slot(client, center):
+    center_id, slot = center
+    response = client.post(f"/service-centers/{center_id}/book", json={"vin": "V1", "preferred_date": slot + "Z"})
+    assert response.status_code == 200
+    assert response.get_json()["appointment_date"] == slot
+
+@pytest.mark.parametrize("preferred_date", ["next week", 20240310, ["2024-03-10"]])
+def test_invalid_preferred_date_is_rejected_on_both_paths(client, center, preferred_date):
+    center_id, _ = center
+    single = client.post(f"/service-centers/{center_id}/book", json={"vin": "V1", "preferred_date": preferred_date})
+    assert single.status_code == 400
+    assert single.get_json()["status"] == "invalid"
+
+    bulk = client.post("/service-centers/bookings/bulk", json={
+        "bookings": [{"center_id": center_id, "vin": "V1", "preferred_date": preferred_date}]
+    })
+    assert bulk.status_code == 200
+    assert bulk.get_json()["results"][0]["status"] == "invalid"
+    assert bulk.get_json()["confirmed"] == 0
+
+def test_repeated_batch_id_replays_the_first_outcome(client, center):
+    center_id, slot = center
+    payload = {"batch_id": "BATCH_REPLAY", "bookings": [{"center_id": center_id, "vin": "V1", "preferred_date": slot}]}
+    first = client.post("/service-centers/bookings/bulk", json=payload).get_json()
+    second = client.post("/service-centers/bookings/bulk", json=payload).get_json()
+    assert first == second
+    assert first["confirmed"] == 1
+    booked = [booking for booking in mockapi.slot_inventory.bookings.values() if booking == (center_id, slot)]
+    assert len(booked) == 1
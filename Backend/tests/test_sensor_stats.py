@@ -0,0 +1,50 @@
+"""Online sensor statistics of the data analysis worker"""
+
+import asyncio
+import importlib.util
+import os
+import sys
+from datetime import datetime, timedelta
+
+import numpy as np
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(BACKEND, "workers", "common"))
+
+spec = importlib.util.spec_from_file_location("data_analysis", os.path.join(BACKEND, "workers", "data_analysis", "app.py"))
+data_analysis = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(data_analysis)
+
+def test_missing_readings_leave_ewm_std_unchanged():
+    stats = data_analysis.OnlineSensorStats(["temperature", "pressure"], max_keys=4, alpha=0.2)
+    slots = stats.slots_for(["VIN1"])
+    for reading in ([80.0, 30.0], [90.0, 32.0], [70.0, 31.0]):
+        stats.update(slots, np.array([reading]))
+    before = stats.summary("VIN1")
+
+    for _ in range(5):
+        stats.update(slots, np.array([[np.nan, 33.0]]))
+    after = stats.summary("VIN1")
+
+    assert after["temperature"] == before["temperature"]
+    assert after["pressure"]["ewm_std"] != before["pressure"]["ewm_std"]
+
+def test_first_reading_starts_ewm_variance_at_zero():
+    stats = data_analysis.OnlineSensorStats(["temperature"], max_keys=4)
+    slots = stats.slots_for(["VIN1"])
+    stats.update(slots, np.array([[np.nan]]))
+    stats.update(slots, np.array([[85.0]]))
+    summary = stats.summary("VIN1")["temperature"]
+    assert summary["ewma"] == 85.0
+    assert summary["ewm_std"] == 0.0
+
+def test_batch_discounts_vehicles_serviced_recently():
+    names = ["transmission_fluid_level"]
+    row = [0.1]
+    recent = (datetime.now() - timedelta(days=10)).isoformat()
+    task = data_analysis.BatchAnalysisTask(
+        session_id="test", vins=["V1", "V2"], sensor_names=names, values=[row, row],
+        maintenance_history=[[{"date": recent}], [{"date": "2000-01-01"}, {"date": None}]]
+    )
+    vehicles = asyncio.run(data_analysis.analyze_telematics_batch(task))["data"]["vehicles"]
+    assert 0 < vehicles[0]["overall_failure_risk"] < vehicles[1]["overall_failure_risk"]
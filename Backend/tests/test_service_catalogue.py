@@ -0,0 +1,101 @@
+"""Scheduling worker's catalogue cache revalidating against the mock API"""
+
+import asyncio
+import importlib.util
+import os
+import sys
+
+import pytest
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(BACKEND, "infra", "mockapi"))
+sys.path.insert(0, os.path.join(BACKEND, "workers", "common"))
+
+def load(name, *path):
+    spec = importlib.util.spec_from_file_location(name, os.path.join(BACKEND, *path))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+mockapi = load("mockapi", "infra", "mockapi", "app.py")
+scheduling = load("scheduling_worker", "scheduling-worker.py")
+
+@pytest.fixture
+def server(monkeypatch):
+    """Serve the catalogue's conditional GETs from the mock API app; records request headers"""
+    client = mockapi.app.test_client()
+    before = set(mockapi.slot_inventory.bookings)
+    requests = []
+
+    async def get_conditional(path, timeout, validators):
+        headers = {}
+        if validators.get("ETag"):
+            headers["If-None-Match"] = validators["ETag"]
+        if validators.get("Last-Modified"):
+            headers["If-Modified-Since"] = validators["Last-Modified"]
+        requests.append(headers)
+        response = client.get(path, headers=headers)
+        returned = {name: response.headers[name] for name in ("ETag", "Last-Modified") if name in response.headers}
+        return response.status_code, returned, response.data if response.status_code == 200 else b""
+
+    monkeypatch.setattr(scheduling.mock_api, "get_conditional", get_conditional)
+    yield client, requests
+    for booking_id in set(mockapi.slot_inventory.bookings) - before:
+        mockapi.slot_inventory.release(booking_id)
+
+def revalidate(catalogue, max_age=0):
+    return asyncio.run(catalogue.get(max_age))
+
+def test_not_modified_keeps_the_index(server):
+    _, requests = server
+    catalogue = scheduling.ServiceCenterCatalogue(ttl=60)
+    index = revalidate(catalogue)
+
+    assert revalidate(catalogue) is index
+    assert requests[0] == {}
+    assert "If-None-Match" in requests[1]
+    assert catalogue.stats["rebuilds"] == 1 and catalogue.stats["not_modified"] == 1
+
+def test_fresh_index_is_served_without_a_request(server):
+    _, requests = server
+    catalogue = scheduling.ServiceCenterCatalogue(ttl=60)
+    index = revalidate(catalogue)
+
+    assert revalidate(catalogue, max_age=None) is index
+    assert len(requests) == 1
+    assert catalogue.stats["hits"] == 1
+
+def test_changed_availability_rebuilds_the_index(server):
+    client, _ = server
+    catalogue = scheduling.ServiceCenterCatalogue(ttl=60)
+    index = revalidate(catalogue)
+    center_id = next(c for c, inventory in mockapi.slot_inventory.centers.items() if inventory.free)
+    slot = mockapi.slot_inventory.centers[center_id].free[0]
+
+    booked = client.post(f"/service-centers/{center_id}/book", json={"vin": "V1", "preferred_date": slot})
+    assert booked.status_code == 200
+    rebuilt = revalidate(catalogue)
+
+    assert rebuilt is not index
+    assert slot in index.slots[index.by_id[center_id]]
+    assert slot not in rebuilt.slots[rebuilt.by_id[center_id]]
+    assert catalogue.stats["rebuilds"] == 2
+
+def test_identical_body_renews_without_rebuilding(server):
+    catalogue = scheduling.ServiceCenterCatalogue(ttl=60)
+    index = revalidate(catalogue)
+    catalogue.validators = {}  # forces a full 200 response for the same content
+
+    assert revalidate(catalogue) is index
+    assert catalogue.stats["unchanged"] == 1 and catalogue.stats["rebuilds"] == 1
+
+def test_unreachable_api_keeps_the_last_index(server, monkeypatch):
+    catalogue = scheduling.ServiceCenterCatalogue(ttl=60)
+    index = revalidate(catalogue)
+
+    async def get_conditional(path, timeout, validators):
+        raise asyncio.TimeoutError()
+
+    monkeypatch.setattr(scheduling.mock_api, "get_conditional", get_conditional)
+    assert revalidate(catalogue) is index
+    assert catalogue.stats["errors"] == 1
@@ -0,0 +1,78 @@
+"""Redis session store against an in-process fake server"""
+
+import asyncio
+import importlib.util
+import os
+from datetime import datetime
+
+import pytest
+
+fakeredis = pytest.importorskip("fakeredis")
+pytest.importorskip("lupa")  # fakeredis needs it to run the Lua update script
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+spec = importlib.util.spec_from_file_location("master_agent", os.path.join(BACKEND, "master-agent", "app.py"))
+master_agent = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(master_agent)
+
+TTL = 600
+
+@pytest.fixture
+def store(monkeypatch):
+    monkeypatch.setattr(master_agent.aioredis, "from_url",
+                        lambda url, **kwargs: fakeredis.aioredis.FakeRedis(**kwargs))
+    return master_agent.RedisSessionStore("redis://fake")
+
+def test_create_sets_ttl_and_index(store):
+    async def scenario():
+        before = datetime.now().timestamp()
+        await store.create("S1", {"vin": "VIN1", "context": {}}, TTL)
+        return (before, await store.get("S1"), await store.client.ttl(store._key("S1")),
+                await store.client.zscore(store.index_key, "S1"), await store.count(), await store.list_ids())
+
+    before, session, ttl, expires_at, count, ids = asyncio.run(scenario())
+    assert session == {"vin": "VIN1", "context": {}}
+    assert TTL - 5 <= ttl <= TTL
+    assert before + TTL <= expires_at <= before + TTL + 5
+    assert (count, ids) == (1, ["S1"])
+
+def test_update_writes_fields_and_pins_expiry_to_the_index(store):
+    async def scenario():
+        await store.create("S1", {"vin": "VIN1", "status": "active"}, TTL)
+        # Drift the key's TTL away from the indexed expiry time
+        await store.client.expire(store._key("S1"), 5)
+        updated = await store.update("S1", {"status": "done", "context": {"step": 2}})
+        expires_at = await store.client.zscore(store.index_key, "S1")
+        return updated, await store.get("S1"), await store.client.pexpiretime(store._key("S1")), expires_at
+
+    updated, session, pexpiretime, expires_at = asyncio.run(scenario())
+    assert updated
+    assert session == {"vin": "VIN1", "status": "done", "context": {"step": 2}}
+    assert pexpiretime == int(expires_at * 1000)
+
+def test_update_does_not_recreate_missing_or_expired_sessions(store):
+    async def scenario():
+        unknown = await store.update("MISSING", {"status": "done"})
+        await store.create("S1", {"vin": "VIN1"}, TTL)
+        await store.client.delete(store._key("S1"))  # expired key, index entry not yet purged
+        expired = await store.update("S1", {"status": "done"})
+        return (unknown, expired, await store.client.exists(store._key("MISSING"), store._key("S1")),
+                await store.update("S1", {}))
+
+    unknown, expired, exists, empty_update = asyncio.run(scenario())
+    assert not unknown and not expired and not empty_update
+    assert exists == 0
+
+def test_expired_index_entries_are_purged(store):
+    async def scenario():
+        await store.create("LIVE", {"vin": "VIN1"}, TTL)
+        await store.client.zadd(store.index_key, {"STALE": datetime.now().timestamp() - 1})
+        listed = await store.list_ids()
+        count = await store.count()
+        return listed, count, await store.client.zrange(store.index_key, 0, -1)
+
+    listed, count, index = asyncio.run(scenario())
+    assert listed == ["LIVE"]
+    assert count == 1
+    assert index == ["LIVE"]
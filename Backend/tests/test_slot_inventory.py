@@ -0,0 +1,113 @@
+"""Slot reservation under concurrent bookings and cancellations"""
+
+import os
+import sys
+import threading
+from collections import Counter
+
+import pytest
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(BACKEND, "infra", "mockapi"))
+
+from slot_inventory import SlotConflict, SlotInventory  # noqa: E402
+
+DAYS = ["2024-03-10", "2024-03-11", "2024-03-12"]
+SLOTS = [f"{day}T{hour:02d}:00:00" for day in DAYS for hour in range(9, 17)]
+
+@pytest.fixture(autouse=True)
+def frequent_thread_switches():
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    yield
+    sys.setswitchinterval(interval)
+
+def inventory(capacity=100, bookings_per_slot=1):
+    return SlotInventory([{"id": "SC1", "availability": SLOTS, "capacity": capacity}], bookings_per_slot)
+
+def race(threads, work):
+    """Run ``work(i)`` on ``threads`` threads released together; returns their outcomes"""
+    barrier = threading.Barrier(threads)
+    outcomes = [None] * threads
+
+    def run(i):
+        barrier.wait()
+        try:
+            outcomes[i] = work(i)
+        except SlotConflict as conflict:
+            outcomes[i] = conflict
+
+    workers = [threading.Thread(target=run, args=(i,)) for i in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return outcomes
+
+def assert_consistent(slots):
+    """Counters, free list and ledger agree, and no slot or day is over-booked"""
+    center = slots.centers["SC1"]
+    ledger = Counter(slot for _, slot in slots.bookings.values())
+    assert dict(center.booked) == {slot: ledger[slot] for slot in SLOTS}
+    assert all(count <= center.bookings_per_slot for count in center.booked.values())
+    by_day = Counter(slot[:10] for slot in ledger.elements())
+    assert all(center.day_booked.get(day, 0) == by_day[day] <= center.capacity for day in DAYS)
+    assert center.free == [slot for slot in SLOTS if center._bookable(slot)]
+
+def test_one_slot_is_booked_once():
+    slots = inventory()
+    outcomes = race(32, lambda i: slots.reserve("SC1", SLOTS[0]))
+
+    assert sum(not isinstance(outcome, SlotConflict) for outcome in outcomes) == 1
+    assert all(outcome.next_available == SLOTS[1] for outcome in outcomes if isinstance(outcome, SlotConflict))
+    assert_consistent(slots)
+
+def test_next_free_bookings_never_double_book():
+    slots = inventory(capacity=5, bookings_per_slot=2)
+    outcomes = race(64, lambda i: slots.reserve("SC1", not_before=SLOTS[0]))
+
+    confirmed = [outcome for outcome in outcomes if not isinstance(outcome, SlotConflict)]
+    assert len(confirmed) == len(DAYS) * 5
+    assert len({booking_id for booking_id, _ in confirmed}) == len(confirmed)
+    assert_consistent(slots)
+
+def test_grouped_and_single_bookings_share_the_capacity():
+    slots = inventory(capacity=100, bookings_per_slot=1)
+
+    def work(i):
+        if i % 2:
+            return slots.reserve_many("SC1", [(SLOTS[i % 4], None), (SLOTS[4 + i % 4], None)], all_or_nothing=True)
+        return slots.reserve("SC1", SLOTS[i % 8])
+
+    race(40, work)
+    assert_consistent(slots)
+    assert all(count == 1 for count in slots.centers["SC1"].booked.values() if count)
+
+def test_reserve_and_release_churn_leaves_the_inventory_empty():
+    slots = inventory(capacity=3, bookings_per_slot=1)
+
+    def work(i):
+        for _ in range(50):
+            try:
+                booking_id, _ = slots.reserve("SC1", not_before=SLOTS[0])
+            except SlotConflict:
+                continue
+            assert slots.release(booking_id) is not None
+            assert slots.release(booking_id) is None  # a repeated cancel is a no-op
+
+    race(16, work)
+    assert slots.bookings == {}
+    assert_consistent(slots)
+    assert slots.free_slots("SC1") == SLOTS
+
+def test_released_slots_become_bookable_again():
+    slots = inventory(capacity=1)
+    booking_id, slot = slots.reserve("SC1", SLOTS[0])
+    with pytest.raises(SlotConflict):
+        slots.reserve("SC1", SLOTS[1])  # the day is at capacity
+
+    slots.release(booking_id)
+    outcomes = race(8, lambda i: slots.reserve("SC1", SLOTS[1]))
+    assert sum(not isinstance(outcome, SlotConflict) for outcome in outcomes) == 1
+    assert slots.utilization("SC1")["bookings_by_day"][DAYS[0]] == 1
+    assert_consistent(slots)
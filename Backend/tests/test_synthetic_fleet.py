@@ -0,0 +1,31 @@
+"""Synthetic fleet id parsing"""
+
+import os
+import sys
+
+import pytest
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(BACKEND, "infra", "mockapi"))
+
+from synthetic_fleet import SyntheticFleet  # noqa: E402
+
+@pytest.fixture
+def fleet():
+    return SyntheticFleet(100, customer_count=10, center_count=5)
+
+def test_canonical_ids_round_trip(fleet):
+    assert fleet.vehicle_index(fleet.vin(42)) == 42
+    assert fleet.customer_index(fleet.customer_id(7)) == 7
+    assert fleet.vin(42) in fleet.vehicles()
+
+@pytest.mark.parametrize("vin", ["SYN42", "SYN000000000000042", "SYN0000000000004²", "SYN00000000000100", "SYN-0000000000042"])
+def test_non_canonical_vins_are_rejected(fleet, vin):
+    assert fleet.vehicle_index(vin) is None
+    assert vin not in fleet.vehicles()
+    with pytest.raises(KeyError):
+        fleet.vehicles()[vin]
+
+@pytest.mark.parametrize("customer_id", ["SCUST7", "SCUST000000007", "SCUST0000000٧"])
+def test_non_canonical_customer_ids_are_rejected(fleet, customer_id):
+    assert fleet.customer_index(customer_id) is None
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Mock API Client shared by the worker agents
+Pooled async HTTP client; each worker image copies this module next to its app
+"""
+
+import json
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional, Tuple
+
+import aiohttp
+
+class MockAPIClient:
+    """Pooled async HTTP client for the mock API, shared for the worker's lifetime
+
+    Pass ``lifespan`` to the worker's FastAPI app to open the pool on startup
+    and close it on shutdown.
+    """
+
+    def __init__(self, base_url: str, pool_limit: int):
+        self.base_url = base_url
+        self.pool_limit = pool_limit
+        self.session: Optional[aiohttp.ClientSession] = None
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self.session is None or self.session.closed:
+            connector = aiohttp.TCPConnector(limit=self.pool_limit, keepalive_timeout=30)
+            self.session = aiohttp.ClientSession(connector=connector)
+        return self.session
+
+    @asynccontextmanager
+    async def lifespan(self, app):
+        """Open the mock API connection pool on startup and close it on shutdown"""
+        self._get_session()
+        yield
+        await self.close()
+
+    async def request(self, method: str, path: str, timeout: float, payload: Optional[Dict] = None) -> Tuple[int, Any]:
+        """Send a request and return the status code with the decoded JSON body on success"""
+        async with self._get_session().request(
+            method,
+            f"{self.base_url}{path}",
+            json=payload,
+            timeout=aiohttp.ClientTimeout(total=timeout)
+        ) as response:
+            body = await response.json(content_type=None) if response.status == 200 else None
+            return response.status, body
+
+    async def get(self, path: str, timeout: float) -> Tuple[int, Any]:
+        return await self.request("GET", path, timeout)
+
+    async def get_conditional(self, path: str, timeout: float,
+                              validators: Dict[str, str]) -> Tuple[int, Dict[str, str], bytes]:
+        """GET with If-None-Match / If-Modified-Since built from a previous response's
+        ETag / Last-Modified; returns the status, those validators and the raw body"""
+        headers = {}
+        if validators.get("ETag"):
+            headers["If-None-Match"] = validators["ETag"]
+        if validators.get("Last-Modified"):
+            headers["If-Modified-Since"] = validators["Last-Modified"]
+        async with self._get_session().get(
+            f"{self.base_url}{path}",
+            headers=headers,
+            timeout=aiohttp.ClientTimeout(total=timeout)
+        ) as response:
+            body = await response.read() if response.status == 200 else b""
+            returned = {name: response.headers[name] for name in ("ETag", "Last-Modified") if name in response.headers}
+            return response.status, returned, body
+
+    async def post(self, path: str, payload: Dict, timeout: float) -> Tuple[int, Any]:
+        return await self.request("POST", path, timeout, payload)
+
+    async def post_ndjson(self, path: str, payload: Dict, timeout: float) -> AsyncIterator[Dict]:
+        """POST a request and yield each object of the streamed NDJSON response"""
+        async with self._get_session().post(
+            f"{self.base_url}{path}",
+            json=payload,
+            headers={"Accept": "application/x-ndjson"},
+            timeout=aiohttp.ClientTimeout(total=timeout)
+        ) as response:
+            response.raise_for_status()
+            async for line in response.content:
+                if line.strip():
+                    yield json.loads(line)
+
+    async def close(self):
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
@@ -0,0 +1,25 @@
+#!/usr/bin/env python3
+"""
+Maintenance history helpers shared by the worker agents
+"""
+
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+def recently_serviced(maintenance_history: List[Dict], days: int = 90) -> bool:
+    """Whether any maintenance record falls within the last ``days`` days
+    
+    Each record's date is parsed once; timezone-aware dates are converted to
+    local time and records with missing or malformed dates are ignored.
+    """
+    cutoff = datetime.now() - timedelta(days=days)
+    for record in maintenance_history:
+        try:
+            service_date = datetime.fromisoformat(record["date"].replace("Z", "+00:00"))
+        except (KeyError, AttributeError, TypeError, ValueError):
+            continue
+        if service_date.tzinfo is not None:
+            service_date = service_date.astimezone().replace(tzinfo=None)
+        if service_date > cutoff:
+            return True
+    return False
@@ -6,21 +6,29 @@ Generates voice scripts, notifications, and multi-channel engagement strategies
 
 from fastapi import FastAPI
 from pydantic import BaseModel, Field
-import requests
+import aiohttp
+import asyncio
+import os
 import random
 from typing import Dict, List, Optional, Any
 from datetime import datetime, timedelta
 import logging
 import json
 
+from mock_api_client import MockAPIClient
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="Customer Engagement Worker", version="1.0")
-
 MOCK_API_BASE = "http://mockapi:8000"
 
+MOCK_API_POOL_LIMIT = int(os.getenv("MOCK_API_POOL_LIMIT", "200"))
+
+mock_api = MockAPIClient(MOCK_API_BASE, MOCK_API_POOL_LIMIT)
+
+app = FastAPI(title="Customer Engagement Worker", version="1.0", lifespan=mock_api.lifespan)
+
 class CustomerEngagementTask(BaseModel):
     session_id: str
     vin: str
@@ -266,17 +274,17 @@ notification_generator = NotificationGenerator()
 engagement_strategy = EngagementStrategy()
 
 @app.post("/task")
-def engage_customer(task: CustomerEngagementTask):
+async def engage_customer(task: CustomerEngagementTask):
     """Generate customer engagement strategy and content"""
     try:
         # Fetch customer data from mock API
         customer_data = {"name": "Valued Customer", "preferences": {"communication_method": "app", "language": "English"}}
         if task.customer_id:
             try:
-                response = requests.get(f"{MOCK_API_BASE}/customers/{task.customer_id}", timeout=5)
-                if response.status_code == 200:
-                    customer_data = response.json()
-            except:
+                status, body = await mock_api.get(f"/customers/{task.customer_id}", timeout=5)
+                if status == 200:
+                    customer_data = body
+            except (aiohttp.ClientError, asyncio.TimeoutError):
                 pass  # Continue with default data
         
         # Prepare engagement context
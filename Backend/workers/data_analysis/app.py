@@ -4,30 +4,57 @@ Data Analysis Worker - Telematics Analysis and Anomaly Detection
 Analyzes vehicle sensor data and identifies potential issues
 """
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
+from collections import OrderedDict
 from pydantic import BaseModel, Field
-import requests
+import os
 import numpy as np
 import pandas as pd
-from typing import Dict, List, Optional, Any
-from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Any, Tuple
+from datetime import datetime
 import logging
 import json
+import asyncio
+
+from mock_api_client import MockAPIClient
+from service_history import recently_serviced
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="Data Analysis Worker", version="1.0")
-
 MOCK_API_BASE = "http://mockapi:8000"
 
+MOCK_API_POOL_LIMIT = int(os.getenv("MOCK_API_POOL_LIMIT", "200"))
+BATCH_FETCH_CONCURRENCY = int(os.getenv("BATCH_FETCH_CONCURRENCY", "20"))
+BULK_FETCH_CHUNK = int(os.getenv("BULK_FETCH_CHUNK", "1000"))
+STREAM_BATCH_SIZE = int(os.getenv("STREAM_BATCH_SIZE", "500"))
+STREAM_STATE_MAX_VINS = int(os.getenv("STREAM_STATE_MAX_VINS", "100000"))
+STATS_MAX_VINS = int(os.getenv("STATS_MAX_VINS", "1000000"))
+STATS_MAX_MODELS = int(os.getenv("STATS_MAX_MODELS", "1024"))
+STATS_MIN_SAMPLES = int(os.getenv("STATS_MIN_SAMPLES", "30"))
+STATS_EWMA_ALPHA = float(os.getenv("STATS_EWMA_ALPHA", "0.05"))
+STATS_Z_THRESHOLD = float(os.getenv("STATS_Z_THRESHOLD", "3.0"))
+
+mock_api = MockAPIClient(MOCK_API_BASE, MOCK_API_POOL_LIMIT)
+
+app = FastAPI(title="Data Analysis Worker", version="1.0", lifespan=mock_api.lifespan)
+
 class DataAnalysisTask(BaseModel):
     session_id: str
     vin: str
     customer_id: Optional[str] = None
     analysis_type: str = "predictive"  # predictive, emergency, routine
     time_window_hours: int = Field(24, ge=1, le=168)  # 1 hour to 1 week
+    telematics: Optional[Dict[str, Any]] = None  # Snapshot forwarded by the master agent
+
+class BatchAnalysisTask(BaseModel):
+    session_id: str
+    vins: List[str]
+    sensor_names: Optional[List[str]] = None
+    values: Optional[List[List[Optional[float]]]] = None  # vehicles x sensors, null for missing readings; fetched when omitted
+    maintenance_history: Optional[List[List[Dict[str, Any]]]] = None  # one record list per VIN, used to discount recently serviced vehicles
 
 class SensorData(BaseModel):
     timestamp: str
@@ -48,6 +75,52 @@ class AnomalyDetection:
             "engine_temp": {"min": 70, "max": 110, "normal_range": (80, 95)},
             "oil_pressure": {"min": 20, "max": 80, "normal_range": (30, 60)}
         }
+        self._compile_thresholds()
+    
+    def _compile_thresholds(self):
+        """Precompute threshold columns for the vectorized batch path"""
+        self.threshold_sensors = list(self.baseline_thresholds.keys())
+        thresholds = [self.baseline_thresholds[sensor] for sensor in self.threshold_sensors]
+        self.threshold_min = np.array([t["min"] for t in thresholds], dtype=np.float64)
+        self.threshold_max = np.array([t["max"] for t in thresholds], dtype=np.float64)
+        self.normal_low = np.array([t["normal_range"][0] for t in thresholds], dtype=np.float64)
+        self.normal_high = np.array([t["normal_range"][1] for t in thresholds], dtype=np.float64)
+    
+    def detect_anomalies_batch(self, sensor_matrix: np.ndarray, sensor_names: List[str]) -> Dict:
+        """Detect anomalies for many vehicles at once
+        
+        ``sensor_matrix`` is a vehicles x sensors float array with NaN for missing
+        readings. Applies the same rules as ``detect_anomalies`` as array operations
+        and returns per-vehicle arrays plus per-sensor CRITICAL/WARNING masks.
+        """
+        values = column_block(sensor_matrix, sensor_names, self.threshold_sensors)
+        
+        critical = (values < self.threshold_min) | (values > self.threshold_max)
+        warning = ~critical & ((values < self.normal_low) | (values > self.normal_high))
+        
+        engine_rpm = np.nan_to_num(column_block(sensor_matrix, sensor_names, ["engine_rpm"])[:, 0])
+        speed = np.nan_to_num(column_block(sensor_matrix, sensor_names, ["speed"])[:, 0])
+        battery_voltage = np.nan_to_num(column_block(sensor_matrix, sensor_names, ["battery_voltage"])[:, 0])
+        idling = (engine_rpm > 0) & (speed == 0)
+        low_battery = battery_voltage < 12.0
+        
+        risk_score = (
+            0.8 * critical.sum(axis=1) + 0.4 * warning.sum(axis=1)
+            + 0.3 * idling + 0.5 * low_battery
+        )
+        anomaly_count = critical.sum(axis=1) + warning.sum(axis=1) + idling + low_battery
+        overall_health = np.where(risk_score > 0.8, "CRITICAL", np.where(risk_score > 0.4, "WARNING", "HEALTHY"))
+        
+        return {
+            "sensors": self.threshold_sensors,
+            "critical": critical,
+            "warning": warning,
+            "idling": idling,
+            "low_battery": low_battery,
+            "anomaly_count": anomaly_count,
+            "risk_score": np.minimum(1.0, risk_score),
+            "overall_health": overall_health
+        }
     
     def detect_anomalies(self, sensor_data: Dict) -> Dict:
         """Detect anomalies in sensor data"""
@@ -129,10 +202,65 @@ class PredictiveAnalytics:
                 "threshold": 0.5
             }
         }
+        self._compile_models()
+    
+    def _compile_models(self):
+        """Precompute factor/weight matrices for the vectorized batch path"""
+        self.model_systems = list(self.failure_models.keys())
+        self.model_factors = sorted({f for model in self.failure_models.values() for f in model["factors"]})
+        self.model_weights = np.zeros((len(self.model_factors), len(self.model_systems)))
+        for j, system in enumerate(self.model_systems):
+            model = self.failure_models[system]
+            for factor, weight in zip(model["factors"], model["weights"]):
+                self.model_weights[self.model_factors.index(factor), j] += weight
+        self.model_thresholds = np.array([self.failure_models[s]["threshold"] for s in self.model_systems])
+    
+    def _factor_risk(self, values: np.ndarray) -> np.ndarray:
+        """Per-factor risk contributions, matching ``predict_failures``; 0 where missing"""
+        risk = np.full(values.shape, 0.3)
+        for i, factor in enumerate(self.model_factors):
+            if factor == "ignition_coil_resistance":
+                risk[:, i] = np.maximum(0, (2.5 - values[:, i]) / 2.5)
+            elif factor == "battery_voltage":
+                risk[:, i] = np.maximum(0, (12.0 - values[:, i]) / 2.0)
+            elif factor == "transmission_fluid_level":
+                risk[:, i] = np.maximum(0, 1.0 - values[:, i])
+        return np.where(np.isnan(values), 0.0, risk)
+    
+    def predict_failures_batch(self, sensor_matrix: np.ndarray, sensor_names: List[str],
+                               serviced_recently: Optional[np.ndarray] = None) -> Dict:
+        """Predict failures for many vehicles at once
+        
+        Evaluates every failure model as one matrix product over the factor risk
+        contributions. Returns per-vehicle, per-system probabilities (0 where no
+        failure is predicted), the overall risk score and the highest-risk system.
+        """
+        values = column_block(sensor_matrix, sensor_names, self.model_factors)
+        risk = self._factor_risk(values) @ self.model_weights
+        if serviced_recently is not None:
+            risk = np.where(np.asarray(serviced_recently, dtype=bool)[:, None], risk * 0.8, risk)
+        
+        predicted = risk > self.model_thresholds
+        failure_probability = np.where(predicted, np.minimum(0.95, risk), 0.0)
+        overall_risk_score = failure_probability.max(axis=1) if len(self.model_systems) else np.zeros(len(values))
+        highest = np.array(self.model_systems, dtype=object)[failure_probability.argmax(axis=1)]
+        highest_risk_system = np.where(predicted.any(axis=1), highest, None)
+        
+        return {
+            "systems": self.model_systems,
+            "risk": risk,
+            "predicted": predicted,
+            "failure_probability": failure_probability,
+            "overall_risk_score": overall_risk_score,
+            "highest_risk_system": highest_risk_system
+        }
     
-    def predict_failures(self, sensor_data: Dict, maintenance_history: List[Dict]) -> Dict:
+    def predict_failures(self, sensor_data: Dict, maintenance_history: List[Dict],
+                         serviced_recently: Optional[bool] = None) -> Dict:
         """Predict potential failures based on sensor data and history"""
         predictions = []
+        if serviced_recently is None:
+            serviced_recently = recently_serviced(maintenance_history)
         
         for system, model in self.failure_models.items():
             risk_score = 0.0
@@ -157,11 +285,7 @@ class PredictiveAnalytics:
                         risk_score += weight * 0.3
             
             # Adjust based on maintenance history
-            recent_services = [s for s in maintenance_history 
-                             if datetime.fromisoformat(s["date"].replace("Z", "+00:00")) > 
-                             datetime.now() - timedelta(days=90)]
-            
-            if recent_services:
+            if serviced_recently:
                 risk_score *= 0.8  # Reduce risk if recently serviced
             
             if risk_score > model["threshold"]:
@@ -198,30 +322,342 @@ class PredictiveAnalytics:
         else:
             return f"Monitor {system} closely during next service"
 
+def column_block(sensor_matrix: np.ndarray, sensor_names: List[str], columns: List[str]) -> np.ndarray:
+    """Select named columns from a vehicles x sensors matrix, NaN-filling absent sensors"""
+    index = {name: i for i, name in enumerate(sensor_names)}
+    block = np.full((sensor_matrix.shape[0], len(columns)), np.nan)
+    for j, column in enumerate(columns):
+        if column in index:
+            block[:, j] = sensor_matrix[:, index[column]]
+    return block
+
+def to_sensor_matrix(records: List[Dict], sensor_names: List[str]) -> np.ndarray:
+    """Build a vehicles x sensors float matrix from per-vehicle dicts (NaN for missing/non-numeric)"""
+    matrix = np.full((len(records), len(sensor_names)), np.nan)
+    for i, record in enumerate(records):
+        for j, name in enumerate(sensor_names):
+            value = record.get(name)
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                matrix[i, j] = value
+    return matrix
+
+class OnlineSensorStats:
+    """Online per-key sensor statistics stored in compact slot arrays
+    
+    Each key (a VIN or a vehicle model) owns one row in fixed-width arrays holding
+    Welford count/mean/M2 and an EWMA mean/variance per sensor, optionally with a
+    fixed-range histogram used as a quantile sketch. Updates are O(1) per reading.
+    Storage grows by doubling up to ``max_keys``; beyond that the least recently
+    updated key's row is recycled, so memory stays bounded.
+    """
+    
+    def __init__(self, sensor_names: List[str], max_keys: int, alpha: float = STATS_EWMA_ALPHA,
+                 quantile_ranges: Optional[List[tuple]] = None, quantile_bins: int = 64,
+                 initial_capacity: int = 1024):
+        self.sensor_names = sensor_names
+        self.max_keys = max_keys
+        self.alpha = alpha
+        self.quantile_bins = quantile_bins
+        self.quantile_low = np.array([r[0] for r in quantile_ranges]) if quantile_ranges else None
+        self.quantile_high = np.array([r[1] for r in quantile_ranges]) if quantile_ranges else None
+        self.slots: "OrderedDict[str, int]" = OrderedDict()
+        self.capacity = 0
+        self._grow(min(initial_capacity, max_keys))
+    
+    def _grow(self, capacity: int):
+        sensors = len(self.sensor_names)
+        
+        def resize(array, shape, dtype):
+            grown = np.zeros(shape, dtype=dtype)
+            if array is not None:
+                grown[:len(array)] = array
+            return grown
+        
+        self.count = resize(getattr(self, "count", None), (capacity, sensors), np.uint32)
+        self.mean = resize(getattr(self, "mean", None), (capacity, sensors), np.float64)
+        self.m2 = resize(getattr(self, "m2", None), (capacity, sensors), np.float64)
+        self.ewma = resize(getattr(self, "ewma", None), (capacity, sensors), np.float64)
+        self.ewm_var = resize(getattr(self, "ewm_var", None), (capacity, sensors), np.float64)
+        if self.quantile_low is not None:
+            self.histogram = resize(getattr(self, "histogram", None), (capacity, sensors, self.quantile_bins), np.uint32)
+        self.capacity = capacity
+    
+    def _reset(self, slot: int):
+        for array in (self.count, self.mean, self.m2, self.ewma, self.ewm_var):
+            array[slot] = 0
+        if self.quantile_low is not None:
+            self.histogram[slot] = 0
+    
+    def slots_for(self, keys: List[str]) -> np.ndarray:
+        """Map keys to rows, allocating (or recycling) rows for new keys"""
+        slots = np.empty(len(keys), dtype=np.int64)
+        for i, key in enumerate(keys):
+            slot = self.slots.get(key)
+            if slot is None:
+                if len(self.slots) < self.capacity:
+                    slot = len(self.slots)
+                elif self.capacity < self.max_keys:
+                    self._grow(min(self.capacity * 2, self.max_keys))
+                    slot = len(self.slots)
+                else:
+                    _, slot = self.slots.popitem(last=False)
+                    self._reset(slot)
+                self.slots[key] = slot
+            else:
+                self.slots.move_to_end(key)
+            slots[i] = slot
+        return slots
+    
+    def zscores(self, slots: np.ndarray, values: np.ndarray, min_samples: int) -> np.ndarray:
+        """Z-scores of values against each key's running mean/std; NaN if not enough samples"""
+        count = self.count[slots]
+        std = np.sqrt(np.where(count > 1, self.m2[slots] / np.maximum(count - 1, 1), np.nan))
+        z = (values - self.mean[slots]) / np.where(std > 0, std, np.nan)
+        return np.where(count >= min_samples, z, np.nan)
+    
+    def update(self, slots: np.ndarray, values: np.ndarray):
+        """Fold readings into the statistics, NaN values are skipped
+        
+        Rows for repeated keys are applied in successive vectorized rounds so
+        each key sees its readings in order.
+        """
+        remaining = np.arange(len(slots))
+        while len(remaining):
+            _, first = np.unique(slots[remaining], return_index=True)
+            batch = remaining[first]
+            self._update_unique(slots[batch], values[batch])
+            remaining = np.delete(remaining, first)
+    
+    def _update_unique(self, slots: np.ndarray, values: np.ndarray):
+        present = ~np.isnan(values)
+        x = np.where(present, values, 0.0)
+        count = self.count[slots] + present
+        mean = self.mean[slots]
+        delta = np.where(present, x - mean, 0.0)
+        mean = mean + delta / np.maximum(count, 1)
+        self.m2[slots] += delta * np.where(present, x - mean, 0.0)
+        self.mean[slots] = mean
+        self.count[slots] = count
+        
+        first = present & (count == 1)
+        ewma = self.ewma[slots]
+        diff = np.where(present, x - ewma, 0.0)
+        increment = self.alpha * diff
+        ewm_var = self.ewm_var[slots]
+        # A missing reading leaves the variance as it was instead of decaying it
+        self.ewm_var[slots] = np.where(first, 0.0,
+                                       np.where(present, (1 - self.alpha) * (ewm_var + diff * increment), ewm_var))
+        self.ewma[slots] = np.where(first, x, ewma + increment)
+        
+        if self.quantile_low is not None:
+            span = self.quantile_high - self.quantile_low
+            bins = np.clip(((x - self.quantile_low) / span * self.quantile_bins).astype(np.int64), 0, self.quantile_bins - 1)
+            rows, sensors = np.nonzero(present)
+            np.add.at(self.histogram, (slots[rows], sensors, bins[rows, sensors]), 1)
+    
+    def quantiles(self, key: str, qs: List[float]) -> Optional[Dict[str, List[Optional[float]]]]:
+        """Approximate quantiles per sensor from the histogram sketch"""
+        slot = self.slots.get(key)
+        if slot is None or self.quantile_low is None:
+            return None
+        result = {}
+        for j, sensor in enumerate(self.sensor_names):
+            histogram = self.histogram[slot, j]
+            total = histogram.sum()
+            if total == 0:
+                result[sensor] = [None] * len(qs)
+                continue
+            width = (self.quantile_high[j] - self.quantile_low[j]) / self.quantile_bins
+            cumulative = np.cumsum(histogram)
+            bins = np.searchsorted(cumulative, np.array(qs) * total)
+            result[sensor] = [float(self.quantile_low[j] + (b + 0.5) * width) for b in bins]
+        return result
+    
+    def summary(self, key: str) -> Optional[Dict[str, Dict]]:
+        slot = self.slots.get(key)
+        if slot is None:
+            return None
+        summary = {}
+        for j, sensor in enumerate(self.sensor_names):
+            count = int(self.count[slot, j])
+            summary[sensor] = {
+                "count": count,
+                "mean": float(self.mean[slot, j]) if count else None,
+                "std": float(np.sqrt(self.m2[slot, j] / (count - 1))) if count > 1 else None,
+                "ewma": float(self.ewma[slot, j]) if count else None,
+                "ewm_std": float(np.sqrt(self.ewm_var[slot, j])) if count else None
+            }
+        return summary
+
+class BaselineStatistics:
+    """Per-VIN and per-model sensor baselines for z-score anomaly detection"""
+    
+    def __init__(self, baseline_thresholds: Dict):
+        self.sensor_names = list(baseline_thresholds.keys())
+        spans = [(t["min"] - (t["max"] - t["min"]), t["max"] + (t["max"] - t["min"]))
+                 for t in baseline_thresholds.values()]
+        self.vehicles = OnlineSensorStats(self.sensor_names, STATS_MAX_VINS)
+        self.models = OnlineSensorStats(self.sensor_names, STATS_MAX_MODELS, quantile_ranges=spans, initial_capacity=64)
+        self.min_samples = STATS_MIN_SAMPLES
+        self.z_threshold = STATS_Z_THRESHOLD
+    
+    def observe(self, vins: List[str], models: List[Optional[str]], values: np.ndarray) -> np.ndarray:
+        """Score readings against their baselines, then fold them in
+        
+        ``values`` is a readings x ``sensor_names`` matrix with NaN for sensors not
+        present in the reading. Each reading is judged against its VIN's own
+        baseline, or its model's baseline while the VIN is still warming up.
+        """
+        vin_slots = self.vehicles.slots_for(vins)
+        model_slots = self.models.slots_for([model or "unknown" for model in models])
+        
+        z = self.vehicles.zscores(vin_slots, values, self.min_samples)
+        z = np.where(np.isnan(z), self.models.zscores(model_slots, values, self.min_samples), z)
+        
+        self.vehicles.update(vin_slots, values)
+        self.models.update(model_slots, values)
+        return z
+    
+    def deviations(self, z_row: np.ndarray) -> Dict[str, float]:
+        """Sensors whose z-score exceeds the configured threshold"""
+        return {
+            sensor: round(float(z_row[j]), 2)
+            for j, sensor in enumerate(self.sensor_names)
+            if not np.isnan(z_row[j]) and abs(z_row[j]) > self.z_threshold
+        }
+
 anomaly_detector = AnomalyDetection()
 predictive_analytics = PredictiveAnalytics()
+baseline_stats = BaselineStatistics(anomaly_detector.baseline_thresholds)
+
+class VehicleStreamState:
+    """Latest known sensor values and health for one streaming vehicle"""
+    
+    __slots__ = ("values", "readings", "last_seen", "health", "model")
+    
+    def __init__(self, sensor_count: int):
+        self.values = np.full(sensor_count, np.nan)
+        self.readings = 0
+        self.last_seen = None
+        self.health = "HEALTHY"
+        self.model = None
+
+class TelemetryStreamState:
+    """Per-VIN rolling state for streamed telematics, bounded by least-recently-seen eviction"""
+    
+    def __init__(self, sensor_names: List[str], max_vins: int = STREAM_STATE_MAX_VINS):
+        self.sensor_names = sensor_names
+        self.sensor_index = {name: i for i, name in enumerate(sensor_names)}
+        self.max_vins = max_vins
+        self.vehicles: "OrderedDict[str, VehicleStreamState]" = OrderedDict()
+    
+    def apply(self, reading: Dict) -> VehicleStreamState:
+        """Merge a (possibly partial) reading into the vehicle's latest values"""
+        vin = reading["vin"]
+        state = self.vehicles.get(vin)
+        if state is None:
+            state = self.vehicles[vin] = VehicleStreamState(len(self.sensor_names))
+            if len(self.vehicles) > self.max_vins:
+                self.vehicles.popitem(last=False)
+        else:
+            self.vehicles.move_to_end(vin)
+        for name, value in reading.items():
+            i = self.sensor_index.get(name)
+            if i is not None and isinstance(value, (int, float)) and not isinstance(value, bool):
+                state.values[i] = value
+        state.readings += 1
+        state.last_seen = reading.get("timestamp") or datetime.now().isoformat()
+        state.model = reading.get("model", state.model)
+        return state
+    
+    def snapshot(self, vin: str) -> Optional[Dict]:
+        state = self.vehicles.get(vin)
+        if state is None:
+            return None
+        return {
+            "vin": vin,
+            "sensors": {name: float(state.values[i]) for name, i in self.sensor_index.items() if not np.isnan(state.values[i])},
+            "readings": state.readings,
+            "last_seen": state.last_seen,
+            "health": state.health
+        }
+
+class DuplexStreamingResponse(StreamingResponse):
+    """Streaming response whose body generator keeps reading the request body
+    
+    StreamingResponse normally consumes ``receive`` to watch for disconnects,
+    which would steal request body messages from ``request.stream()``.
+    """
+    
+    async def __call__(self, scope, receive, send):
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
+
+stream_state = TelemetryStreamState(anomaly_detector.threshold_sensors + ["speed"])
+
+def score_stream_batch(readings: List[Dict]) -> List[Dict]:
+    """Fold readings into rolling state and score them; return anomaly and recovery events"""
+    states = []
+    sensor_matrix = np.empty((len(readings), len(stream_state.sensor_names)))
+    timestamps = []
+    for i, reading in enumerate(readings):
+        state = stream_state.apply(reading)
+        # Snapshot the merged row: later readings for the same VIN update it in place
+        sensor_matrix[i] = state.values
+        states.append(state)
+        timestamps.append(state.last_seen)
+    anomalies = anomaly_detector.detect_anomalies_batch(sensor_matrix, stream_state.sensor_names)
+    # Baselines only learn from sensors actually present in each reading
+    z = baseline_stats.observe(
+        [reading["vin"] for reading in readings],
+        [state.model for state in states],
+        to_sensor_matrix(readings, baseline_stats.sensor_names)
+    )
+    
+    sensors = np.array(anomalies["sensors"])
+    events = []
+    for i, (reading, state) in enumerate(zip(readings, states)):
+        health = str(anomalies["overall_health"][i])
+        previous_health, state.health = state.health, health
+        deviating_sensors = baseline_stats.deviations(z[i])
+        anomalous = anomalies["anomaly_count"][i] > 0 or bool(deviating_sensors)
+        if not anomalous and health == previous_health:
+            continue
+        events.append({
+            "type": "anomaly" if anomalous else "recovered",
+            "vin": reading["vin"],
+            "timestamp": timestamps[i],
+            "risk_score": float(anomalies["risk_score"][i]),
+            "overall_health": health,
+            "previous_health": previous_health,
+            "critical_sensors": sensors[anomalies["critical"][i]].tolist(),
+            "warning_sensors": sensors[anomalies["warning"][i]].tolist(),
+            "deviating_sensors": deviating_sensors
+        })
+    return events
 
 @app.post("/task")
-def analyze_telematics_data(task: DataAnalysisTask):
+async def analyze_telematics_data(task: DataAnalysisTask):
     """Analyze telematics data for anomalies and predictions"""
     try:
-        # Fetch telematics data from mock API
-        try:
-            response = requests.get(f"{MOCK_API_BASE}/telematics/{task.vin}", timeout=10)
-            if response.status_code != 200:
+        # Use the forwarded snapshot, fetching from mock API only when absent
+        telematics_data = task.telematics
+        if telematics_data is None:
+            try:
+                status, telematics_data = await mock_api.get(f"/telematics/{task.vin}", timeout=10)
+                if status != 200:
+                    return {
+                        "worker": "data_analysis",
+                        "error": f"Failed to fetch telematics data: {status}",
+                        "confidence": 0.0
+                    }
+            except Exception as e:
                 return {
                     "worker": "data_analysis",
-                    "error": f"Failed to fetch telematics data: {response.status_code}",
+                    "error": f"Error fetching telematics data: {str(e)}",
                     "confidence": 0.0
                 }
-            
-            telematics_data = response.json()
-        except Exception as e:
-            return {
-                "worker": "data_analysis",
-                "error": f"Error fetching telematics data: {str(e)}",
-                "confidence": 0.0
-            }
         
         # Extract current sensor data
         current_status = telematics_data.get("current_status", {})
@@ -234,6 +670,19 @@ def analyze_telematics_data(task: DataAnalysisTask):
         # Perform anomaly detection
         anomaly_results = anomaly_detector.detect_anomalies(combined_sensor_data)
         
+        # Compare against this vehicle's (or its model's) learned baseline
+        vehicle_info = telematics_data.get("vehicle_info", {})
+        z = baseline_stats.observe(
+            [task.vin],
+            [vehicle_info.get("model")],
+            to_sensor_matrix([combined_sensor_data], baseline_stats.sensor_names)
+        )[0]
+        baseline_deviation = {
+            "z_scores": {sensor: (None if np.isnan(z[j]) else round(float(z[j]), 2))
+                         for j, sensor in enumerate(baseline_stats.sensor_names)},
+            "deviating_sensors": baseline_stats.deviations(z)
+        }
+        
         # Perform predictive analytics
         prediction_results = predictive_analytics.predict_failures(combined_sensor_data, maintenance_history)
         
@@ -250,6 +699,7 @@ def analyze_telematics_data(task: DataAnalysisTask):
             "vehicle_info": telematics_data.get("vehicle_info", {}),
             "sensor_data": combined_sensor_data,
             "anomaly_detection": anomaly_results,
+            "baseline_deviation": baseline_deviation,
             "predictive_analytics": prediction_results,
             "insights": insights,
             "data_quality_score": data_quality,
@@ -275,6 +725,197 @@ def analyze_telematics_data(task: DataAnalysisTask):
             "confidence": 0.0
         }
 
+async def fetch_telematics_bulk(vins: List[str], fields: Optional[List[str]] = None) -> Tuple[Dict[str, Dict], Dict[str, str]]:
+    """Fetch telematics for many VINs via the mock API bulk endpoint
+    
+    VINs are requested in chunks of BULK_FETCH_CHUNK, up to BATCH_FETCH_CONCURRENCY
+    chunks at a time, each streamed back as NDJSON. Returns records and per-VIN errors.
+    """
+    semaphore = asyncio.Semaphore(BATCH_FETCH_CONCURRENCY)
+    records: Dict[str, Dict] = {}
+    errors: Dict[str, str] = {}
+    
+    async def fetch_chunk(chunk: List[str]):
+        async with semaphore:
+            try:
+                async for item in mock_api.post_ndjson(
+                    "/telematics/bulk", {"vins": chunk, "fields": fields, "stream": True}, timeout=60
+                ):
+                    if "error" in item:
+                        errors[item["vin"]] = f"Failed to fetch vehicle data: {item['error']}"
+                    else:
+                        records[item["vin"]] = item["telematics"]
+            except Exception as e:
+                for vin in chunk:
+                    if vin not in records:
+                        errors[vin] = f"Error fetching vehicle data: {str(e)}"
+    
+    await asyncio.gather(*(
+        fetch_chunk(vins[i:i + BULK_FETCH_CHUNK]) for i in range(0, len(vins), BULK_FETCH_CHUNK)
+    ))
+    return records, errors
+
+@app.post("/task/batch")
+async def analyze_telematics_batch(task: BatchAnalysisTask):
+    """Score a columnar batch of telematics snapshots with the vectorized engine"""
+    try:
+        fetch_errors = {}
+        if task.values is None:
+            # Pull the whole batch from the mock API in bulk and build the matrix here
+            records, fetch_errors = await fetch_telematics_bulk(
+                task.vins, ["current_status", "sensor_data", "maintenance_history"]
+            )
+            task.vins = [vin for vin in task.vins if vin in records]
+            task.sensor_names = task.sensor_names or sorted(
+                set(anomaly_detector.threshold_sensors) | set(predictive_analytics.model_factors) | {"speed"}
+            )
+            snapshots = [{**records[vin].get("current_status", {}), **records[vin].get("sensor_data", {})} for vin in task.vins]
+            sensor_matrix = to_sensor_matrix(snapshots, task.sensor_names)
+            serviced = np.array([recently_serviced(records[vin].get("maintenance_history", [])) for vin in task.vins], dtype=bool)
+        else:
+            if task.sensor_names is None or len(task.values) != len(task.vins):
+                return {
+                    "worker": "data_analysis",
+                    "error": "sensor_names and values must be given together, with one row per VIN",
+                    "confidence": 0.0
+                }
+            if task.maintenance_history is not None and len(task.maintenance_history) != len(task.vins):
+                return {
+                    "worker": "data_analysis",
+                    "error": "maintenance_history must have one record list per VIN",
+                    "confidence": 0.0
+                }
+            sensor_matrix = np.array(task.values, dtype=np.float64).reshape(len(task.vins), len(task.sensor_names))
+            serviced = (
+                np.array([recently_serviced(history) for history in task.maintenance_history], dtype=bool)
+                if task.maintenance_history else None
+            )
+        
+        anomalies = anomaly_detector.detect_anomalies_batch(sensor_matrix, task.sensor_names)
+        predictions = predictive_analytics.predict_failures_batch(sensor_matrix, task.sensor_names, serviced)
+        
+        sensors = np.array(anomalies["sensors"])
+        systems = np.array(predictions["systems"])
+        vehicles = []
+        for i, vin in enumerate(task.vins):
+            vehicles.append({
+                "vin": vin,
+                "risk_score": float(anomalies["risk_score"][i]),
+                "overall_health": str(anomalies["overall_health"][i]),
+                "anomaly_count": int(anomalies["anomaly_count"][i]),
+                "critical_sensors": sensors[anomalies["critical"][i]].tolist(),
+                "warning_sensors": sensors[anomalies["warning"][i]].tolist(),
+                "predicted_failures": systems[predictions["predicted"][i]].tolist(),
+                "overall_failure_risk": float(predictions["overall_risk_score"][i]),
+                "highest_risk_system": predictions["highest_risk_system"][i]
+            })
+        
+        return {
+            "worker": "data_analysis",
+            "data": {
+                "batch_analysis": True,
+                "total_vehicles": len(vehicles),
+                "vehicles_with_anomalies": int((anomalies["anomaly_count"] > 0).sum()),
+                "vehicles_at_risk": int(predictions["predicted"].any(axis=1).sum()),
+                "vehicles": vehicles,
+                "errors": fetch_errors,
+                "analysis_timestamp": datetime.now().isoformat()
+            },
+            "confidence": 0.8,
+            "sources": [f"batch/{len(vehicles)}_vehicles", f"sensor_data/{len(task.sensor_names)}_sensors"]
+        }
+        
+    except Exception as e:
+        logger.error(f"Batch data analysis error: {str(e)}")
+        return {
+            "worker": "data_analysis",
+            "error": f"Batch data analysis failed: {str(e)}",
+            "confidence": 0.0
+        }
+
+@app.post("/ingest/stream")
+async def ingest_telematics_stream(request: Request):
+    """Ingest NDJSON sensor readings for many VINs and stream anomalies back as NDJSON
+    
+    Each line is either a single reading (``{"vin": ..., "engine_temp": ...}``) or a
+    chunk of readings (``{"readings": [...]}``). Readings are scored in batches of up
+    to STREAM_BATCH_SIZE as the request body arrives.
+    """
+    async def event_stream():
+        buffer = b""
+        stats = {"lines": 0, "readings": 0, "events": 0}
+        
+        def process_lines(lines: List[bytes]) -> List[str]:
+            """Parse complete lines and score their readings, returning NDJSON output lines"""
+            output = []
+            pending = []
+            for line in lines:
+                stats["lines"] += 1
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                    readings = record.get("readings", [record]) if isinstance(record, dict) else record
+                    for reading in readings:
+                        if not isinstance(reading, dict) or not reading.get("vin"):
+                            raise ValueError("reading must be an object with a vin")
+                    pending.extend(readings)
+                except (ValueError, AttributeError, TypeError) as e:
+                    output.append(json.dumps({"type": "error", "line": stats["lines"], "error": str(e)}) + "\n")
+            for i in range(0, len(pending), STREAM_BATCH_SIZE):
+                batch = pending[i:i + STREAM_BATCH_SIZE]
+                stats["readings"] += len(batch)
+                for event in score_stream_batch(batch):
+                    stats["events"] += 1
+                    output.append(json.dumps(event) + "\n")
+            return output
+        
+        async for chunk in request.stream():
+            buffer += chunk
+            *lines, buffer = buffer.split(b"\n")
+            if lines:
+                for output in process_lines(lines):
+                    yield output
+        
+        for output in process_lines([buffer]):
+            yield output
+        
+        yield json.dumps({
+            "type": "summary",
+            "readings": stats["readings"],
+            "events": stats["events"],
+            "tracked_vehicles": len(stream_state.vehicles)
+        }) + "\n"
+    
+    return DuplexStreamingResponse(event_stream(), media_type="application/x-ndjson")
+
+@app.get("/ingest/state/{vin}")
+async def get_stream_state(vin: str):
+    """Get the rolling stream state for a vehicle"""
+    snapshot = stream_state.snapshot(vin)
+    if snapshot is None:
+        return {"vin": vin, "error": "No streamed readings for vehicle"}
+    return snapshot
+
+@app.get("/baselines/{vin}")
+async def get_vehicle_baseline(vin: str):
+    """Get the learned sensor baseline for a vehicle"""
+    summary = baseline_stats.vehicles.summary(vin)
+    if summary is None:
+        return {"vin": vin, "error": "No baseline for vehicle"}
+    return {"vin": vin, "sensors": summary}
+
+@app.get("/baselines/models/{model}")
+async def get_model_baseline(model: str):
+    """Get the learned sensor baseline and approximate quantiles for a vehicle model"""
+    summary = baseline_stats.models.summary(model)
+    if summary is None:
+        return {"model": model, "error": "No baseline for model"}
+    quantiles = baseline_stats.models.quantiles(model, [0.05, 0.5, 0.95])
+    for sensor, (p05, p50, p95) in quantiles.items():
+        summary[sensor].update({"p05": p05, "p50": p50, "p95": p95})
+    return {"model": model, "sensors": summary}
+
 def generate_insights(anomaly_results: Dict, prediction_results: Dict, analysis_type: str) -> Dict:
     """Generate actionable insights from analysis results"""
     insights = {
@@ -6,234 +6,152 @@ Interprets diagnostic trouble codes and predicts component failures
 
 from fastapi import FastAPI
 from pydantic import BaseModel, Field
-import requests
-from typing import Dict, List, Optional, Any
-from datetime import datetime, timedelta
+import os
+from typing import Dict, List, Optional, Any, Tuple, Mapping
+from datetime import datetime
 import logging
 import json
+import asyncio
+from collections import Counter
+from bisect import bisect_left, bisect_right
+from types import MappingProxyType
+
+from mock_api_client import MockAPIClient
+from service_history import recently_serviced
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="Diagnosis Worker", version="1.0")
-
 MOCK_API_BASE = "http://mockapi:8000"
 
+MOCK_API_POOL_LIMIT = int(os.getenv("MOCK_API_POOL_LIMIT", "200"))
+BATCH_FETCH_CONCURRENCY = int(os.getenv("BATCH_FETCH_CONCURRENCY", "20"))
+BULK_FETCH_CHUNK = int(os.getenv("BULK_FETCH_CHUNK", "1000"))
+DTC_DATA_PATH = os.getenv("DTC_DATA_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "dtc_codes.json"))
+
+mock_api = MockAPIClient(MOCK_API_BASE, MOCK_API_POOL_LIMIT)
+
+app = FastAPI(title="Diagnosis Worker", version="1.0", lifespan=mock_api.lifespan)
+
 class DiagnosisTask(BaseModel):
     session_id: str
     vin: str
     customer_id: Optional[str] = None
     diagnosis_type: str = "predictive"  # predictive, emergency, routine
     focus_components: Optional[List[str]] = None
+    telematics: Optional[Dict[str, Any]] = None  # Snapshot forwarded by the master agent
+
+class VehicleDTCInput(BaseModel):
+    vin: str
+    dtc_codes: List[str] = []
+    maintenance_history: List[Dict[str, Any]] = []
+
+class BatchDiagnosisTask(BaseModel):
+    session_id: str
+    vins: List[str] = []  # Fetched from the mock API
+    vehicles: List[VehicleDTCInput] = []  # Raw DTC lists supplied by the caller
+    diagnosis_type: str = "predictive"
+    include_details: bool = False
 
 class DTCDatabase:
-    """Database of Diagnostic Trouble Codes and their interpretations"""
+    """Database of Diagnostic Trouble Codes and their interpretations
     
-    def __init__(self):
-        self.dtc_codes = {
-            # Engine/Powertrain codes
-            "P0301": {
-                "description": "Cylinder 1 Misfire Detected",
-                "severity": "HIGH",
-                "component": "Ignition System",
-                "common_causes": ["Faulty spark plug", "Bad ignition coil", "Fuel injector issue"],
-                "repair_priority": "HIGH",
-                "estimated_cost": 2000,
-                "repair_time_hours": 2
-            },
-            "P0302": {
-                "description": "Cylinder 2 Misfire Detected",
-                "severity": "HIGH",
-                "component": "Ignition System",
-                "common_causes": ["Faulty spark plug", "Bad ignition coil", "Fuel injector issue"],
-                "repair_priority": "HIGH",
-                "estimated_cost": 2000,
-                "repair_time_hours": 2
-            },
-            "P0303": {
-                "description": "Cylinder 3 Misfire Detected",
-                "severity": "HIGH",
-                "component": "Ignition System",
-                "common_causes": ["Faulty spark plug", "Bad ignition coil", "Fuel injector issue"],
-                "repair_priority": "HIGH",
-                "estimated_cost": 2000,
-                "repair_time_hours": 2
-            },
-            "P0304": {
-                "description": "Cylinder 4 Misfire Detected",
-                "severity": "HIGH",
-                "component": "Ignition System",
-                "common_causes": ["Faulty spark plug", "Bad ignition coil", "Fuel injector issue"],
-                "repair_priority": "HIGH",
-                "estimated_cost": 2000,
-                "repair_time_hours": 2
-            },
-            "P0171": {
-                "description": "System Too Lean (Bank 1)",
-                "severity": "MEDIUM",
-                "component": "Fuel System",
-                "common_causes": ["Vacuum leak", "MAF sensor issue", "Fuel filter clogged"],
-                "repair_priority": "MEDIUM",
-                "estimated_cost": 1500,
-                "repair_time_hours": 1.5
-            },
-            "P0172": {
-                "description": "System Too Rich (Bank 1)",
-                "severity": "MEDIUM",
-                "component": "Fuel System",
-                "common_causes": ["Faulty oxygen sensor", "Fuel injector leak", "MAF sensor issue"],
-                "repair_priority": "MEDIUM",
-                "estimated_cost": 1800,
-                "repair_time_hours": 2
-            },
-            "P0420": {
-                "description": "Catalyst System Efficiency Below Threshold",
-                "severity": "MEDIUM",
-                "component": "Emission System",
-                "common_causes": ["Failing catalytic converter", "Oxygen sensor issue", "Exhaust leak"],
-                "repair_priority": "MEDIUM",
-                "estimated_cost": 8000,
-                "repair_time_hours": 3
-            },
-            "P0430": {
-                "description": "Catalyst System Efficiency Below Threshold (Bank 2)",
-                "severity": "MEDIUM",
-                "component": "Emission System",
-                "common_causes": ["Failing catalytic converter", "Oxygen sensor issue", "Exhaust leak"],
-                "repair_priority": "MEDIUM",
-                "estimated_cost": 8000,
-                "repair_time_hours": 3
-            },
-            # Transmission codes
-            "P0700": {
-                "description": "Transmission Control System Malfunction",
-                "severity": "HIGH",
-                "component": "Transmission",
-                "common_causes": ["Transmission control module issue", "Solenoid problem", "Fluid level low"],
-                "repair_priority": "HIGH",
-                "estimated_cost": 5000,
-                "repair_time_hours": 4
-            },
-            "P0701": {
-                "description": "Transmission Control System Range/Performance",
-                "severity": "MEDIUM",
-                "component": "Transmission",
-                "common_causes": ["Transmission fluid issue", "Solenoid malfunction", "Sensor problem"],
-                "repair_priority": "MEDIUM",
-                "estimated_cost": 3000,
-                "repair_time_hours": 3
-            },
-            # Electrical codes
-            "P0102": {
-                "description": "Mass or Volume Air Flow Circuit Low Input",
-                "severity": "MEDIUM",
-                "component": "Air Intake System",
-                "common_causes": ["MAF sensor failure", "Wiring issue", "Air filter clogged"],
-                "repair_priority": "MEDIUM",
-                "estimated_cost": 2500,
-                "repair_time_hours": 1
-            },
-            "P0103": {
-                "description": "Mass or Volume Air Flow Circuit High Input",
-                "severity": "MEDIUM",
-                "component": "Air Intake System",
-                "common_causes": ["MAF sensor failure", "Wiring issue", "Air intake leak"],
-                "repair_priority": "MEDIUM",
-                "estimated_cost": 2500,
-                "repair_time_hours": 1
-            },
-            # EVAP system codes
-            "P0443": {
-                "description": "Evaporative Emission Control System Purge Control Valve Circuit",
-                "severity": "LOW",
-                "component": "Emission System",
-                "common_causes": ["Purge valve failure", "Wiring issue", "Vacuum leak"],
-                "repair_priority": "LOW",
-                "estimated_cost": 1200,
-                "repair_time_hours": 1
-            },
-            "P0445": {
-                "description": "Evaporative Emission Control System Purge Control Valve Circuit Shorted",
-                "severity": "LOW",
-                "component": "Emission System",
-                "common_causes": ["Purge valve failure", "Wiring short", "Control module issue"],
-                "repair_priority": "LOW",
-                "estimated_cost": 1200,
-                "repair_time_hours": 1
-            },
-            # Variable valve timing codes
-            "P0010": {
-                "description": "Intake Camshaft Position Actuator Circuit (Bank 1)",
-                "severity": "MEDIUM",
-                "component": "Variable Valve Timing",
-                "common_causes": ["VVT solenoid failure", "Oil pressure issue", "Timing chain problem"],
-                "repair_priority": "MEDIUM",
-                "estimated_cost": 4000,
-                "repair_time_hours": 3
-            },
-            "P0011": {
-                "description": "Intake Camshaft Position Timing - Over-Advanced (Bank 1)",
-                "severity": "MEDIUM",
-                "component": "Variable Valve Timing",
-                "common_causes": ["VVT solenoid issue", "Oil pressure low", "Timing chain stretch"],
-                "repair_priority": "MEDIUM",
-                "estimated_cost": 4000,
-                "repair_time_hours": 3
-            }
+    Code definitions are loaded once from ``dtc_codes.json`` and compiled into a
+    sorted, immutable index: a code -> position map, parallel tuples of the
+    per-code fields and one read-only definition per code. Lookups hand out
+    fresh copies, so callers cannot alter the index.
+    """
+    
+    SEVERITIES = ("CRITICAL", "HIGH", "MEDIUM", "LOW")
+    # Fields of each ``codes_analyzed`` entry, besides the code itself
+    ANALYZED_FIELDS = ("description", "severity", "component", "common_causes", "estimated_cost", "repair_time_hours")
+    
+    def __init__(self, data_path: str = DTC_DATA_PATH):
+        with open(data_path, "r") as f:
+            definitions = json.load(f)
+        
+        self.codes: Tuple[str, ...] = tuple(sorted(definitions))
+        self._positions: Dict[str, int] = {code: i for i, code in enumerate(self.codes)}
+        self._definitions: Tuple[Mapping[str, Any], ...] = tuple(
+            MappingProxyType({**definitions[code], "common_causes": tuple(definitions[code]["common_causes"])})
+            for code in self.codes
+        )
+        self._severity: Tuple[str, ...] = tuple(record["severity"] for record in self._definitions)
+        self._component: Tuple[str, ...] = tuple(record["component"] for record in self._definitions)
+        self._cost: Tuple[int, ...] = tuple(record["estimated_cost"] for record in self._definitions)
+        self._hours: Tuple[float, ...] = tuple(record["repair_time_hours"] for record in self._definitions)
+        
+        # Catalogue-wide aggregates, computed once
+        components: Dict[str, List[str]] = {}
+        for code, component in zip(self.codes, self._component):
+            components.setdefault(component, []).append(code)
+        self.component_codes: Dict[str, Tuple[str, ...]] = {c: tuple(codes) for c, codes in components.items()}
+        self.severity_codes: Dict[str, Tuple[str, ...]] = {
+            severity: tuple(code for code, s in zip(self.codes, self._severity) if s == severity)
+            for severity in self.SEVERITIES
         }
+        
+        # Kept for callers that iterate the raw definitions, read-only
+        self.dtc_codes: Mapping[str, Mapping[str, Any]] = MappingProxyType(dict(zip(self.codes, self._definitions)))
     
     def get_dtc_info(self, dtc_code: str) -> Optional[Dict]:
         """Get information about a specific DTC code"""
-        return self.dtc_codes.get(dtc_code)
+        position = self._positions.get(dtc_code)
+        if position is None:
+            return None
+        definition = self._definitions[position]
+        return {**definition, "common_causes": list(definition["common_causes"])}
+    
+    def _analyzed(self, position: int) -> Dict:
+        definition = self._definitions[position]
+        return {
+            "code": self.codes[position],
+            **{field: definition[field] for field in self.ANALYZED_FIELDS},
+            "common_causes": list(definition["common_causes"])
+        }
+    
+    def lookup_many(self, dtc_codes: List[str]) -> List[int]:
+        """Resolve many codes to index positions, dropping unknown codes"""
+        positions = self._positions
+        return [positions[code] for code in dtc_codes if code in positions]
+    
+    def codes_with_prefix(self, prefix: str) -> Tuple[str, ...]:
+        """All known codes starting with a prefix; ``P03xx`` style wildcards are accepted"""
+        prefix = prefix.upper().rstrip("X")
+        lo = bisect_left(self.codes, prefix)
+        hi = bisect_left(self.codes, prefix + "\uffff")
+        return self.codes[lo:hi]
+    
+    def codes_in_range(self, first: str, last: str) -> Tuple[str, ...]:
+        """All known codes between two codes, inclusive"""
+        return self.codes[bisect_left(self.codes, first.upper()):bisect_right(self.codes, last.upper())]
     
     def analyze_dtc_codes(self, dtc_codes: List[str]) -> Dict:
         """Analyze multiple DTC codes and provide comprehensive diagnosis"""
-        analysis_results = {
-            "total_codes": len(dtc_codes),
-            "codes_analyzed": [],
-            "severity_summary": {"CRITICAL": 0, "HIGH": 0, "MEDIUM": 0, "LOW": 0},
-            "component_issues": {},
-            "estimated_total_cost": 0,
-            "estimated_total_time": 0,
-            "repair_priority": "LOW"
-        }
+        positions = self.lookup_many(dtc_codes)
+        severity_summary = {severity: 0 for severity in self.SEVERITIES}
+        component_issues: Dict[str, List[str]] = {}
         
-        for dtc in dtc_codes:
-            dtc_info = self.get_dtc_info(dtc)
-            if dtc_info:
-                analysis_results["codes_analyzed"].append({
-                    "code": dtc,
-                    "description": dtc_info["description"],
-                    "severity": dtc_info["severity"],
-                    "component": dtc_info["component"],
-                    "common_causes": dtc_info["common_causes"],
-                    "estimated_cost": dtc_info["estimated_cost"],
-                    "repair_time_hours": dtc_info["repair_time_hours"]
-                })
-                
-                # Update severity summary
-                analysis_results["severity_summary"][dtc_info["severity"]] += 1
-                
-                # Group by component
-                component = dtc_info["component"]
-                if component not in analysis_results["component_issues"]:
-                    analysis_results["component_issues"][component] = []
-                analysis_results["component_issues"][component].append(dtc)
-                
-                # Accumulate costs and time
-                analysis_results["estimated_total_cost"] += dtc_info["estimated_cost"]
-                analysis_results["estimated_total_time"] += dtc_info["repair_time_hours"]
+        for position in positions:
+            severity_summary[self._severity[position]] += 1
+            component_issues.setdefault(self._component[position], []).append(self.codes[position])
         
         # Determine overall repair priority
-        if analysis_results["severity_summary"]["CRITICAL"] > 0:
-            analysis_results["repair_priority"] = "CRITICAL"
-        elif analysis_results["severity_summary"]["HIGH"] > 0:
-            analysis_results["repair_priority"] = "HIGH"
-        elif analysis_results["severity_summary"]["MEDIUM"] > 0:
-            analysis_results["repair_priority"] = "MEDIUM"
+        repair_priority = next(
+            (severity for severity in ("CRITICAL", "HIGH", "MEDIUM") if severity_summary[severity] > 0),
+            "LOW"
+        )
         
-        return analysis_results
+        return {
+            "total_codes": len(dtc_codes),
+            "codes_analyzed": [self._analyzed(position) for position in positions],
+            "severity_summary": severity_summary,
+            "component_issues": component_issues,
+            "estimated_total_cost": sum(self._cost[position] for position in positions),
+            "estimated_total_time": sum(self._hours[position] for position in positions),
+            "repair_priority": repair_priority
+        }
 
 class FailurePredictor:
     """Predicts component failures based on DTC patterns and vehicle history"""
@@ -261,24 +179,44 @@ class FailurePredictor:
                 "time_to_failure_days": 90
             }
         }
+        self._compile_patterns()
     
-    def predict_failures(self, dtc_codes: List[str], maintenance_history: List[Dict]) -> Dict:
-        """Predict component failures based on DTC patterns"""
+    def _compile_patterns(self):
+        """Map each indicator code to the failure patterns it contributes to"""
+        code_systems: Dict[str, List[str]] = {}
+        for system, pattern in self.failure_patterns.items():
+            for code in pattern["indicators"]:
+                code_systems.setdefault(code, []).append(system)
+        self.code_systems: Dict[str, Tuple[str, ...]] = {code: tuple(systems) for code, systems in code_systems.items()}
+    
+    def predict_failures(self, dtc_codes: List[str], maintenance_history: List[Dict],
+                         serviced_recently: Optional[bool] = None) -> Dict:
+        """Predict component failures based on DTC patterns
+        
+        ``serviced_recently`` may be passed when the caller already knows the
+        vehicle's service recency; otherwise it is derived from the history once.
+        """
         predictions = []
         
+        # Single pass over the codes, bucketing them by the patterns they indicate
+        matches: Dict[str, List[str]] = {}
+        for code in dtc_codes:
+            for system in self.code_systems.get(code, ()):
+                matches.setdefault(system, []).append(code)
+        if not matches:
+            return {"predictions": [], "highest_risk_system": None, "overall_risk_score": 0.0}
+        
+        if serviced_recently is None:
+            serviced_recently = recently_serviced(maintenance_history)
+        
         for system, pattern in self.failure_patterns.items():
-            matching_codes = [code for code in dtc_codes if code in pattern["indicators"]]
+            matching_codes = matches.get(system, [])
             
             if len(matching_codes) >= pattern["failure_threshold"]:
                 # Calculate failure probability based on code count and recency
                 base_probability = min(0.9, len(matching_codes) * 0.3)
                 
-                # Adjust based on maintenance history
-                recent_services = [s for s in maintenance_history 
-                                 if datetime.fromisoformat(s["date"].replace("Z", "+00:00")) > 
-                                 datetime.now() - timedelta(days=90)]
-                
-                if recent_services:
+                if serviced_recently:
                     base_probability *= 0.7  # Reduce probability if recently serviced
                 
                 predictions.append({
@@ -299,26 +237,26 @@ dtc_database = DTCDatabase()
 failure_predictor = FailurePredictor()
 
 @app.post("/task")
-def diagnose_vehicle(task: DiagnosisTask):
+async def diagnose_vehicle(task: DiagnosisTask):
     """Diagnose vehicle issues based on DTC codes and sensor data"""
     try:
-        # Fetch telematics data from mock API
-        try:
-            response = requests.get(f"{MOCK_API_BASE}/telematics/{task.vin}", timeout=10)
-            if response.status_code != 200:
+        # Use the forwarded snapshot, fetching from mock API only when absent
+        telematics_data = task.telematics
+        if telematics_data is None:
+            try:
+                status, telematics_data = await mock_api.get(f"/telematics/{task.vin}", timeout=10)
+                if status != 200:
+                    return {
+                        "worker": "diagnosis",
+                        "error": f"Failed to fetch vehicle data: {status}",
+                        "confidence": 0.0
+                    }
+            except Exception as e:
                 return {
                     "worker": "diagnosis",
-                    "error": f"Failed to fetch vehicle data: {response.status_code}",
+                    "error": f"Error fetching vehicle data: {str(e)}",
                     "confidence": 0.0
                 }
-            
-            telematics_data = response.json()
-        except Exception as e:
-            return {
-                "worker": "diagnosis",
-                "error": f"Error fetching vehicle data: {str(e)}",
-                "confidence": 0.0
-            }
         
         # Extract DTC codes and maintenance history
         dtc_codes = telematics_data.get("dtc_codes", [])
@@ -367,6 +305,132 @@ def diagnose_vehicle(task: DiagnosisTask):
             "confidence": 0.0
         }
 
+async def fetch_telematics_bulk(vins: List[str], fields: Optional[List[str]] = None) -> Tuple[Dict[str, Dict], Dict[str, str]]:
+    """Fetch telematics for many VINs via the mock API bulk endpoint
+    
+    VINs are requested in chunks of BULK_FETCH_CHUNK, up to BATCH_FETCH_CONCURRENCY
+    chunks at a time, each streamed back as NDJSON. Returns records and per-VIN errors.
+    """
+    semaphore = asyncio.Semaphore(BATCH_FETCH_CONCURRENCY)
+    records: Dict[str, Dict] = {}
+    errors: Dict[str, str] = {}
+    
+    async def fetch_chunk(chunk: List[str]):
+        async with semaphore:
+            try:
+                async for item in mock_api.post_ndjson(
+                    "/telematics/bulk", {"vins": chunk, "fields": fields, "stream": True}, timeout=60
+                ):
+                    if "error" in item:
+                        errors[item["vin"]] = f"Failed to fetch vehicle data: {item['error']}"
+                    else:
+                        records[item["vin"]] = item["telematics"]
+            except Exception as e:
+                for vin in chunk:
+                    if vin not in records:
+                        errors[vin] = f"Error fetching vehicle data: {str(e)}"
+    
+    await asyncio.gather(*(
+        fetch_chunk(vins[i:i + BULK_FETCH_CHUNK]) for i in range(0, len(vins), BULK_FETCH_CHUNK)
+    ))
+    return records, errors
+
+async def fetch_vehicle_dtc_inputs(vins: List[str]) -> Tuple[List[VehicleDTCInput], Dict[str, str]]:
+    """Fetch DTC codes and maintenance history for many VINs, returning inputs and per-VIN errors"""
+    records, errors = await fetch_telematics_bulk(vins, ["dtc_codes", "maintenance_history"])
+    inputs = [
+        VehicleDTCInput(
+            vin=vin,
+            dtc_codes=records[vin].get("dtc_codes", []),
+            maintenance_history=records[vin].get("maintenance_history", [])
+        )
+        for vin in vins if vin in records
+    ]
+    return inputs, errors
+
+@app.post("/task/batch")
+async def diagnose_fleet(task: BatchDiagnosisTask):
+    """Diagnose many vehicles in one call and aggregate fleet-level findings"""
+    try:
+        fetched, fetch_errors = await fetch_vehicle_dtc_inputs(task.vins) if task.vins else ([], {})
+        vehicles_in = list(task.vehicles) + fetched
+        
+        code_frequency = Counter()
+        severity_totals = {severity: 0 for severity in DTCDatabase.SEVERITIES}
+        health_distribution = Counter()
+        systems_at_risk: Dict[str, Dict] = {}
+        estimated_total_cost = 0
+        vehicles = []
+        
+        for vehicle in vehicles_in:
+            dtc_analysis = dtc_database.analyze_dtc_codes(vehicle.dtc_codes)
+            failure_predictions = failure_predictor.predict_failures(vehicle.dtc_codes, vehicle.maintenance_history)
+            diagnosis_summary = generate_diagnosis_summary(dtc_analysis, failure_predictions, task.diagnosis_type)
+            
+            code_frequency.update(vehicle.dtc_codes)
+            for severity, count in dtc_analysis["severity_summary"].items():
+                severity_totals[severity] += count
+            health_distribution[diagnosis_summary["overall_health"]] += 1
+            estimated_total_cost += dtc_analysis["estimated_total_cost"]
+            for prediction in failure_predictions["predictions"]:
+                system = systems_at_risk.setdefault(
+                    prediction["system"], {"vehicles": 0, "max_failure_probability": 0.0, "vins": []}
+                )
+                system["vehicles"] += 1
+                system["max_failure_probability"] = max(system["max_failure_probability"], prediction["failure_probability"])
+                system["vins"].append(vehicle.vin)
+            
+            result = {
+                "vin": vehicle.vin,
+                "overall_health": diagnosis_summary["overall_health"],
+                "urgency_level": diagnosis_summary["urgency_level"],
+                "repair_priority": dtc_analysis["repair_priority"],
+                "total_codes": dtc_analysis["total_codes"],
+                "estimated_repair_cost": dtc_analysis["estimated_total_cost"],
+                "highest_risk_system": failure_predictions["highest_risk_system"],
+                "overall_risk_score": failure_predictions["overall_risk_score"]
+            }
+            if task.include_details:
+                result.update({
+                    "dtc_analysis": dtc_analysis,
+                    "failure_predictions": failure_predictions,
+                    "diagnosis_summary": diagnosis_summary
+                })
+            vehicles.append(result)
+        
+        fleet_summary = {
+            "total_vehicles": len(vehicles),
+            "failed_vehicles": len(fetch_errors),
+            "health_distribution": dict(health_distribution),
+            "severity_summary": severity_totals,
+            "code_frequency": dict(code_frequency.most_common()),
+            "unknown_codes": sorted(code for code in code_frequency if dtc_database.get_dtc_info(code) is None),
+            "systems_at_risk": dict(sorted(systems_at_risk.items(), key=lambda item: -item[1]["vehicles"])),
+            "vehicles_needing_immediate_attention": [v["vin"] for v in vehicles if v["urgency_level"] == "IMMEDIATE"],
+            "estimated_total_cost": estimated_total_cost
+        }
+        
+        return {
+            "worker": "diagnosis",
+            "data": {
+                "batch_diagnosis": True,
+                "fleet_summary": fleet_summary,
+                "vehicles": vehicles,
+                "errors": fetch_errors,
+                "diagnosis_timestamp": datetime.now().isoformat()
+            },
+            "confidence": 0.8 if vehicles else 0.0,
+            "sources": [f"batch/{len(vehicles)}_vehicles", f"dtc_codes/{sum(code_frequency.values())}_codes"]
+        }
+        
+    except Exception as e:
+        logger.error(f"Batch diagnosis error: {str(e)}")
+        return {
+            "worker": "diagnosis",
+            "error": f"Batch diagnosis failed: {str(e)}",
+            "confidence": 0.0
+        }
+
 def generate_diagnosis_summary(dtc_analysis: Dict, failure_predictions: Dict, diagnosis_type: str) -> Dict:
     """Generate comprehensive diagnosis summary"""
     summary = {
@@ -417,6 +481,25 @@ def generate_diagnosis_summary(dtc_analysis: Dict, failure_predictions: Dict, di
     
     return summary
 
+@app.get("/dtc/{dtc_code}")
+async def get_dtc(dtc_code: str):
+    """Look up a single DTC code"""
+    info = dtc_database.get_dtc_info(dtc_code.upper())
+    if info is None:
+        return {"code": dtc_code, "error": "Unknown DTC code"}
+    return {"code": dtc_code.upper(), **info}
+
+@app.get("/dtc")
+async def search_dtc(prefix: Optional[str] = None, first: Optional[str] = None, last: Optional[str] = None):
+    """List DTC codes by prefix (e.g. ``P03xx``) or by an inclusive code range"""
+    if prefix is not None:
+        codes = dtc_database.codes_with_prefix(prefix)
+    elif first is not None and last is not None:
+        codes = dtc_database.codes_in_range(first, last)
+    else:
+        codes = dtc_database.codes
+    return {"codes": [{"code": code, **dtc_database.get_dtc_info(code)} for code in codes], "total": len(codes)}
+
 @app.get("/health")
 def health_check():
     return {"status": "healthy", "worker": "diagnosis"}